@@ -13,6 +13,7 @@ from pygeoweaver import (
     detail_workflow,
     export_workflow,
     show_history,
+    show_histories,
     import_workflow,
     list_hosts,
     list_processes,
@@ -22,22 +23,24 @@ from pygeoweaver import (
     reset_password,
     run_process,
     run_workflow,
+    run_workflows_batch,
     helpwith,
     clean_h2db,
 )
 from pygeoweaver.commands.pgw_cleanup import cleanup_workspace
+from pygeoweaver.config import HTTP_POOL_SIZE
 from pygeoweaver.constants import GEOWEAVER_DEFAULT_ENDPOINT_URL
 from pygeoweaver.commands.pgw_create import create_process, create_process_from_file, create_workflow
 from pygeoweaver.commands.pgw_detail import get_process_code
 from pygeoweaver.commands.pgw_find import get_process_by_id, get_process_by_language, get_process_by_name
-from pygeoweaver.commands.pgw_history import get_process_history, get_workflow_history
+from pygeoweaver.commands.pgw_history import follow_history, get_process_history, get_workflow_history
 from pygeoweaver.commands.pgw_list import list_processes_in_workflow
 from pygeoweaver.commands.pgw_sync import sync, sync_workflow
 from pygeoweaver.commands.pgw_upgrade import upgrade_geoweaver
 from pygeoweaver.pgw_log_config import setup_logging
 from pygeoweaver.server import check_geoweaver_status, show
 from halo import Halo
-from pygeoweaver.utils import get_spinner
+from pygeoweaver.utils import get_spinner, safe_exit
 import tempfile
 
 
@@ -277,17 +280,41 @@ def history_command():
     pass
 
 @history_command.command("show")
-@click.argument('history_id', type=str)
-def show_history_command(history_id):
+@click.argument('history_ids', nargs=-1, required=True, type=str)
+@click.option('--max-workers', default=HTTP_POOL_SIZE, show_default=True, type=int, help='Maximum number of histories fetched at the same time.')
+def show_history_command(history_ids, max_workers):
     """
-    Show history for a workflow or process.
+    Show one or many histories of workflows or processes in one table.
 
-    :param history_id: The ID of the history.
-    :type history_id: str
+    Pass "-" to read whitespace separated history ids from stdin, e.g.
+    `cat failed_ids.txt | gw history show -`.
+
+    :param history_ids: The IDs of the histories, or "-".
+    :param max_workers: Maximum number of histories fetched at the same time.
     """
-    show_history(history_id)
+    if history_ids == ("-",):
+        history_ids = click.get_text_stream("stdin").read().split()
+    if len(history_ids) == 1:
+        show_history(history_ids[0])
+    else:
+        show_histories(history_ids, max_workers=max_workers)
     
     
+@history_command.command("follow")
+@click.argument('history_id', type=str)
+@click.option('--timeout', type=float, help='Stop following after this many seconds.')
+def follow_history_command(history_id, timeout):
+    """
+    Print the log of a running history as it grows, until the history finishes.
+
+    :param history_id: The ID of the history.
+    :param timeout: Stop following after this many seconds. (optional)
+    """
+    for chunk in follow_history(history_id, timeout=timeout):
+        click.echo(chunk, nl=False)
+    click.echo()
+
+
 @history_command.command("get_process")
 @click.argument('process_id', type=str)
 def get_process_history_command(process_id):
@@ -344,9 +371,8 @@ def list_hosts_command():
     """
     List all hosts in Geoweaver.
 
-    Downloads the Geoweaver JAR, then runs the 'list' command with the '--host' option.
-
-    Note: Requires Geoweaver to be initialized and the JAR file to be available.
+    Queries the running Geoweaver server, or runs the 'list' command with the '--host' option
+    when the server is not running.
     """
     list_hosts()
 
@@ -356,9 +382,8 @@ def list_processes_command():
     """
     List all processes in Geoweaver.
 
-    Downloads the Geoweaver JAR, ensures executable permissions, and then runs the 'list' command with the '--process' option.
-
-    Note: Requires Geoweaver to be initialized and the JAR file to be available.
+    Queries the running Geoweaver server, or runs the 'list' command with the '--process' option
+    when the server is not running.
     """
     list_processes()
 
@@ -385,9 +410,8 @@ def list_workflows_command():
     """
     List all workflows in Geoweaver.
 
-    Downloads the Geoweaver JAR, then runs the 'list' command with the '--workflow' option.
-
-    Note: Requires Geoweaver to be initialized and the JAR file to be available.
+    Queries the running Geoweaver server, or runs the 'list' command with the '--workflow' option
+    when the server is not running.
     """
     list_workflows()
 
@@ -457,6 +481,31 @@ def run_workflow_command(workflow_id, workflow_folder_path, workflow_zip_file_pa
     )
 
 
+@run_command.command("batch")
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--max-workers', default=4, show_default=True, type=int, help='Maximum number of workflows running at the same time.')
+@click.option('--per-host-limit', default=2, show_default=True, type=int, help='Maximum number of workflows running on one host at the same time.')
+@click.option('--timeout', type=float, help='Seconds after which a single workflow run is killed.')
+def run_batch_command(manifest, max_workers, per_host_limit, timeout):
+    """
+    Run the workflows listed in a JSON or TOML manifest concurrently.
+
+    Args:
+        <manifest>: Manifest file with one entry per workflow (workflow_id, hosts, and optionally environments, passwords).
+        --max-workers: Maximum number of workflows running at the same time. (optional)
+        --per-host-limit: Maximum number of workflows running on one host at the same time. (optional)
+        --timeout: Seconds after which a single workflow run is killed. (optional)
+    """
+    summary = run_workflows_batch(
+        manifest,
+        max_workers=max_workers,
+        per_host_limit=per_host_limit,
+        timeout=timeout,
+    )
+    if (summary["exit_code"] != 0).any():
+        safe_exit(1)
+
+
 @geoweaver.group("sync")
 def sync_command():
     """
@@ -489,17 +538,23 @@ def sync_process_command(process_id: str, local_path: typing.Union[str, os.PathL
 @click.option('--workflow-id', required=True, type=str, help='The ID of the Geoweaver workflow.')
 @click.option('--sync-to-path', required=True, type=click.Path(exists=True, file_okay=False, dir_okay=True),
               help='The local path to sync the Geoweaver workflow.')
-def sync_workflow_command(workflow_id: str, sync_to_path: typing.Union[str, os.PathLike]):
+@click.option('--full-history', is_flag=True, default=False,
+              help='Also download the history of every process run. Slow for workflows with a long history.')
+def sync_workflow_command(workflow_id: str, sync_to_path: typing.Union[str, os.PathLike], full_history: bool):
     """
     Sync a Geoweaver workflow, including its code and history, between the local machine and the Geoweaver server.
 
+    Only files changed since the last sync are copied, and only new history records are fetched.
+
     :param workflow_id: The ID of the Geoweaver workflow.
     :type workflow_id: str
     :param sync_to_path: The local path to sync the Geoweaver workflow.
     :type sync_to_path: Union[str, os.PathLike]
+    :param full_history: Also download the history of every process run.
+    :type full_history: bool
     """
     
-    sync_workflow(workflow_id, sync_to_path)
+    sync_workflow(workflow_id, sync_to_path, full_history=full_history)
 
 
 @geoweaver.command("status")
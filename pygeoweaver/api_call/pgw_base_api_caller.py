@@ -1,25 +1,88 @@
+import json
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pygeoweaver.config import (
+    HTTP_BACKOFF_FACTOR,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_SIZE,
+    HTTP_READ_TIMEOUT,
+)
+from pygeoweaver.constants import GEOWEAVER_DEFAULT_ENDPOINT_URL
+
+
+def create_session(pool_size=HTTP_POOL_SIZE, max_retries=HTTP_MAX_RETRIES,
+                   backoff_factor=HTTP_BACKOFF_FACTOR):
+    """
+    Create a requests session with a keep-alive connection pool and retry-with-backoff.
+
+    Connection errors are retried for every method because the request never
+    reached the server. Status based retries (502/503/504) only apply to
+    idempotent methods, so POSTs that edit or add objects are never replayed.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 class BaseAPI:
-    def __init__(self, base_url):
+    def __init__(self, base_url, pool_size=HTTP_POOL_SIZE, timeout=None,
+                 max_retries=HTTP_MAX_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR):
         self.base_url = base_url
+        self.timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        self.session = create_session(
+            pool_size=pool_size, max_retries=max_retries, backoff_factor=backoff_factor
+        )
+
+    def request(self, method, endpoint, **kwargs):
+        """
+        Send a request through the pooled session and return the raw response.
+
+        :param method: HTTP method, e.g. "GET" or "POST".
+        :param endpoint: Path relative to ``base_url``, or an absolute URL.
+        """
+        url = endpoint if endpoint.startswith("http") else self.base_url + endpoint
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    def close(self):
+        self.session.close()
 
     def _call_api(self, endpoint, method='GET', data=None):
-        url = self.base_url + endpoint
         headers = {
             'Content-Type': 'application/json'
         }
 
         try:
             if method.upper() == 'POST':
-                response = requests.post(url, headers=headers, data=json.dumps(data))
+                response = self.request('POST', endpoint, headers=headers, data=json.dumps(data))
             elif method.upper() == 'GET':
-                response = requests.get(url, headers=headers, params=data)
+                response = self.request('GET', endpoint, headers=headers, params=data)
             elif method.upper() == 'PUT':
-                response = requests.put(url, headers=headers, data=json.dumps(data))
+                response = self.request('PUT', endpoint, headers=headers, data=json.dumps(data))
             elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=headers, data=json.dumps(data))
+                response = self.request('DELETE', endpoint, headers=headers, data=json.dumps(data))
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
 
@@ -29,3 +92,22 @@ class BaseAPI:
             print(f"HTTP error occurred: {http_err}")
         except Exception as err:
             print(f"An error occurred: {err}")
+
+
+_api_client = None
+_api_client_lock = threading.Lock()
+
+
+def get_api_client():
+    """
+    Get the module level client shared by all commands.
+
+    The client keeps a keep-alive connection pool to GEOWEAVER_DEFAULT_ENDPOINT_URL,
+    so repeated calls reuse TCP connections instead of opening a new one per request.
+    """
+    global _api_client
+    if _api_client is None:
+        with _api_client_lock:
+            if _api_client is None:
+                _api_client = BaseAPI(GEOWEAVER_DEFAULT_ENDPOINT_URL)
+    return _api_client
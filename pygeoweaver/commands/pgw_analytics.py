@@ -0,0 +1,143 @@
+"""
+Statistics over history DataFrames, as returned by get_workflow_history,
+query_history or load_histories.
+
+Everything is computed with grouped pandas/NumPy operations on the whole
+frame, so histories of many workflows or processes can be analysed at once
+by grouping on ``object_id`` together with the default ``history_process``.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pygeoweaver.commands.pgw_history import FINISHED_STATUSES, history_page_to_dataframe, query_history
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+
+
+def load_histories(object_ids, object_type="workflow", sync=True):
+    """
+    Combined history of many workflows or processes, with an ``object_id`` column.
+
+    :param object_ids: Workflow or process ids.
+    :param object_type: "workflow" or "process".
+    :param sync: Sync the local history store before reading it, see query_history.
+    """
+    frames = [
+        query_history(object_type, object_id, sync=sync).assign(object_id=object_id)
+        for object_id in object_ids
+    ]
+    if not frames:
+        return history_page_to_dataframe([]).assign(object_id=pd.Series(dtype="string"))
+    return pd.concat(frames, ignore_index=True)
+
+
+def with_durations(df):
+    """
+    Copy of ``df`` with a ``duration_s`` column, NaN for records that have not ended.
+    """
+    return df.assign(duration_s=(df["history_end_time"] - df["history_begin_time"]).dt.total_seconds())
+
+
+def duration_percentiles(df, by="history_process", percentiles=(0.5, 0.9, 0.99)):
+    """
+    Duration percentiles in seconds of finished runs.
+
+    :param by: Column or list of columns to group on.
+    :return: DataFrame indexed by ``by`` with one ``p50``, ``p90``... column per percentile.
+    """
+    df = with_durations(df)
+    finished = df[df["indicator"].isin(FINISHED_STATUSES) & df["duration_s"].notna()]
+    result = finished.groupby(by)["duration_s"].quantile(list(percentiles)).unstack()
+    result.columns = [f"p{round(p * 100):d}" for p in result.columns]
+    return result
+
+
+def failure_rates(df, by="history_process"):
+    """
+    Share of every status per group, with run counts and the failure rate of finished runs.
+
+    :return: DataFrame indexed by ``by`` with one column per indicator, ``runs``,
+        ``failures`` and ``failure_rate``.
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    counts = pd.crosstab(
+        [df[column] for column in keys],
+        df["indicator"].fillna(ExecutionStatus.UNKNOWN),
+    )
+    finished = counts[[status for status in FINISHED_STATUSES if status in counts]].sum(axis=1)
+    failures = counts[ExecutionStatus.FAILED] if ExecutionStatus.FAILED in counts else 0
+    result = counts.div(counts.sum(axis=1), axis=0)
+    result["runs"] = counts.sum(axis=1)
+    result["failures"] = failures
+    result["failure_rate"] = failures / finished.replace(0, np.nan)
+    return result
+
+
+def host_throughput(df, freq="1D"):
+    """
+    Runs started, finished and busy time per host and period.
+
+    :param freq: pandas offset alias of the periods, e.g. "1h" or "1D".
+    :return: DataFrame indexed by (host_id, period) with ``runs``, ``finished``,
+        ``busy_s`` and ``runs_per_hour``.
+    """
+    df = with_durations(df).assign(finished=lambda d: d["indicator"].isin(FINISHED_STATUSES))
+    grouped = df.groupby(["host_id", pd.Grouper(key="history_begin_time", freq=freq)])
+    result = grouped.agg(
+        runs=("history_id", "size"),
+        finished=("finished", "sum"),
+        busy_s=("duration_s", "sum"),
+    )
+    result.index = result.index.set_names(["host_id", "period"])
+    result["runs_per_hour"] = result["runs"] / (pd.Timedelta(freq).total_seconds() / 3600)
+    return result
+
+
+def detect_regressions(df, split=None, by="history_process", window=None, threshold=1.2, min_runs=5):
+    """
+    Compare run durations before and after ``split`` and flag groups that got slower.
+
+    :param split: Time separating the baseline window from the recent window.
+        Defaults to the midpoint between the first and last run.
+    :param window: Optional pandas Timedelta (or string) limiting both windows to
+        this length on each side of ``split``.
+    :param threshold: Ratio of recent to baseline median duration from which a group is flagged.
+    :param min_runs: Minimum finished runs needed in each window for a group to be flagged.
+    :return: DataFrame indexed by ``by`` with baseline and recent medians, counts,
+        ``ratio`` and ``regressed``, slowest ratio first.
+    """
+    df = with_durations(df)
+    df = df[df["indicator"].isin(FINISHED_STATUSES) & df["duration_s"].notna()]
+    begin = df["history_begin_time"]
+    if split is None:
+        split = begin.min() + (begin.max() - begin.min()) / 2
+    split = pd.Timestamp(split)
+    if window is not None:
+        window = pd.Timedelta(window)
+        df = df[(begin >= split - window) & (begin < split + window)]
+        begin = df["history_begin_time"]
+
+    period = pd.Series(np.where(begin >= split, "recent", "baseline"), index=df.index, name="period")
+    keys = ([by] if isinstance(by, str) else list(by)) + [period]
+    stats = df.groupby(keys)["duration_s"].agg(["median", "count"]).unstack("period")
+    stats.columns = [f"{period}_{stat}" for stat, period in stats.columns]
+    for column in ("baseline_median", "recent_median", "baseline_count", "recent_count"):
+        if column not in stats:
+            stats[column] = np.nan
+    stats = stats[["baseline_median", "recent_median", "baseline_count", "recent_count"]]
+    stats[["baseline_count", "recent_count"]] = stats[["baseline_count", "recent_count"]].fillna(0).astype(int)
+    stats["ratio"] = stats["recent_median"] / stats["baseline_median"]
+    stats["regressed"] = (
+        (stats["ratio"] >= threshold)
+        & (stats["baseline_count"] >= min_runs)
+        & (stats["recent_count"] >= min_runs)
+    )
+    return stats.sort_values("ratio", ascending=False)
+
+
+def summarize_history(df, by="history_process", percentiles=(0.5, 0.9, 0.99)):
+    """
+    One row per group with run counts, failure rate and duration percentiles.
+    """
+    rates = failure_rates(df, by=by)[["runs", "failures", "failure_rate"]]
+    return rates.join(duration_percentiles(df, by=by, percentiles=percentiles), how="left")
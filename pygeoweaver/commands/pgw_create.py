@@ -1,8 +1,9 @@
 import json
-import requests
 import pandas as pd
 from pydantic import BaseModel
 
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.commands.pgw_list import invalidate_lists
 from pygeoweaver.constants import *
 from pygeoweaver.utils import (
     download_geoweaver_jar,
@@ -62,11 +63,12 @@ def create_process(lang, description, name, code, owner="111111", confidential=F
         confidential=confidential,
     )
     data_json = process.json()
-    r = requests.post(
-        f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/add/process",
+    r = get_api_client().post(
+        "/web/add/process",
         data=data_json,
         headers=COMMON_API_HEADER,
     )
+    invalidate_lists("process")
     if check_ipython() and r.ok:
         df = pd.DataFrame(json.loads(data_json).items(), columns=["Key", "Value"])
         return df
@@ -132,11 +134,12 @@ def create_workflow(
         owner=owner,
     )
     data_json = workflow.json()
-    r = requests.post(
-        f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/add/workflow",
+    r = get_api_client().post(
+        "/web/add/workflow",
         data=data_json,
         headers=COMMON_API_HEADER,
     )
+    invalidate_lists("workflow")
     if check_ipython():
         return pd.DataFrame(json.loads(data_json).items(), columns=["Key", "Value"])
     else:
@@ -1,7 +1,7 @@
 import logging
-import subprocess
-import requests
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
 from pygeoweaver.constants import *
+from pygeoweaver.pgw_daemon import run_geoweaver_cli
 
 from pygeoweaver.server import ensure_geoweaver_started
 from pygeoweaver.utils import (
@@ -70,15 +70,9 @@ def detail_workflow(workflow_id, force_restart=False, force_download=False):
     with get_spinner(text="Getting workflow details..", spinner="dots"):
         download_geoweaver_jar()
         ensure_geoweaver_started()
-        process = subprocess.run(
-            [
-                get_java_bin_path(),
-                "-jar",
-                get_geoweaver_jar_path(),
-                "detail",
-                f"--workflow-id={workflow_id}",
-            ],
-            cwd=f"{get_root_dir()}/",
+        process = run_geoweaver_cli(
+            ["detail", f"--workflow-id={workflow_id}"],
+            capture_output=True,
         )
     
     print("\n", process.stdout)
@@ -100,12 +94,8 @@ def detail_process(process_id):
     with get_spinner(text="Getting process details..", spinner="dots"):
         download_geoweaver_jar()
         ensure_geoweaver_started()
-        process = subprocess.run(
-            [
-                get_java_bin_path(), "-jar", get_geoweaver_jar_path(), "detail",
-                "--process-id", process_id
-            ],
-            text=True,
+        process = run_geoweaver_cli(
+            ["detail", "--process-id", process_id],
             capture_output=True
         )
     print("\n", process.stdout)
@@ -135,13 +125,9 @@ def detail_host(host_id, force_restart=False, force_download=False):
     with get_spinner(text="Getting host details..\n", spinner="dots"):
         download_geoweaver_jar()
         ensure_geoweaver_started()
-        process = subprocess.run(
-            [
-                get_java_bin_path(), "-jar", get_geoweaver_jar_path(), 
-                "detail", "--host-id", host_id
-            ],
+        process = run_geoweaver_cli(
+            ["detail", "--host-id", host_id],
             capture_output=True,
-            text=True
         )
     
         print("\n" + process.stdout)
@@ -160,8 +146,8 @@ def get_process_code(process_id):
     :rtype: str
     """
     ensure_geoweaver_started()
-    r = requests.post(
-        f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/detail",
+    r = get_api_client().post(
+        "/web/detail",
         data={"type": "process", "id": process_id},
     ).json()
     return r["code"]
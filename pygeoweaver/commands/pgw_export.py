@@ -1,12 +1,7 @@
 import os.path
 import zipfile
-import subprocess
-from pygeoweaver.utils import (
-    download_geoweaver_jar,
-    get_geoweaver_jar_path,
-    get_java_bin_path,
-    get_root_dir,
-)
+from pygeoweaver.pgw_daemon import run_geoweaver_cli
+from pygeoweaver.utils import download_geoweaver_jar
 
 
 def export_workflow(
@@ -32,18 +27,14 @@ def export_workflow(
     # Resolve the absolute path for the target file
     absolute_target_file_path = os.path.abspath(target_file_path)
 
-    subprocess.run(
+    run_geoweaver_cli(
         [
-            get_java_bin_path(),
-            "-jar",
-            get_geoweaver_jar_path(),
             "export",
             "workflow",
             f"--mode={mode}",
             workflow_id,
             absolute_target_file_path,
         ],
-        cwd=f"{get_root_dir()}/",
     )
     if unzip:
         if not unzip_directory_name:
@@ -1,8 +1,217 @@
-import requests
-from pygeoweaver.constants import *
+import bisect
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
 import pandas as pd
 
-from pygeoweaver.utils import check_ipython
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.config import PROCESS_CATALOG_MAX_AGE
+
+logger = logging.getLogger(__name__)
+
+
+def name_trigrams(name):
+    return {name[i:i + 3] for i in range(len(name) - 2)}
+
+
+class ProcessCatalog:
+    """
+    In-memory index of the processes returned by the server's `/web/list` endpoint.
+
+    The list is downloaded once and indexed by id, name and lang, with a sorted
+    name index for prefix lookups and a trigram index for substring lookups.
+    Refreshes send the last ETag (when the server provides one) and otherwise
+    compare a digest of the body, then re-index only the processes that changed.
+    """
+
+    def __init__(self, max_age=PROCESS_CATALOG_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._fingerprints = {}
+        self._by_name = defaultdict(set)
+        self._by_lang = defaultdict(set)
+        self._trigrams = defaultdict(set)
+        self._sorted_names = []  # sorted (lowercase name, id) pairs
+        self._etag = None
+        self._digest = None
+        self._refreshed_at = None
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def invalidate(self):
+        """
+        Make the next lookup revalidate against the server.
+        """
+        self._refreshed_at = None
+
+    def ensure_fresh(self):
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.max_age:
+            self.refresh()
+
+    def refresh(self):
+        """
+        Revalidate the catalog against the server.
+
+        :return: True if the process list changed.
+        """
+        with self._lock:
+            headers = {"If-None-Match": self._etag} if self._etag else {}
+            response = get_api_client().post("/web/list", data={"type": "process"}, headers=headers)
+            self._refreshed_at = time.monotonic()
+            if response.status_code == 304:
+                return False
+            response.raise_for_status()
+            self._etag = response.headers.get("ETag")
+            digest = hashlib.sha1(response.content).hexdigest()
+            if digest == self._digest:
+                return False
+            self._digest = digest
+            self._apply(response.json())
+            return True
+
+    def _apply(self, process_list):
+        seen = set()
+        changed = 0
+        added = []
+        for process in process_list:
+            process_id = process["id"]
+            seen.add(process_id)
+            fingerprint = hashlib.sha1(json.dumps(process, sort_keys=True).encode()).hexdigest()
+            if self._fingerprints.get(process_id) == fingerprint:
+                continue
+            if process_id in self._by_id:
+                self._unindex(process_id)
+            self._index(process, fingerprint)
+            added.append(((process.get("name") or "").lower(), process_id))
+            changed += 1
+        removed = [process_id for process_id in self._by_id if process_id not in seen]
+        for process_id in removed:
+            self._unindex(process_id)
+        if not self._sorted_names or len(added) > len(self._sorted_names) // 10:
+            # Initial load or large change, one sort is cheaper than many insertions
+            self._sorted_names = sorted(
+                ((process.get("name") or "").lower(), process_id) for process_id, process in self._by_id.items()
+            )
+        else:
+            for entry in added:
+                bisect.insort(self._sorted_names, entry)
+        logger.debug(f"Process catalog refreshed: {changed} changed, {len(removed)} removed, {len(self._by_id)} total")
+
+    def _index(self, process, fingerprint):
+        # _sorted_names is updated by _apply once all processes are indexed
+        process_id = process["id"]
+        name = process.get("name") or ""
+        self._by_id[process_id] = process
+        self._fingerprints[process_id] = fingerprint
+        self._by_name[name].add(process_id)
+        self._by_lang[process.get("lang")].add(process_id)
+        lower = name.lower()
+        for trigram in name_trigrams(lower):
+            self._trigrams[trigram].add(process_id)
+
+    def _unindex(self, process_id):
+        process = self._by_id.pop(process_id)
+        del self._fingerprints[process_id]
+        name = process.get("name") or ""
+        self._discard(self._by_name, name, process_id)
+        self._discard(self._by_lang, process.get("lang"), process_id)
+        lower = name.lower()
+        position = bisect.bisect_left(self._sorted_names, (lower, process_id))
+        if position < len(self._sorted_names) and self._sorted_names[position] == (lower, process_id):
+            del self._sorted_names[position]
+        for trigram in name_trigrams(lower):
+            self._discard(self._trigrams, trigram, process_id)
+
+    @staticmethod
+    def _discard(index, key, process_id):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(process_id)
+            if not ids:
+                del index[key]
+
+    def _ids_with_prefix(self, prefix):
+        prefix = prefix.lower()
+        ids = set()
+        position = bisect.bisect_left(self._sorted_names, (prefix,))
+        while position < len(self._sorted_names) and self._sorted_names[position][0].startswith(prefix):
+            ids.add(self._sorted_names[position][1])
+            position += 1
+        return ids
+
+    def _ids_containing(self, text):
+        text = text.lower()
+        if len(text) < 3:
+            return {process_id for process_id, process in self._by_id.items()
+                    if text in (process.get("name") or "").lower()}
+        candidates = None
+        for trigram in name_trigrams(text):
+            ids = self._trigrams.get(trigram, set())
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return {process_id for process_id in candidates
+                if text in (self._by_id[process_id].get("name") or "").lower()}
+
+    def get(self, process_id):
+        self.ensure_fresh()
+        process = self._by_id.get(process_id)
+        return dict(process) if process is not None else None
+
+    def find(self, id=None, name=None, lang=None, name_prefix=None, name_contains=None, **fields):
+        """
+        Find processes matching every given criterion.
+
+        :param id: Exact process id.
+        :param name: Exact process name.
+        :param lang: Exact programming language.
+        :param name_prefix: Case-insensitive prefix of the name.
+        :param name_contains: Case-insensitive substring of the name.
+        :param fields: Other exact field matches, e.g. owner="111111".
+        :return: List of matching process dicts, copies of the indexed ones.
+        """
+        self.ensure_fresh()
+        with self._lock:
+            candidate_sets = []
+            if id is not None:
+                candidate_sets.append({id} if id in self._by_id else set())
+            if name is not None:
+                candidate_sets.append(self._by_name.get(name, set()))
+            if lang is not None:
+                candidate_sets.append(self._by_lang.get(lang, set()))
+            if name_prefix is not None:
+                candidate_sets.append(self._ids_with_prefix(name_prefix))
+            if name_contains is not None:
+                candidate_sets.append(self._ids_containing(name_contains))
+
+            if candidate_sets:
+                candidate_sets.sort(key=len)
+                ids = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+            else:
+                ids = self._by_id.keys()
+
+            return [
+                dict(self._by_id[process_id]) for process_id in ids
+                if all(self._by_id[process_id].get(key) == value for key, value in fields.items())
+            ]
+
+
+process_catalog = ProcessCatalog()
+
+
+def find_processes(**query):
+    """
+    Find processes with a compound query, e.g. ``find_processes(lang="python", name_prefix="data")``.
+
+    See ProcessCatalog.find for the supported criteria.
+    """
+    return pd.DataFrame(process_catalog.find(**query))
 
 
 def get_process_by_name(process_name):
@@ -12,22 +221,7 @@ def get_process_by_name(process_name):
     :param process_name: The name of the process.
     :type process_name: str
     """
-    response = requests.post(
-        f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/list", data={"type": "process"}
-    )
-    process_list = response.json()
-
-    matching_processes = []
-
-    for process in process_list:
-        if process["name"] == process_name:
-            matching_processes.append(process)
-    pd.set_option("display.max_columns", None)  # Display all columns
-    pd.set_option("display.max_rows", None)  # Display all rows
-    pd.set_option("display.expand_frame_repr", False)  # Prevent truncation of columns
-    pd.DataFrame(matching_processes)
-    if not check_ipython():
-        return pd.DataFrame(matching_processes)
+    return find_processes(name=process_name)
 
 
 def get_process_by_id(process_id):
@@ -37,22 +231,7 @@ def get_process_by_id(process_id):
     :param process_id: The ID of the process.
     :type process_id: str
     """
-    response = requests.post(
-        f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/list", data={"type": "process"}
-    )
-    process_list = response.json()
-
-    matching_processes = []
-
-    for process in process_list:
-        if process["id"] == process_id:
-            matching_processes.append(process)
-    pd.set_option("display.max_columns", None)  # Display all columns
-    pd.set_option("display.max_rows", None)  # Display all rows
-    pd.set_option("display.expand_frame_repr", False)  # Prevent truncation of columns
-    pd.DataFrame(matching_processes)
-    if not check_ipython():
-        return pd.DataFrame(matching_processes)
+    return find_processes(id=process_id)
 
 
 def get_process_by_language(language):
@@ -62,19 +241,4 @@ def get_process_by_language(language):
     :param language: The programming language of the processes.
     :type language: str
     """
-    response = requests.post(
-        f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/list", data={"type": "process"}
-    )
-    process_list = response.json()
-
-    matching_processes = []
-
-    for process in process_list:
-        if process["lang"] == language:
-            matching_processes.append(process)
-    pd.set_option("display.max_columns", None)  # Display all columns
-    pd.set_option("display.max_rows", None)  # Display all rows
-    pd.set_option("display.expand_frame_repr", False)  # Prevent truncation of columns
-    pd.DataFrame(matching_processes)
-    if not check_ipython():
-        return pd.DataFrame(matching_processes)
+    return find_processes(lang=language)
@@ -1,11 +1,10 @@
-import subprocess
-from pygeoweaver.utils import get_geoweaver_jar_path, get_java_bin_path, get_root_dir
+from pygeoweaver.pgw_daemon import run_geoweaver_cli
 
 
 def helpwith(
     command_list: list = [],
 ):
-    target_cmd_args = [get_java_bin_path(), "-jar", get_geoweaver_jar_path()]
+    target_cmd_args = []
     if len(command_list) > 0:
         for i in range(len(command_list) - 1):
             target_cmd_args.append(command_list[i])
@@ -13,4 +12,4 @@ def helpwith(
         target_cmd_args.append(command_list[-1])
     else:
         target_cmd_args.append("help")
-    subprocess.run(target_cmd_args, cwd=f"{get_root_dir()}/")
+    run_geoweaver_cli(target_cmd_args)
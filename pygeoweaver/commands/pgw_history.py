@@ -1,28 +1,51 @@
-import http
+import codecs
 import json
 import logging
-import subprocess
+import re
+import time
 import traceback
-from urllib.parse import urlencode, urlparse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-import click
 import pandas as pd
 import requests
 from tabulate import tabulate
 
-from pygeoweaver.constants import *
-from pygeoweaver.server import check_geoweaver_status, start
-from pygeoweaver.utils import (
-    download_geoweaver_jar,
-    get_geoweaver_jar_path,
-    get_java_bin_path,
-    get_root_dir,
-    get_spinner,
-    is_interactive,
-)
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.commands.pgw_list import model_to_dict, to_model
+from pygeoweaver.config import HISTORY_PAGE_SIZE, HISTORY_SYNC_INTERVAL, HTTP_POOL_SIZE
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+from pygeoweaver.database_management.pgw_history import History
+from pygeoweaver.pgw_daemon import run_geoweaver_cli
+from pygeoweaver.pgw_history_store import HISTORY_COLUMNS, get_history_store
+from pygeoweaver.pgw_history_writer import get_history_writer
+from pygeoweaver.server import check_geoweaver_status, ensure_geoweaver_started, start
+from pygeoweaver.utils import get_spinner, is_interactive
 
 logger = logging.getLogger(__name__)
 
+# Column types of history DataFrames, so chunks concatenate without dtype drift
+HISTORY_DTYPES = {
+    "history_id": "string",
+    "history_input": "string",
+    "history_output": "string",
+    "history_begin_time": "datetime64[ns]",
+    "history_end_time": "datetime64[ns]",
+    "history_notes": "string",
+    "history_process": "string",
+    "host_id": "string",
+    "indicator": "string",
+}
+
+# Statuses after which a history record does not change anymore
+FINISHED_STATUSES = (
+    ExecutionStatus.DONE,
+    ExecutionStatus.FAILED,
+    ExecutionStatus.STOPPED,
+    ExecutionStatus.SKIPPED,
+    ExecutionStatus.CACHED,
+)
+
 
 def display_response_table(response_json):
     """
@@ -61,12 +84,11 @@ def show_history(history_id):
         if not check_geoweaver_status():
             start()
         
-        log_url = f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/log"
         json_data = f"type=process&id={history_id}"
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
         }
-        response = requests.post(log_url, headers=headers, data=json_data)
+        response = get_api_client().post("/web/log", headers=headers, data=json_data)
 
         if response.status_code == 200:
             try:
@@ -82,12 +104,7 @@ def show_history(history_id):
             print(f"Error occurred: {str(e)}")
             print(f"Traceback:\n{traceback_str}")
             
-            download_geoweaver_jar()
-            process = subprocess.run(
-                [get_java_bin_path(), "-jar", get_geoweaver_jar_path(), "history", history_id],
-                cwd=f"{get_root_dir()}/",
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-            )
+            process = run_geoweaver_cli(["history", history_id], use_daemon=False, capture_output=True)
         
         print(process.stdout)
         if process.stderr:
@@ -96,44 +113,120 @@ def show_history(history_id):
             logger.error(process.stderr)
 
 
+def fetch_history_detail(history_id):
+    response = get_api_client().post("/web/log", data={"type": "process", "id": history_id})
+    response.raise_for_status()
+    return response.json()
+
+
+def show_histories(history_ids, max_workers=HTTP_POOL_SIZE):
+    """
+    Fetch many histories concurrently and show them as one table.
+
+    Requests share the pooled API client, so ``max_workers`` beyond its pool size
+    (GEOWEAVER_HTTP_POOL_SIZE) only queue for a connection. Histories that cannot
+    be fetched are kept in the table with the reason in an ``error`` column.
+
+    :param history_ids: History ids, duplicates are fetched once.
+    :param max_workers: Maximum number of requests in flight.
+    :return: DataFrame with one row per history id, in the given order.
+    """
+    history_ids = list(dict.fromkeys(history_id.strip() for history_id in history_ids if history_id.strip()))
+    if not history_ids:
+        raise RuntimeError("history id is missing")
+    ensure_geoweaver_started()
+
+    def fetch(history_id):
+        try:
+            detail = fetch_history_detail(history_id)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Could not get history {history_id}: {e}")
+            return {"history_id": history_id, "error": str(e)}
+        if not isinstance(detail, dict):
+            logger.error(f"Could not get history {history_id}: unexpected response {detail!r}")
+            return {"history_id": history_id, "error": f"Unexpected response: {detail!r}"}
+        return {**detail, "history_id": history_id}
+
+    with get_spinner(text=f'Get {len(history_ids)} histories...', spinner='dots'):
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(history_ids)))) as pool:
+            rows = list(pool.map(fetch, history_ids))
+
+    df = history_page_to_dataframe(rows)
+    if is_interactive():
+        return df
+    print(tabulate(df, headers="keys", tablefmt="psql", showindex=False))
+    return df
+
+
+def follow_history(history_id, min_interval=0.5, max_interval=10.0, timeout=None, max_unknown_polls=20):
+    """
+    Follow the log of a running history, yielding only output added since the last poll.
+
+    `/web/log` is polled with adaptive intervals: right after new output the next poll
+    comes after ``min_interval`` seconds, and every idle poll waits 1.5 times longer,
+    up to ``max_interval``. Following stops once the history reaches a finished status.
+
+    Usage::
+
+        for chunk in follow_history("history_id"):
+            print(chunk, end="")
+
+    :param timeout: Stop after this many seconds even if the history is still running.
+    :param max_unknown_polls: Stop after this many polls in a row without new output
+        while the status is neither finished nor running or ready, e.g. None or Unknown.
+    :return: Generator of output strings; its return value is the last status.
+    """
+    ensure_geoweaver_started()
+    offset = 0
+    interval = min_interval
+    unknown_polls = 0
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        detail = fetch_history_detail(history_id)
+        output = detail.get("history_output") or ""
+        if len(output) < offset:
+            # The output was replaced rather than appended to, start over
+            offset = 0
+        new_output = len(output) > offset
+        if new_output:
+            yield output[offset:]
+            offset = len(output)
+            interval = min_interval
+        else:
+            interval = min(interval * 1.5, max_interval)
+
+        status = detail.get("indicator")
+        if status in FINISHED_STATUSES:
+            return status
+        if status in (ExecutionStatus.RUNNING, ExecutionStatus.READY) or new_output:
+            unknown_polls = 0
+        else:
+            unknown_polls += 1
+            if unknown_polls >= max_unknown_polls:
+                logger.warning(f"History {history_id} stayed in status {status} for {unknown_polls} polls, stopped following it")
+                return status
+        if deadline is not None and time.monotonic() + interval > deadline:
+            return status
+        time.sleep(interval)
+
+
 def get_process_history(process_id):
     """
         Get list of history for a process using process id
-    :param process_id: str    :type process_id: str
+    :param process_id: str
     """
     if not process_id:
         raise Exception("please pass `process_id` as a parameter to the function.")
     try:
-        print("why it is still here")
-        if check_geoweaver_status():
-            start(exit_on_finish=False)
-            print("why it is still here")
-        
-        json_data = f"type=process&id={process_id}"
-        print(json_data)
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
-        }
-        r = requests.post(
-            f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/logs",
-            data=json_data,
-            headers=headers,
-        )
-        print("r.text = ", r.text)
-        if r.status_code == 200:
-            try:
-                display_response_table(r.json())
-            except requests.exceptions.JSONDecodeError:
-                raise ValueError('Response is not in JSON format:', r.text)
+        df = query_history("process", process_id)
+        if is_interactive():
+            return df
         else:
-            raise ValueError(f'POST request failed with status code {r.text}')
+            print(tabulate(df, headers="keys", tablefmt="psql"))
     except Exception as e:
-        with get_spinner(text=f'Get workflow history...', spinner='dots'):
-            process = subprocess.run(
-                f"{get_java_bin_path()} -jar {get_geoweaver_jar_path()} process-history {process_id}",
-                cwd=f"{get_root_dir()}/",
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-            )
+        logger.error(e)
+        with get_spinner(text=f'Get process history via slow CLI...', spinner='dots'):
+            process = run_geoweaver_cli(["process-history", process_id], use_daemon=False, capture_output=True)
         
         print(process.stdout)
         if process.stderr:
@@ -142,6 +235,277 @@ def get_process_history(process_id):
             logger.error(process.stderr)
 
 
+# Characters that end a run inside a JSON string, and the structural characters outside of one
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCTURAL = re.compile(r'[{}\[\]",\s]')
+
+
+def iter_json_array(response, chunk_size=64 * 1024):
+    """
+    Yield the items of a JSON array response one by one while the body downloads,
+    so only the item being parsed is held in memory.
+
+    Nesting depth and string state are tracked as chunks arrive, and each item is
+    decoded once when its end is found, so large items cost linear time however
+    many chunks they span.
+
+    :param response: A requests response opened with ``stream=True``.
+    :raises ValueError: If the body is not a JSON array.
+    """
+    text_decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    buffer = ""
+    pos = 0  # where scanning resumes
+    start = None  # start of the item being scanned
+    depth = 0
+    in_string = False
+    in_array = False
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        buffer += text_decoder.decode(chunk)
+        while True:
+            if start is None:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos >= len(buffer):
+                    break
+                if not in_array:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"Expected a JSON array, got: {buffer[pos:pos + 100]}")
+                    in_array = True
+                    pos += 1
+                    continue
+                if buffer[pos] == "]":
+                    return
+                start, depth, in_string = pos, 0, False
+            end = None
+            while end is None:
+                if in_string:
+                    match = _STRING_SPECIAL.search(buffer, pos)
+                    if match is None:
+                        pos = max(pos, len(buffer))
+                        break
+                    if match.group() == "\\":
+                        # Skip the escaped character, which may not have arrived yet
+                        pos = match.end() + 1
+                        continue
+                    in_string = False
+                    pos = match.end()
+                    if depth == 0:
+                        end = pos
+                    continue
+                match = _STRUCTURAL.search(buffer, pos)
+                if match is None:
+                    pos = max(pos, len(buffer))
+                    break
+                char, pos = match.group(), match.end()
+                if char == '"':
+                    in_string = True
+                elif char in "{[":
+                    depth += 1
+                elif char in "}]":
+                    depth -= 1
+                    if depth == 0:
+                        end = pos
+                    elif depth < 0:
+                        # The array closed right after a number or literal
+                        end = pos - 1
+                elif depth == 0 and pos - 1 > start:
+                    # A number or literal ends at a comma or whitespace
+                    end = pos - 1
+            if end is None:
+                break
+            yield json.loads(buffer[start:end])
+            pos, start = end, None
+        cut = pos if start is None else start
+        buffer = buffer[cut:]
+        pos -= cut
+        if start is not None:
+            start = 0
+    raise ValueError("Incomplete JSON array in response")
+
+
+def to_epoch_ms(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(pd.Timestamp(value).timestamp() * 1000)
+
+
+def history_page_to_dataframe(items):
+    """
+    Build a history DataFrame with HISTORY_DTYPES column types from server JSON objects.
+    """
+    df = pd.DataFrame(items)
+    for column, dtype in HISTORY_DTYPES.items():
+        if column not in df:
+            df[column] = None
+        if dtype.startswith("datetime"):
+            df[column] = to_datetime_column(df[column])
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def to_datetime_column(values):
+    """
+    Convert epoch milliseconds (as sent by the server) or datetimes to naive UTC timestamps.
+    """
+    if pd.api.types.infer_dtype(values, skipna=True) in ("integer", "floating", "mixed-integer-float"):
+        return pd.to_datetime(values, unit="ms")
+    return pd.to_datetime(values, utc=True).dt.tz_localize(None)
+
+
+def iter_history_records(object_type, object_id, page_size=HISTORY_PAGE_SIZE, since=None):
+    """
+    Lazily fetch the history of a process or workflow as pages of raw server JSON objects.
+
+    The `/web/logs` response is parsed incrementally while it downloads, so memory
+    stays bounded by one page no matter how long the history is.
+
+    :param object_type: "process" or "workflow".
+    :param object_id: Process or workflow id.
+    :param page_size: Number of records per page.
+    :param since: datetime or epoch milliseconds. Only records that ended at or after
+        it, or have not ended yet, are returned.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    since_ms = to_epoch_ms(since)
+    ensure_geoweaver_started()
+    with get_api_client().post(
+        "/web/logs", data={"type": object_type, "id": object_id}, stream=True
+    ) as response:
+        response.raise_for_status()
+        page = []
+        for item in iter_json_array(response):
+            end_time = item.get("history_end_time")
+            if since_ms is not None and end_time and to_epoch_ms(end_time) < since_ms:
+                continue
+            page.append(item)
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+
+def iter_history(object_type, object_id, page_size=HISTORY_PAGE_SIZE, since=None, as_dataframe=False):
+    """
+    Lazily fetch the history of a process or workflow in pages, see iter_history_records.
+
+    :param as_dataframe: Yield DataFrame chunks instead of lists of History records.
+    """
+    for page in iter_history_records(object_type, object_id, page_size=page_size, since=since):
+        yield history_page_to_dataframe(page) if as_dataframe else [to_model(History, item) for item in page]
+
+
+def iter_workflow_history(workflow_id, page_size=HISTORY_PAGE_SIZE, since=None, as_dataframe=False):
+    """
+    Lazily fetch the history of a workflow, see iter_history.
+
+    Usage::
+
+        for page in iter_workflow_history("wf_id", page_size=500):
+            for history in page:
+                print(history.history_id, history.indicator)
+    """
+    return iter_history("workflow", workflow_id, page_size=page_size, since=since, as_dataframe=as_dataframe)
+
+
+def iter_process_history(process_id, page_size=HISTORY_PAGE_SIZE, since=None, as_dataframe=False):
+    """
+    Lazily fetch the history of a process, see iter_history.
+    """
+    return iter_history("process", process_id, page_size=page_size, since=since, as_dataframe=as_dataframe)
+
+
+def to_dataframe(pages):
+    """
+    Concatenate history pages into one DataFrame with HISTORY_DTYPES column types.
+
+    :param pages: DataFrame chunks or lists of History records, e.g. from iter_workflow_history.
+    """
+    frames = []
+    for page in pages:
+        if not isinstance(page, pd.DataFrame):
+            page = history_page_to_dataframe([model_to_dict(item) for item in page])
+        frames.append(page)
+    if not frames:
+        return history_page_to_dataframe([])
+    return pd.concat(frames, ignore_index=True).astype(HISTORY_DTYPES)
+
+
+def sync_history(object_type, object_id, force=False):
+    """
+    Mirror the history of a process or workflow into the local history store.
+
+    Only records that ended at or after the stored watermark, or are still running,
+    are written. The server always sends the whole history, so the ids of all records
+    are checked too, and stored records the server no longer has are deleted. Objects
+    synced less than HISTORY_SYNC_INTERVAL seconds ago are skipped unless ``force`` is set.
+
+    :return: Number of records written.
+    """
+    store = get_history_store()
+    watermark, synced_at = store.get_sync_state(object_type, object_id)
+    if not force and synced_at is not None and time.time() - synced_at < HISTORY_SYNC_INTERVAL:
+        return 0
+
+    synced_at = time.time()
+    since = watermark
+    written = 0
+    history_ids = set()
+    for page in iter_history_records(object_type, object_id):
+        records = []
+        for item in page:
+            history_ids.add(item.get("history_id"))
+            record = {column: item.get(column) for column in HISTORY_COLUMNS}
+            record["history_begin_time"] = to_epoch_ms(record["history_begin_time"])
+            record["history_end_time"] = to_epoch_ms(record["history_end_time"])
+            if since is not None and record["history_end_time"] and record["history_end_time"] < since:
+                continue
+            if record["indicator"] in FINISHED_STATUSES and record["history_end_time"]:
+                watermark = max(watermark or 0, record["history_end_time"])
+            records.append(record)
+        written += store.upsert(object_type, object_id, records)
+    deleted = store.delete_missing(object_type, object_id, history_ids)
+    store.set_sync_state(object_type, object_id, watermark, synced_at=synced_at)
+    logger.debug(f"Synced {written} {object_type} history records of {object_id}, deleted {deleted}")
+    return written
+
+
+def query_history(object_type, object_id, since=None, sync=True, refresh=False):
+    """
+    Get the history of a process or workflow from the local history store.
+
+    The store is synced first when the server is running, or when the object was
+    never synced. Syncs are at most HISTORY_SYNC_INTERVAL seconds apart, so the
+    result can miss the latest changes; the time of the sync it reflects is in
+    ``df.attrs["synced_at"]``. If the server is unreachable the local copy is returned as is.
+
+    :param since: datetime or epoch milliseconds, see iter_history_records.
+    :param sync: Set to False to answer from the local store only.
+    :param refresh: Sync now even if the last sync is recent. Errors are raised
+        instead of falling back to the local copy.
+    :return: DataFrame with HISTORY_DTYPES columns, oldest record first.
+    """
+    store = get_history_store()
+    if refresh:
+        sync_history(object_type, object_id, force=True)
+    elif sync:
+        never_synced = store.get_sync_state(object_type, object_id)[1] is None
+        if never_synced or check_geoweaver_status():
+            try:
+                sync_history(object_type, object_id)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                if never_synced:
+                    raise
+                logger.warning(f"Could not sync {object_type} history of {object_id}, using the local copy: {e}")
+    df = history_page_to_dataframe(store.query(object_type, object_id, since=to_epoch_ms(since)))
+    synced_at = store.get_sync_state(object_type, object_id)[1]
+    df.attrs["synced_at"] = pd.to_datetime(synced_at, unit="s") if synced_at is not None else None
+    return df
+
+
 def get_workflow_history(workflow_id):
     """
         Get list of history for a workflow using workflow id
@@ -150,26 +514,14 @@ def get_workflow_history(workflow_id):
     if not workflow_id:
         raise Exception("please pass `workflow_id` as a parameter to the function.")
     try:
-        if check_geoweaver_status():
-            start()
-        r = requests.post(
-            f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/logs",
-            data={"type": "workflow", "id": workflow_id},
-        ).json()
-        df = pd.DataFrame(r)
-        df["history_begin_time"] = pd.to_datetime(df["history_begin_time"], unit="ms")
-        df["history_end_time"] = pd.to_datetime(df["history_end_time"], unit="ms")
+        df = query_history("workflow", workflow_id)
         if is_interactive():
             return df
         else:
             print(df)
-    except Exception as e:
+    except Exception:
         with get_spinner(text=f'Get workflow history via slow CLI...', spinner='dots'):
-            process = subprocess.run(
-                f"{get_java_bin_path()} -jar {get_geoweaver_jar_path()} workflow-history {workflow_id}",
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, 
-                cwd=f"{get_root_dir()}/",
-            )
+            process = run_geoweaver_cli(["workflow-history", workflow_id], use_daemon=False, capture_output=True)
             
         print(process.stdout)
         if process.stderr:
@@ -178,6 +530,48 @@ def get_workflow_history(workflow_id):
             logger.error(process.stderr)
 
 
-def save_history(code: str = None, status: str = None, log_output: str = None, ):
-    
-    pass
+def generate_history_id():
+    return uuid.uuid4().hex[:18]
+
+
+def save_history(
+    code: str = None,
+    status: str = None,
+    log_output: str = None,
+    process_id: str = None,
+    begin_time=None,
+    end_time=None,
+    history_id: str = None,
+    host_id: str = None,
+    notes: str = None,
+):
+    """
+    Record a run of a process without waiting for it to be written.
+
+    The record is handed to the background history writer, which flushes it in a
+    batch to the server or the local history store, see pgw_history_writer.
+
+    :param code: Code that was run, kept as the history input.
+    :param status: One of the ExecutionStatus constants.
+    :param process_id: Id of the process that was run, required.
+    :param log_output: Output of the run.
+    :param begin_time: datetime or epoch milliseconds, defaults to now.
+    :param end_time: datetime or epoch milliseconds, defaults to now.
+    :return: The history id.
+    """
+    if not process_id:
+        raise ValueError("process_id is required to save a history")
+    now = int(time.time() * 1000)
+    history_id = history_id or generate_history_id()
+    get_history_writer().submit({
+        "history_id": history_id,
+        "history_input": code,
+        "history_output": log_output,
+        "history_begin_time": to_epoch_ms(begin_time) or now,
+        "history_end_time": to_epoch_ms(end_time) or now,
+        "history_notes": notes,
+        "history_process": process_id,
+        "host_id": host_id,
+        "indicator": status or ExecutionStatus.DONE,
+    })
+    return history_id
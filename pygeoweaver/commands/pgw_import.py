@@ -1,10 +1,6 @@
-import subprocess
-from pygeoweaver.utils import (
-    download_geoweaver_jar,
-    get_geoweaver_jar_path,
-    get_java_bin_path,
-    get_root_dir,
-)
+from pygeoweaver.commands.pgw_list import invalidate_lists
+from pygeoweaver.pgw_daemon import run_geoweaver_cli
+from pygeoweaver.utils import download_geoweaver_jar
 
 
 def import_workflow(workflow_zip_file_path):
@@ -17,17 +13,9 @@ def import_workflow(workflow_zip_file_path):
     if not workflow_zip_file_path:
         raise RuntimeError("Workflow zip file path is missing")
     download_geoweaver_jar()
-    subprocess.run(
-        [
-            get_java_bin_path(),
-            "-jar",
-            get_geoweaver_jar_path(),
-            "import",
-            "workflow",
-            workflow_zip_file_path,
-        ],
-        cwd=f"{get_root_dir()}/",
-    )
+    run_geoweaver_cli(["import", "workflow", workflow_zip_file_path])
+    # The workflow comes with its processes
+    invalidate_lists("workflow", "process")
 
 def import_workflow_from_github(git_repo_url):
     raise Exception("This feature is not implemented yet")
@@ -5,6 +5,7 @@ from pygeoweaver.commands.pgw_detail import *
 from pygeoweaver.commands.pgw_list import *
 from pygeoweaver.commands.pgw_export import *
 from pygeoweaver.commands.pgw_history import *
+from pygeoweaver.commands.pgw_analytics import *
 from pygeoweaver.commands.pgw_import import *
 from pygeoweaver.commands.pgw_list import *
 from pygeoweaver.commands.pgw_run import *
@@ -2,63 +2,106 @@ import json
 import logging
 
 import requests
-import subprocess
-from pygeoweaver.constants import *
-from pygeoweaver.config import H2_DOWNLOAD_URL, ORG_H2_TOOLS_RUNSCRIPT, JAVA, ORG_H2_TOOLS_SCRIPT, GEOWEAVER_H2_TEMP, GW_BACKUP_SQL, GW_WORKSPACE
+from pydantic import ValidationError
+from tabulate import tabulate
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.commands.pgw_find import process_catalog
+from pygeoweaver.config import LIST_CACHE_TTL
+from pygeoweaver.database_management.pgw_host import Host
+from pygeoweaver.database_management.pgw_process import GWProcess
+from pygeoweaver.database_management.pgw_workflow import Workflow
+from pygeoweaver.pgw_cache import TTLCache
+from pygeoweaver.pgw_daemon import run_geoweaver_cli
 from pygeoweaver.utils import (
     download_geoweaver_jar,
-    get_geoweaver_jar_path,
-    get_java_bin_path,
-    get_root_dir,
     check_ipython,
     get_spinner,
+    is_interactive,
 )
 import pandas as pd
-from halo import Halo
 
 
 logger = logging.getLogger(__name__)
 
+LIST_MODELS = {
+    "host": Host,
+    "process": GWProcess,
+    "workflow": Workflow,
+}
 
-def list_hosts():
+# Typed results of /web/list, keyed by object type; commands adding objects invalidate their type
+list_cache = TTLCache(ttl=LIST_CACHE_TTL)
+
+
+def invalidate_lists(*object_types):
     """
-    List all hosts in Geoweaver.
+    Drop the cached lists of ``object_types``, and the process catalog when processes changed.
+    """
+    for object_type in object_types:
+        list_cache.invalidate(object_type)
+    if "process" in object_types:
+        process_catalog.invalidate()
 
-    Downloads the Geoweaver JAR, then runs the 'list' command with the '--host' option.
 
-    Note: Requires Geoweaver to be initialized and the JAR file to be available.
+def to_model(model, item):
     """
-    with get_spinner(text=f'Find all registered hosts...', spinner='dots'):
-        download_geoweaver_jar()
-        process = subprocess.run(
-            [get_java_bin_path(), "-jar", get_geoweaver_jar_path(), "list", "--host"],
-            cwd=f"{get_root_dir()}/",
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
+    Build a typed model from a server JSON object, tolerating fields the model does not validate.
+    """
+    try:
+        return model(**item)
+    except ValidationError as e:
+        logger.debug(f"Keeping unvalidated {model.__name__} {item.get('id')}: {e}")
+        construct = getattr(model, "model_construct", None) or model.construct
+        return construct(**item)
 
-    print(process.stdout)
-    if process.stderr:
-        print("=== Error ===")
-        print(process.stderr)
-        logger.error(process.stderr)
+
+def model_to_dict(item):
+    dump = getattr(item, "model_dump", None) or item.dict
+    return dump()
 
 
-def list_processes():
+def fetch_list(object_type, refresh=False):
     """
-    List all processes in Geoweaver.
+    Get all objects of a type from the running server's `/web/list` endpoint as typed models.
 
-    Downloads the Geoweaver JAR, ensures executable permissions, and then runs the 'list' command with the '--process' option.
+    Results are cached in-process for LIST_CACHE_TTL seconds.
 
-    Note: Requires Geoweaver to be initialized and the JAR file to be available.
+    :param object_type: One of "host", "process" or "workflow".
+    :param refresh: Skip the cache and query the server.
+    :raises requests.exceptions.ConnectionError: If the server is not running.
     """
-    with get_spinner(text=f'Find all registered processes...', spinner='dots'):
-        download_geoweaver_jar()
-        subprocess.run(["chmod", "+x", get_geoweaver_jar_path()], cwd=f"{get_root_dir()}/")
-        process = subprocess.run(
-            [get_java_bin_path(), "-jar", get_geoweaver_jar_path(), "list", "--process"],
-            cwd=f"{get_root_dir()}/",
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
+    if object_type not in LIST_MODELS:
+        raise ValueError(f"Unknown object type: {object_type}")
+    if not refresh:
+        cached = list_cache.get(object_type)
+        if cached is not None:
+            return list(cached)
+    response = get_api_client().post("/web/list", data={"type": object_type})
+    response.raise_for_status()
+    model = LIST_MODELS[object_type]
+    items = [to_model(model, item) for item in response.json()]
+    list_cache.set(object_type, items)
+    return list(items)
+
+
+def display_list(items):
+    """
+    Display typed list results as a table.
+    """
+    df = pd.DataFrame([model_to_dict(item) for item in items])
+    if is_interactive():
+        from IPython.display import display
+        display(df)
+    else:
+        print(tabulate(df, headers="keys", tablefmt="psql", showindex=False))
+
+
+def list_via_cli(object_type):
+    """
+    Run the Geoweaver CLI 'list' command. Only used when the server is not reachable.
+    """
+    with get_spinner(text=f'Find all registered {object_type}s via CLI...', spinner='dots'):
+        process = run_geoweaver_cli(["list", f"--{object_type}"], capture_output=True)
 
     print(process.stdout)
     if process.stderr:
@@ -67,6 +110,48 @@ def list_processes():
         logger.error(process.stderr)
 
 
+def list_objects(object_type, refresh=False):
+    """
+    List objects from the running server, falling back to the Geoweaver CLI when it is down.
+    """
+    try:
+        with get_spinner(text=f'Find all registered {object_type}s...', spinner='dots'):
+            items = fetch_list(object_type, refresh=refresh)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        logger.info(f"Geoweaver server is not reachable ({e}), using the CLI instead.")
+        list_via_cli(object_type)
+        return None
+
+    display_list(items)
+    return items
+
+
+def list_hosts(refresh=False):
+    """
+    List all hosts in Geoweaver.
+
+    Queries the running server's `/web/list` endpoint. Falls back to the 'list --host'
+    CLI command when the server is not running.
+
+    :param refresh: Skip the in-process cache.
+    :return: List of Host, or None if the CLI fallback was used.
+    """
+    return list_objects("host", refresh=refresh)
+
+
+def list_processes(refresh=False):
+    """
+    List all processes in Geoweaver.
+
+    Queries the running server's `/web/list` endpoint. Falls back to the 'list --process'
+    CLI command when the server is not running.
+
+    :param refresh: Skip the in-process cache.
+    :return: List of GWProcess, or None if the CLI fallback was used.
+    """
+    return list_objects("process", refresh=refresh)
+
+
 def list_processes_in_workflow(workflow_id):
     """
     List processes in a specific workflow.
@@ -82,9 +167,7 @@ def list_processes_in_workflow(workflow_id):
     with get_spinner(text=f'Find all processes in workflow {workflow_id}...', spinner='dots'):
         download_geoweaver_jar()
         payload = {"id": workflow_id, "type": "workflow"}
-        r = requests.post(
-            f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/detail", data=payload
-        )
+        r = get_api_client().post("/web/detail", data=payload)
         nodes = json.loads(r.json()["nodes"])
         result = [
             {"title": item["title"], "id": item["id"].split(".")[0]} for item in nodes
@@ -95,25 +178,14 @@ def list_processes_in_workflow(workflow_id):
     return result
 
 
-def list_workflows():
+def list_workflows(refresh=False):
     """
     List all workflows in Geoweaver.
 
-    Downloads the Geoweaver JAR, then runs the 'list' command with the '--workflow' option.
+    Queries the running server's `/web/list` endpoint. Falls back to the 'list --workflow'
+    CLI command when the server is not running.
 
-    Note: Requires Geoweaver to be initialized and the JAR file to be available.
+    :param refresh: Skip the in-process cache.
+    :return: List of Workflow, or None if the CLI fallback was used.
     """
-    with get_spinner(text=f'Find all registered workflows...', spinner='dots'):
-        download_geoweaver_jar()
-        process = subprocess.run(
-            [get_java_bin_path(), "-jar", get_geoweaver_jar_path(), "list", "--workflow"],
-            cwd=f"{get_root_dir()}/",
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-    
-    print(process.stdout)
-    if process.stderr:
-        print("=== Error ===")
-        print(process.stderr)
-        logger.error(process.stderr)
-
+    return list_objects("workflow", refresh=refresh)
@@ -1,12 +1,9 @@
 import getpass
 from logging import getLogger
-import subprocess
+from pygeoweaver.pgw_daemon import run_geoweaver_cli
 from pygeoweaver.utils import (
     check_ipython,
     download_geoweaver_jar,
-    get_geoweaver_jar_path,
-    get_java_bin_path,
-    get_root_dir,
 )
 
 logger = getLogger(__name__)
@@ -32,23 +29,7 @@ def reset_password():
     if check_ipython():
         logger.debug("ipython is here")
         password = get_password_twice()
-        subprocess.run(
-            [
-                get_java_bin_path(),
-                "-jar",
-                get_geoweaver_jar_path(),
-                "resetpassword",
-                "-p",
-                password
-            ]
-        )
+        run_geoweaver_cli(["resetpassword", "-p", password])
     else:
         logger.debug("not ipython")
-        subprocess.run(
-            [
-                get_java_bin_path(),
-                "-jar",
-                get_geoweaver_jar_path(),
-                "resetpassword",
-            ]
-        )
+        run_geoweaver_cli(["resetpassword"])
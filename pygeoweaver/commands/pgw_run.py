@@ -1,20 +1,30 @@
 import getpass
 import json
+import logging
 import os
 import subprocess
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
 
-import requests
+import pandas as pd
+import toml
+from tabulate import tabulate
 
-from pygeoweaver.constants import GEOWEAVER_DEFAULT_ENDPOINT_URL
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+from pygeoweaver.pgw_daemon import run_geoweaver_cli
+from pygeoweaver.pgw_job import Job
 from pygeoweaver.utils import (
     download_geoweaver_jar,
-    get_geoweaver_jar_path,
-    get_java_bin_path,
-    get_root_dir,
+    get_home_dir,
     get_spinner,
 )
 from halo import Halo
 
+logger = logging.getLogger(__name__)
+
 
 def run_process(
     *,
@@ -23,6 +33,7 @@ def run_process(
     password: str = None,
     environment: str = None,
     sync_path: os.PathLike = None,
+    wait: bool = True,
 ):
     """
     Run a process
@@ -31,6 +42,7 @@ def run_process(
         host_id - required
         password - optional
         environment - optional
+        wait - optional, set to False to return a Job handle without waiting for the run
     """
     with get_spinner(text=f'Running Geoweaver process {process_id}...', spinner='dots'):
         if password is None:
@@ -44,32 +56,28 @@ def run_process(
             f = open(sync_path, "r")
             context = f.read()
             f.close()
-            details = requests.post(
-                f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/detail",
+            details = get_api_client().post(
+                "/web/detail",
                 data={"type": "process", "id": process_id},
             ).json()
             details["code"] = context
-            requests.post(
-                f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/edit/process",
+            get_api_client().post(
+                "/web/edit/process",
                 data=json.dumps(details),
                 headers={"Content-Type": "application/json"},
             )
 
-        download_geoweaver_jar()
-        subprocess.run(
-            [
-                get_java_bin_path(),
-                "-jar",
-                get_geoweaver_jar_path(),
-                "run",
-                "process",
-                f"--host={host_id}",
-                f"--password={password}",
-                f"--environment={environment}",
-                process_id,
-            ],
-            cwd=f"{get_root_dir()}/",
-        )
+        command = [
+            "run",
+            "process",
+            f"--host={host_id}",
+            f"--password={password}",
+            f"--environment={environment}",
+            process_id,
+        ]
+        if not wait:
+            return Job(command, name=process_id)
+        run_geoweaver_cli(command)
 
 
 def run_workflow(
@@ -81,8 +89,12 @@ def run_workflow(
     host_list: str = None,
     password_list: str = None,
     sync_path: os.PathLike = None,
+    wait: bool = True,
 ):
     """
+    Run a workflow. With ``wait=False`` the run is started in the background and
+    a Job handle is returned right away.
+
     Usage: <main class> run workflow [-d=<workflowFolderPath>]
                                     [-f=<workflowZipPath>] [-e=<envs>]...
                                     [-h=<hostStrings>]... [-p=<passes>]...
@@ -101,77 +113,226 @@ def run_workflow(
 
         if password_list is None:
             # prompt to ask for password
-            password_list = []
-            for host in host_list.split(","):
-                password = getpass.getpass(f"Enter password for host - {host}: ")
-                password_list.append(password)
+            password_list = ",".join(prompt_host_passwords(host_list.split(",")))
         elif len(password_list.split(",")) != len(host_list.split(",")):
             raise RuntimeError("The password list length doesn't match host list")
 
-        password_list = ",".join(password_list)
         if sync_path:
-            from . import sync_workflow
+            from pygeoweaver.commands.pgw_sync import sync_workflow
 
             sync_workflow(workflow_id=workflow_id, sync_to_path=sync_path)
 
-        if not workflow_id and not workflow_folder_path and not workflow_zip_file_path:
-            raise RuntimeError(
-                "Please provide at least one of the three options: workflow id, "
-                "folder path or zip path"
+        command = build_run_workflow_command(
+            workflow_id=workflow_id,
+            workflow_folder_path=workflow_folder_path,
+            workflow_zip_file_path=workflow_zip_file_path,
+            environment_list=environment_list,
+            host_list=host_list,
+            password_list=password_list,
+        )
+        if not wait:
+            return Job(command, name=workflow_id)
+        run_geoweaver_cli(command)
+
+
+def prompt_host_passwords(hosts):
+    """
+    Ask for the password of each host, once per distinct host.
+    """
+    passwords = {}
+    for host in hosts:
+        if host not in passwords:
+            passwords[host] = getpass.getpass(f"Enter password for host - {host}: ")
+    return [passwords[host] for host in hosts]
+
+
+def build_run_workflow_command(
+    *,
+    workflow_id: str,
+    workflow_folder_path: str = None,
+    workflow_zip_file_path: str = None,
+    environment_list: str = None,
+    host_list: str = None,
+    password_list: str = None,
+):
+    """
+    Build the Geoweaver CLI arguments of a 'run workflow' command.
+    """
+    if not workflow_id and not workflow_folder_path and not workflow_zip_file_path:
+        raise RuntimeError(
+            "Please provide at least one of the three options: workflow id, "
+            "folder path or zip path"
+        )
+    if workflow_folder_path and workflow_zip_file_path:
+        raise RuntimeError("Please provide either a workflow folder path or a zip path, not both")
+
+    command = ["run", "workflow", workflow_id]
+    if workflow_folder_path:
+        # command to run workflow from folder
+        command.extend(["-d", workflow_folder_path])
+    elif workflow_zip_file_path:
+        command.extend(["-f", workflow_zip_file_path])
+    command.extend(["-h", host_list, "-p", password_list])
+    if environment_list:
+        command.extend(["-e", environment_list])
+    return command
+
+
+def load_batch_manifest(manifest_path):
+    """
+    Load a batch manifest from a JSON or TOML file.
+
+    JSON manifests are a list of entries or ``{"workflows": [...]}``; TOML manifests
+    use a ``[[workflows]]`` array. Each entry has a ``workflow_id`` and ``hosts``, and
+    optionally ``environments``, ``passwords``, ``workflow_folder_path`` and
+    ``workflow_zip_file_path``. Lists may be given as lists or comma separated strings.
+    """
+    with open(manifest_path, "r") as f:
+        if str(manifest_path).endswith(".toml"):
+            manifest = toml.load(f)
+        else:
+            manifest = json.load(f)
+    if isinstance(manifest, dict):
+        manifest = manifest.get("workflows", [])
+    return manifest
+
+
+def split_id_list(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return list(value)
+
+
+def run_batch_entry(entry, passwords, log_dir, timeout=None, index=0):
+    """
+    Run one manifest entry through the CLI and record its exit code and timing.
+
+    :param index: Position of the entry in the manifest, prefixed to its log file name
+        so the same workflow listed twice gets two logs.
+    """
+    workflow_id = entry["workflow_id"]
+    hosts = split_id_list(entry.get("hosts"))
+    command = build_run_workflow_command(
+        workflow_id=workflow_id,
+        workflow_folder_path=entry.get("workflow_folder_path"),
+        workflow_zip_file_path=entry.get("workflow_zip_file_path"),
+        environment_list=",".join(split_id_list(entry.get("environments"))),
+        host_list=",".join(hosts),
+        password_list=",".join(passwords),
+    )
+    log_file = os.path.join(log_dir, f"{index:03d}-{workflow_id}.log")
+    started_at = datetime.now()
+    start_time = time.perf_counter()
+    try:
+        with open(log_file, "w") as log:
+            process = run_geoweaver_cli(
+                command, use_daemon=False, stdout=log, stderr=subprocess.STDOUT, timeout=timeout
             )
+        exit_code = process.returncode
+    except subprocess.TimeoutExpired:
+        logger.error(f"Workflow {workflow_id} timed out after {timeout} seconds")
+        exit_code = None
+    return {
+        "workflow_id": workflow_id,
+        "hosts": ",".join(hosts),
+        "status": ExecutionStatus.DONE if exit_code == 0 else ExecutionStatus.FAILED,
+        "exit_code": exit_code,
+        "started_at": started_at,
+        "duration_s": round(time.perf_counter() - start_time, 2),
+        "log_file": log_file,
+    }
+
+
+def run_workflows_batch(
+    manifest,
+    *,
+    max_workers: int = 4,
+    per_host_limit: int = 2,
+    host_passwords: dict = None,
+    timeout: float = None,
+):
+    """
+    Run many workflows concurrently.
+
+    Workflows are started as soon as a worker is free and every host they run on
+    has fewer than ``per_host_limit`` running workflows, so a busy host never
+    blocks workflows bound for other hosts.
+
+    :param manifest: Path to a JSON/TOML manifest or a list of entries, see load_batch_manifest.
+    :param max_workers: Maximum number of workflows running at the same time.
+    :param per_host_limit: Maximum number of workflows running on one host at the same time.
+    :param host_passwords: Passwords by host id, for entries without ``passwords``.
+        Missing ones are asked once per host before any workflow starts.
+    :param timeout: Seconds after which a single workflow run is killed.
+    :return: DataFrame summary with one row per entry, in manifest order.
+    """
+    if max_workers < 1 or per_host_limit < 1:
+        raise ValueError("max_workers and per_host_limit must be at least 1")
+    if isinstance(manifest, (str, os.PathLike)):
+        manifest = load_batch_manifest(manifest)
+    entries = list(manifest)
+    host_passwords = dict(host_passwords or {})
+
+    entry_passwords = []
+    for entry in entries:
+        hosts = split_id_list(entry.get("hosts"))
+        passwords = split_id_list(entry.get("passwords"))
+        if not passwords:
+            for host in hosts:
+                if host not in host_passwords:
+                    host_passwords[host] = getpass.getpass(f"Enter password for host - {host}: ")
+            passwords = [host_passwords[host] for host in hosts]
+        elif len(passwords) != len(hosts):
+            raise RuntimeError(f"The password list length doesn't match host list for workflow {entry['workflow_id']}")
+        entry_passwords.append(passwords)
+
+    download_geoweaver_jar()
+    log_dir = os.path.join(get_home_dir(), "geoweaver", "logs", "batch", datetime.now().strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(log_dir, exist_ok=True)
+
+    results = [None] * len(entries)
+    pending = deque(range(len(entries)))
+    running = {}
+    host_load = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # Start every pending entry whose hosts have capacity, keeping manifest order otherwise
+            for index in list(pending):
+                if len(running) >= max_workers:
+                    break
+                hosts = set(split_id_list(entries[index].get("hosts")))
+                if any(host_load.get(host, 0) >= per_host_limit for host in hosts):
+                    continue
+                pending.remove(index)
+                for host in hosts:
+                    host_load[host] = host_load.get(host, 0) + 1
+                future = pool.submit(
+                    run_batch_entry, entries[index], entry_passwords[index], log_dir, timeout, index
+                )
+                running[future] = (index, hosts)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, hosts = running.pop(future)
+                for host in hosts:
+                    host_load[host] -= 1
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    logger.error(f"Workflow {entries[index].get('workflow_id')} could not be started: {e}")
+                    results[index] = {
+                        "workflow_id": entries[index].get("workflow_id"),
+                        "hosts": ",".join(sorted(hosts)),
+                        "status": ExecutionStatus.FAILED,
+                        "exit_code": None,
+                        "started_at": None,
+                        "duration_s": 0.0,
+                        "log_file": None,
+                    }
 
-        if workflow_id and not workflow_folder_path and not workflow_zip_file_path:
-            command = [
-                get_java_bin_path(),
-                "-jar",
-                get_geoweaver_jar_path(),
-                "run",
-                "workflow",
-                workflow_id,
-                "-h",
-                host_list,
-                "-p",
-                password_list,
-            ]
-            if environment_list:
-                command.extend(["-e", environment_list])
-            subprocess.run(command, cwd=f"{get_root_dir()}/")
-
-        if workflow_folder_path and not workflow_zip_file_path:
-            # command to run workflow from folder
-            command = [
-                get_java_bin_path(),
-                "-jar",
-                get_geoweaver_jar_path(),
-                "run",
-                "workflow",
-                workflow_id,
-                "-d",
-                workflow_folder_path,
-                "-h",
-                host_list,
-                "-p",
-                password_list
-            ]
-            if environment_list:
-                command.extend(["-e", environment_list])
-            subprocess.run(command, cwd=f"{get_root_dir()}/")
-
-        if not workflow_folder_path and workflow_zip_file_path:
-            command = [
-                get_java_bin_path(),
-                "-jar",
-                get_geoweaver_jar_path(),
-                "run",
-                "workflow",
-                workflow_id,
-                "-f",
-                workflow_zip_file_path,
-                "-h",
-                host_list,
-                "-p",
-                password_list,
-            ]
-            if environment_list:
-                command.extend(["-e", environment_list])
-            subprocess.run(command, cwd=f"{get_root_dir()}/")
+    summary = pd.DataFrame(results)
+    print(tabulate(summary.drop(columns=["log_file"]), headers="keys", tablefmt="psql", showindex=False))
+    print(f"Logs are in {log_dir}")
+    return summary
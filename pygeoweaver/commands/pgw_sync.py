@@ -1,20 +1,28 @@
 import os
+import hashlib
 import json
+import logging
 import shutil
 import zipfile
 
-import requests
 import typing
 
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.commands.pgw_history import FINISHED_STATUSES, iter_history_records, to_epoch_ms
 from pygeoweaver.constants import *
 from pygeoweaver.utils import (
     download_geoweaver_jar,
-    copy_files,
+    get_home_dir,
     get_spinner,
     safe_exit,
 )
 from halo import Halo
 
+logger = logging.getLogger(__name__)
+
+# Kept in the target folder of sync_workflow: content hashes of synced files and the history watermarks
+MANIFEST_FILE_NAME = ".geoweaver_manifest.json"
+
 
 def overwrite_files(source_dir, destination_dir):
     """
@@ -43,6 +51,153 @@ def overwrite_files(source_dir, destination_dir):
             shutil.copytree(source_path, destination_path)
 
 
+def hash_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(folder):
+    """
+    Manifest of a synced workflow folder, empty if the folder was never synced.
+    """
+    try:
+        with open(os.path.join(folder, MANIFEST_FILE_NAME), "r") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable manifest in {folder}, syncing every file: {e}")
+        manifest = {}
+    manifest.setdefault("files", {})
+    manifest.setdefault("history_watermarks", {})
+    return manifest
+
+
+def save_manifest(folder, manifest):
+    path = os.path.join(folder, MANIFEST_FILE_NAME)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def sync_files(source_folder, destination_folder, manifest, keep=()):
+    """
+    Copy the files of ``source_folder`` whose content changed since the last sync,
+    and remove the synced files that are no longer in it.
+
+    A file is skipped when its sha256 is the one in the manifest and the destination
+    copy still has the size and modification time recorded when it was written.
+    Files gone from the source are removed from the manifest, and from the destination
+    unless they were changed there. The manifest is updated in place.
+
+    :param keep: Prefixes of relative paths that are never removed, e.g. ``("history/",)``
+        when the source does not contain them.
+    :return: (number of files copied, number of files skipped, number of files removed)
+    """
+    copied = skipped = removed = 0
+    files = manifest["files"]
+    seen = set()
+    for root, dirs, names in os.walk(source_folder):
+        for name in names:
+            source_file = os.path.join(root, name)
+            relative_path = os.path.relpath(source_file, source_folder).replace(os.sep, "/")
+            seen.add(relative_path)
+            destination_file = os.path.join(destination_folder, relative_path)
+            digest = hash_file(source_file)
+            entry = files.get(relative_path)
+            try:
+                stat = os.stat(destination_file)
+                unchanged = (
+                    entry is not None
+                    and entry["sha256"] == digest
+                    and entry["size"] == stat.st_size
+                    and entry["mtime_ns"] == stat.st_mtime_ns
+                )
+            except OSError:
+                unchanged = False
+            if unchanged:
+                skipped += 1
+                continue
+            os.makedirs(os.path.dirname(destination_file), exist_ok=True)
+            shutil.copy2(source_file, destination_file)
+            stat = os.stat(destination_file)
+            files[relative_path] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            copied += 1
+
+    for relative_path in [path for path in files if path not in seen]:
+        if relative_path.startswith(tuple(keep)):
+            continue
+        entry = files.pop(relative_path)
+        destination_file = os.path.join(destination_folder, relative_path)
+        try:
+            stat = os.stat(destination_file)
+        except OSError:
+            continue
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            os.remove(destination_file)
+            removed += 1
+        else:
+            logger.warning(f"Keeping {destination_file}: removed from the workflow but changed locally")
+    return copied, skipped, removed
+
+
+def get_workflow_process_ids(workflow_folder):
+    """
+    Ids of the processes in the ``workflow.json`` of a downloaded workflow.
+
+    Workflow node ids are ``<process id>-<instance id>``.
+    """
+    try:
+        with open(os.path.join(workflow_folder, "workflow.json"), "r") as f:
+            workflow = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot read the processes of {workflow_folder}: {e}")
+        return []
+    nodes = workflow.get("nodes") or []
+    if isinstance(nodes, str):
+        nodes = json.loads(nodes)
+    return list(dict.fromkeys(node["id"].rsplit("-", 1)[0] for node in nodes if node.get("id")))
+
+
+def sync_history_records(object_type, object_id, destination_folder, manifest):
+    """
+    Write the history records of a process or workflow that ended since its watermark
+    in the manifest, or are still running, as ``history/<history id>.json`` files.
+
+    :return: Number of history records written.
+    """
+    key = f"{object_type}/{object_id}"
+    watermark = manifest["history_watermarks"].get(key)
+    history_folder = os.path.join(destination_folder, "history")
+    written = 0
+    for page in iter_history_records(object_type, object_id, since=watermark):
+        os.makedirs(history_folder, exist_ok=True)
+        for record in page:
+            with open(os.path.join(history_folder, f"{record['history_id']}.json"), "w") as f:
+                json.dump(record, f, indent=2)
+            end_time = to_epoch_ms(record.get("history_end_time"))
+            if record.get("indicator") in FINISHED_STATUSES and end_time:
+                watermark = max(watermark or 0, end_time)
+            written += 1
+    manifest["history_watermarks"][key] = watermark
+    return written
+
+
+def sync_workflow_history(workflow_id, process_ids, destination_folder, manifest):
+    """
+    Write the new history records of a workflow and of each of its processes.
+
+    :return: Number of history records written.
+    """
+    written = sync_history_records("workflow", workflow_id, destination_folder, manifest)
+    for process_id in process_ids:
+        written += sync_history_records("process", process_id, destination_folder, manifest)
+    return written
+
+
 def sync(process_id: str, local_path: typing.Union[str, os.PathLike], direction: str):
     """
     Sync code for a Geoweaver process between the local machine and the Geoweaver server.
@@ -57,8 +212,8 @@ def sync(process_id: str, local_path: typing.Union[str, os.PathLike], direction:
         if direction == "download":
             if not local_path:
                 raise Exception("Sync path not found.")
-            r = requests.post(
-                f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/detail",
+            r = get_api_client().post(
+                "/web/detail",
                 data={"type": "process", "id": process_id},
             ).json()
             code = r["code"]
@@ -79,15 +234,15 @@ def sync(process_id: str, local_path: typing.Union[str, os.PathLike], direction:
         elif direction == "upload":
             if not local_path:
                 raise Exception("Sync path not found.")
-            process_prev_state = requests.post(
-                f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/detail",
+            process_prev_state = get_api_client().post(
+                "/web/detail",
                 data={"type": "process", "id": process_id},
             ).json()
             with open(local_path, "r") as f:
                 f_content = f.read()
                 process_prev_state["code"] = f_content
-                response = requests.post(
-                    f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/edit/process",
+                response = get_api_client().post(
+                    "/web/edit/process",
                     data=json.dumps(process_prev_state),
                     headers={"Content-Type": "application/json"},
                 )
@@ -100,35 +255,30 @@ def sync(process_id: str, local_path: typing.Union[str, os.PathLike], direction:
                 "Please specify the direction to sync. Choices - [UPLOAD, DOWNLOAD]"
             )
 
-def sync_workflow(workflow_id: str, sync_to_path: typing.Union[str, os.PathLike]):
+def sync_workflow(workflow_id: str, sync_to_path: typing.Union[str, os.PathLike], full_history: bool = False):
     """
     Sync a Geoweaver workflow, including its code and history, between the local machine and the Geoweaver server.
 
+    The sync is incremental: the server packs the workflow with its process code only,
+    files whose content did not change since the last sync are not copied, files removed
+    from the workflow are removed (see MANIFEST_FILE_NAME), and only the history records
+    of the workflow and of its processes that ended since the last sync, or are still
+    running, are fetched and written to ``history/``.
+
     :param workflow_id: The ID of the Geoweaver workflow.
     :param sync_to_path: The local path to sync the Geoweaver workflow.
+    :param full_history: Also download the history of every process run, as the server
+        packs it. Slow for workflows with a long history.
     """
     with get_spinner(text=f'Sync Geoweaver workflow {workflow_id} from database to local folder {sync_to_path}...', 
               spinner='dots'):
         download_geoweaver_jar()
-        # download workflow
-        r = requests.post(
-            f"{GEOWEAVER_DEFAULT_ENDPOINT_URL}/web/downloadworkflow",
-            data=f"id={workflow_id}&option=workflowwithprocesscodeallhistory",
-            headers={
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
-            }
-        )
-        if r.status_code != 200:
-            print("Error: Fail to prepare the workflow folder.")
-            safe_exit(1)
-        home_dir = os.path.expanduser("~")
-        source_folder = os.path.join(home_dir, "gw-workspace", "temp", workflow_id)
         # check if target workflow path and the unzipped workflow match
         if not sync_to_path:
             raise Exception(
                 "Please provide path to workflow that you wish to sync code and history"
             )
-        
+
         target_workflow_json_path = os.path.join(sync_to_path, "workflow.json")
         if os.path.exists(target_workflow_json_path):
             sync_id = json.loads(
@@ -138,7 +288,31 @@ def sync_workflow(workflow_id: str, sync_to_path: typing.Union[str, os.PathLike]
             if workflow_id != sync_id:
                 print("Error: Workflow ID mismatch, please check the existing workflow.json in the `sync_to_path` path.")
                 safe_exit(1)
-        copy_files(
-            source_folder=source_folder, destination_folder=sync_to_path
+                return
+        source_folder = os.path.join(get_home_dir(), "gw-workspace", "temp", workflow_id)
+        # Left over from an earlier download, possibly with another option
+        shutil.rmtree(source_folder, ignore_errors=True)
+        # download workflow
+        option = "workflowwithprocesscodeallhistory" if full_history else "workflowwithprocesscode"
+        r = get_api_client().post(
+            "/web/downloadworkflow",
+            data=f"id={workflow_id}&option={option}",
+            headers={
+                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
+            }
+        )
+        if r.status_code != 200:
+            print("Error: Fail to prepare the workflow folder.")
+            safe_exit(1)
+            return
+
+        manifest = load_manifest(sync_to_path)
+        # History files are only in the download with full_history, never remove them otherwise
+        copied, skipped, removed = sync_files(
+            source_folder, sync_to_path, manifest, keep=() if full_history else ("history/",)
         )
-        print("Sync is complete.")
+        process_ids = get_workflow_process_ids(source_folder)
+        histories = sync_workflow_history(workflow_id, process_ids, sync_to_path, manifest)
+        save_manifest(sync_to_path, manifest)
+        print(f"Sync is complete: {copied} files copied, {skipped} unchanged, {removed} removed, "
+              f"{histories} new history records.")
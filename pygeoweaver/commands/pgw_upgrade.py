@@ -47,16 +47,9 @@ def upgrade_geoweaver(force=False, no_start=False):
             logger.info("Geoweaver is not running.")
     
     # Step 2: Force download the latest Geoweaver JAR file
+    # The existing JAR is kept until the new one is complete and is only
+    # replaced if the server has a newer version.
     jar_path = get_geoweaver_jar_path()
-    if os.path.exists(jar_path):
-        with get_spinner(text="Removing existing Geoweaver JAR file...", spinner="dots"):
-            try:
-                os.remove(jar_path)
-                logger.info(f"Removed existing JAR file at {jar_path}")
-            except Exception as e:
-                logger.error(f"Failed to remove existing JAR file: {str(e)}")
-                return False
-    
     with get_spinner(text="Downloading latest Geoweaver JAR file...", spinner="dots"):
         try:
             download_geoweaver_jar(overwrite=True)
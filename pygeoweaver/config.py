@@ -9,4 +9,64 @@ JAVA = "java"
 ORG_H2_TOOLS_SCRIPT = "org.h2.tools.Script"
 GEOWEAVER_H2_TEMP = "geoweaver_h2_temp"
 GW_BACKUP_SQL = "gw_backup.sql"
-GW_WORKSPACE = "gw-workspace"
\ No newline at end of file
+GW_WORKSPACE = "gw-workspace"
+
+# HTTP client settings for talking to the Geoweaver server
+HTTP_POOL_SIZE = int(os.getenv('GEOWEAVER_HTTP_POOL_SIZE', '10'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('GEOWEAVER_HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('GEOWEAVER_HTTP_READ_TIMEOUT', '60'))
+HTTP_MAX_RETRIES = int(os.getenv('GEOWEAVER_HTTP_MAX_RETRIES', '3'))
+HTTP_BACKOFF_FACTOR = float(os.getenv('GEOWEAVER_HTTP_BACKOFF_FACTOR', '0.3'))
+
+# How long (seconds) results of `list` commands are kept in the in-process cache
+LIST_CACHE_TTL = float(os.getenv('GEOWEAVER_LIST_CACHE_TTL', '30'))
+
+# Seconds before the process catalog used by `find` revalidates against the server
+PROCESS_CATALOG_MAX_AGE = float(os.getenv('GEOWEAVER_PROCESS_CATALOG_MAX_AGE', '30'))
+
+# Seconds a server liveness check result is reused before probing again
+STATUS_CACHE_TTL = float(os.getenv('GEOWEAVER_STATUS_CACHE_TTL', '2'))
+
+# Maximum seconds to wait for a freshly started Geoweaver server to become ready
+STARTUP_TIMEOUT = float(os.getenv('GEOWEAVER_STARTUP_TIMEOUT', '120'))
+
+# Answer CLI commands that have a REST equivalent from the running Geoweaver server
+DAEMON_MODE = os.getenv('GEOWEAVER_DAEMON_MODE', 'true').lower() in ('1', 'true', 'yes')
+
+# Number of history records per chunk when streaming history from the server
+HISTORY_PAGE_SIZE = int(os.getenv('GEOWEAVER_HISTORY_PAGE_SIZE', '1000'))
+
+# Minimum seconds between two syncs of the same history into the local history store
+HISTORY_SYNC_INTERVAL = float(os.getenv('GEOWEAVER_HISTORY_SYNC_INTERVAL', '60'))
+
+# Background writer of histories recorded by runtime tags: queue capacity, records
+# per flush and maximum seconds a record waits before being flushed
+HISTORY_WRITER_QUEUE_SIZE = int(os.getenv('GEOWEAVER_HISTORY_WRITER_QUEUE_SIZE', '10000'))
+HISTORY_WRITER_BATCH_SIZE = int(os.getenv('GEOWEAVER_HISTORY_WRITER_BATCH_SIZE', '500'))
+HISTORY_WRITER_FLUSH_INTERVAL = float(os.getenv('GEOWEAVER_HISTORY_WRITER_FLUSH_INTERVAL', '2'))
+
+# Server endpoint accepting a JSON list of history records; unset keeps them in the local history store
+HISTORY_UPLOAD_ENDPOINT = os.getenv('GEOWEAVER_HISTORY_UPLOAD_ENDPOINT', '')
+
+# Output of @pygeoweaver_process runs: characters kept in memory per stream, and
+# size (bytes) and number of backups of the rotating log file holding the full output
+CAPTURE_BUFFER_SIZE = int(os.getenv('GEOWEAVER_CAPTURE_BUFFER_SIZE', str(64 * 1024)))
+CAPTURE_LOG_MAX_BYTES = int(os.getenv('GEOWEAVER_CAPTURE_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+CAPTURE_LOG_BACKUP_COUNT = int(os.getenv('GEOWEAVER_CAPTURE_LOG_BACKUP_COUNT', '3'))
+
+# Process output logs kept in ~/geoweaver/logs/processes, the oldest beyond the count or age are removed
+CAPTURE_LOG_MAX_FILES = int(os.getenv('GEOWEAVER_CAPTURE_LOG_MAX_FILES', '1000'))
+CAPTURE_LOG_MAX_AGE_DAYS = float(os.getenv('GEOWEAVER_CAPTURE_LOG_MAX_AGE_DAYS', '30'))
+
+# Background job directories kept in ~/geoweaver/jobs, finished jobs beyond the count or age are removed
+JOB_MAX_KEPT = int(os.getenv('GEOWEAVER_JOB_MAX_KEPT', '100'))
+JOB_MAX_AGE_DAYS = float(os.getenv('GEOWEAVER_JOB_MAX_AGE_DAYS', '7'))
+
+# Number of finished decorated workflow runs kept in memory with their process calls
+RUNTIME_MAX_FINISHED_RUNS = int(os.getenv('GEOWEAVER_RUNTIME_MAX_FINISHED_RUNS', '100'))
+
+# Maximum bytes of results kept by @pygeoweaver_process(cache=True) before the least recently used are evicted
+RESULT_CACHE_MAX_BYTES = int(os.getenv('GEOWEAVER_RESULT_CACHE_MAX_BYTES', str(1024 ** 3)))
+
+# Worker processes of the pool shared by @pygeoweaver_process(executor="process"), 0 for one per CPU
+PROCESS_POOL_WORKERS = int(os.getenv('GEOWEAVER_PROCESS_POOL_WORKERS', '0'))
@@ -6,3 +6,4 @@ class ExecutionStatus:
     STOPPED = "Stopped"
     READY = "Ready"
     SKIPPED = "Skipped"
+    CACHED = "Cached"
@@ -4,11 +4,11 @@ from typing import Optional
 
 class History(BaseModel):
     history_id: str
-    history_input: Optional[str]
-    history_output: Optional[str]
-    history_begin_time: Optional[datetime]
-    history_end_time: Optional[datetime]
-    history_notes: Optional[str]
-    history_process: Optional[str]
-    host_id: Optional[str]
-    indicator: Optional[str]
+    history_input: Optional[str] = None
+    history_output: Optional[str] = None
+    history_begin_time: Optional[datetime] = None
+    history_end_time: Optional[datetime] = None
+    history_notes: Optional[str] = None
+    history_process: Optional[str] = None
+    host_id: Optional[str] = None
+    indicator: Optional[str] = None
@@ -1,15 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Set
+from typing import Optional, Set, Union
 
 class Host(BaseModel):
     id: str
-    name: str
-    ip: str
-    port: str
-    username: str
-    owner: str
-    type: str
-    url: str
-    confidential: bool
+    name: Optional[str] = None
+    ip: Optional[str] = None
+    port: Optional[Union[str, int]] = None
+    username: Optional[str] = None
+    owner: Optional[str] = None
+    type: Optional[str] = None
+    url: Optional[str] = None
+    confidential: Optional[Union[bool, str]] = None
     envs: Optional[Set[str]] = None
 
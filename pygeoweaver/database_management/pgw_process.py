@@ -1,12 +1,12 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 
 class GWProcess(BaseModel):
     id: str
-    name: Optional[str]
-    description: Optional[str]
-    code: Optional[str]
-    lang: Optional[str]
-    owner: Optional[str]
-    confidential: Optional[bool]
+    name: Optional[str] = None
+    description: Optional[str] = None
+    code: Optional[str] = None
+    lang: Optional[str] = None
+    owner: Optional[str] = None
+    confidential: Optional[Union[bool, str]] = None
 
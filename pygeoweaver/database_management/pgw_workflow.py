@@ -1,11 +1,11 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 
 class Workflow(BaseModel):
     id: str
-    name: Optional[str]
-    description: Optional[str]
-    owner: Optional[str]
-    confidential: Optional[str]
-    edges: Optional[str]
-    nodes: Optional[str]
+    name: Optional[str] = None
+    description: Optional[str] = None
+    owner: Optional[str] = None
+    confidential: Optional[Union[bool, str]] = None
+    edges: Optional[str] = None
+    nodes: Optional[str] = None
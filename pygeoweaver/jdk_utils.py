@@ -215,16 +215,9 @@ def install_java():
 
 
 def is_java_installed():
-    try:
-        # Check if Java is installed by running "java -version" command
-        subprocess.run(
-            [get_java_bin_path(), "-version"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        return True
-    except:
-        return False
+    # get_java_bin_path has already verified (and cached) a working binary,
+    # so only check that it still exists instead of running "java -version"
+    return shutil.which(get_java_bin_path()) is not None
 
 
 def check_java():
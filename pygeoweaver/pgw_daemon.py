@@ -0,0 +1,138 @@
+"""
+Single entry point for invoking Geoweaver CLI commands.
+
+Starting `java -jar geoweaver.jar <command>` pays the full JVM and Spring
+startup on every call. In daemon mode (GEOWEAVER_DAEMON_MODE, on by default)
+commands that the Geoweaver server can answer over its local HTTP socket are
+sent to the one long-lived server JVM instead, which is started on first use
+and then kept running. Commands without a server equivalent, and every
+command when daemon mode is off, run through the CLI as before.
+"""
+
+import subprocess
+
+import requests
+from tabulate import tabulate
+
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.config import DAEMON_MODE
+from pygeoweaver.pgw_log_config import get_logger
+from pygeoweaver.utils import (
+    download_geoweaver_jar,
+    get_geoweaver_jar_path,
+    get_java_bin_path,
+    get_root_dir,
+)
+
+logger = get_logger(__name__)
+
+
+def format_table(data):
+    """
+    Render a server JSON object or list of objects as a text table.
+    """
+    if isinstance(data, dict):
+        return tabulate(data.items(), headers=["Field", "Value"], tablefmt="psql")
+    return tabulate(data, headers="keys", tablefmt="psql")
+
+
+def post_form(endpoint, data):
+    response = get_api_client().post(endpoint, data=data)
+    response.raise_for_status()
+    return response.json()
+
+
+def detail_route(args):
+    options = {"--process-id": "process", "--workflow-id": "workflow", "--host-id": "host"}
+    for i, arg in enumerate(args[1:], start=1):
+        option, _, value = arg.partition("=")
+        if option in options:
+            object_id = value or (args[i + 1] if i + 1 < len(args) else None)
+            if not object_id:
+                return None
+            return lambda: post_form("/web/detail", {"type": options[option], "id": object_id})
+    return None
+
+
+def history_route(args):
+    if len(args) == 2:
+        return lambda: post_form("/web/log", {"type": "process", "id": args[1]})
+    return None
+
+
+def logs_route(object_type):
+    def route(args):
+        if len(args) == 2:
+            return lambda: post_form("/web/logs", {"type": object_type, "id": args[1]})
+        return None
+    return route
+
+
+# CLI command -> function building the server call for those arguments (or None if unsupported)
+SERVER_ROUTES = {
+    "detail": detail_route,
+    "history": history_route,
+    "process-history": logs_route("process"),
+    "workflow-history": logs_route("workflow"),
+}
+
+
+def get_server_call(args):
+    route = SERVER_ROUTES.get(args[0]) if args else None
+    return route(args) if route else None
+
+
+def invoke_via_server(args, server_call, capture_output=False):
+    """
+    Run a command on the long-lived server JVM and wrap the result like a finished CLI process.
+    """
+    from pygeoweaver.server import ensure_geoweaver_started
+
+    ensure_geoweaver_started()
+    output = format_table(server_call()) + "\n"
+    if not capture_output:
+        print(output, end="")
+        output = None
+    return subprocess.CompletedProcess(args, 0, stdout=output, stderr="" if capture_output else None)
+
+
+def run_geoweaver_cli(args, use_daemon=True, capture_output=False, text=True, **kwargs):
+    """
+    Invoke a Geoweaver CLI command, e.g. ``run_geoweaver_cli(["detail", "--process-id", pid])``.
+
+    In daemon mode, commands the server can answer are sent to the running server
+    instead of starting a new JVM; otherwise, or if that fails, the JAR is run directly.
+
+    :param args: CLI arguments after ``java -jar geoweaver.jar``.
+    :param use_daemon: Set to False to always start the CLI.
+    :param capture_output: Capture stdout and stderr instead of printing them.
+    :return: subprocess.CompletedProcess
+    """
+    server_call = get_server_call(args) if use_daemon and DAEMON_MODE else None
+    if server_call is not None:
+        try:
+            return invoke_via_server(args, server_call, capture_output=capture_output)
+        except (requests.exceptions.RequestException, ValueError, RuntimeError) as e:
+            logger.warning(f"Geoweaver server could not run '{args[0]}', using the CLI instead: {e}")
+
+    kwargs.setdefault("cwd", f"{get_root_dir()}/")
+    if capture_output:
+        kwargs.setdefault("stdout", subprocess.PIPE)
+        kwargs.setdefault("stderr", subprocess.PIPE)
+    return subprocess.run(get_geoweaver_cli_command(args), text=text, **kwargs)
+
+
+def start_geoweaver_cli(args, text=True, **kwargs):
+    """
+    Start a Geoweaver CLI command in the background and return without waiting for it.
+
+    :param args: CLI arguments after ``java -jar geoweaver.jar``.
+    :return: subprocess.Popen
+    """
+    kwargs.setdefault("cwd", f"{get_root_dir()}/")
+    return subprocess.Popen(get_geoweaver_cli_command(args), text=text, **kwargs)
+
+
+def get_geoweaver_cli_command(args):
+    download_geoweaver_jar()
+    return [get_java_bin_path(), "-jar", get_geoweaver_jar_path(), *args]
@@ -0,0 +1,179 @@
+"""
+Local SQLite mirror of Geoweaver process and workflow history.
+
+Records are stored with their times as epoch milliseconds, like the server
+sends them. For every process or workflow the store also keeps a watermark
+(the latest ``history_end_time`` of a finished record) and the time of the
+last sync, so syncing only has to write what is new since the watermark.
+Every record also has an origin: "server" for records mirrored from the
+server, "local" for records only saved here, e.g. by the runtime tags.
+Server records deleted on the server are removed with ``delete_missing``.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from pygeoweaver.utils import get_home_dir
+
+HISTORY_COLUMNS = (
+    "history_id",
+    "history_input",
+    "history_output",
+    "history_begin_time",
+    "history_end_time",
+    "history_notes",
+    "history_process",
+    "host_id",
+    "indicator",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    history_id TEXT NOT NULL,
+    object_type TEXT NOT NULL,
+    object_id TEXT NOT NULL,
+    history_input TEXT,
+    history_output TEXT,
+    history_begin_time INTEGER,
+    history_end_time INTEGER,
+    history_notes TEXT,
+    history_process TEXT,
+    host_id TEXT,
+    indicator TEXT,
+    origin TEXT NOT NULL DEFAULT 'server',
+    PRIMARY KEY (object_type, object_id, history_id)
+);
+CREATE INDEX IF NOT EXISTS history_by_begin_time
+    ON history (object_type, object_id, history_begin_time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    object_type TEXT NOT NULL,
+    object_id TEXT NOT NULL,
+    watermark INTEGER,
+    synced_at REAL,
+    PRIMARY KEY (object_type, object_id)
+);
+"""
+
+
+def get_history_store_path():
+    return os.path.join(get_home_dir(), "geoweaver", "history.db")
+
+
+class HistoryStore:
+    """
+    Thread-safe access to the history database at ``path``.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_history_store_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+            columns = {row["name"] for row in self._connection.execute("PRAGMA table_info(history)")}
+            if "origin" not in columns:
+                # Stores created before records had an origin only held server records
+                self._connection.execute("ALTER TABLE history ADD COLUMN origin TEXT NOT NULL DEFAULT 'server'")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def get_sync_state(self, object_type, object_id):
+        """
+        :return: (watermark, synced_at), both None if the object was never synced.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT watermark, synced_at FROM sync_state WHERE object_type = ? AND object_id = ?",
+                (object_type, object_id),
+            ).fetchone()
+        return (row["watermark"], row["synced_at"]) if row else (None, None)
+
+    def set_sync_state(self, object_type, object_id, watermark, synced_at=None):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_state (object_type, object_id, watermark, synced_at) VALUES (?, ?, ?, ?)",
+                (object_type, object_id, watermark, time.time() if synced_at is None else synced_at),
+            )
+
+    def upsert(self, object_type, object_id, records, origin="server"):
+        """
+        Insert or update history records, given as dicts with HISTORY_COLUMNS keys.
+
+        :param origin: "server" for records mirrored from the server, "local" for
+            records that only exist here and must never be pruned by a sync.
+        :return: Number of records written.
+        """
+        rows = [
+            (object_type, object_id, origin, *(record.get(column) for column in HISTORY_COLUMNS))
+            for record in records
+        ]
+        columns = ", ".join(("object_type", "object_id", "origin") + HISTORY_COLUMNS)
+        placeholders = ", ".join("?" * (len(HISTORY_COLUMNS) + 3))
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO history ({columns}) VALUES ({placeholders})", rows
+            )
+        return len(rows)
+
+    def delete_missing(self, object_type, object_id, history_ids):
+        """
+        Delete the server records of a process or workflow whose id is not in ``history_ids``.
+
+        Local records are kept, the server never had them.
+
+        :return: Number of records deleted.
+        """
+        history_ids = set(history_ids)
+        with self._lock, self._connection:
+            stale = [
+                (object_type, object_id, row["history_id"])
+                for row in self._connection.execute(
+                    "SELECT history_id FROM history WHERE object_type = ? AND object_id = ? AND origin = 'server'",
+                    (object_type, object_id),
+                )
+                if row["history_id"] not in history_ids
+            ]
+            self._connection.executemany(
+                "DELETE FROM history WHERE object_type = ? AND object_id = ? AND history_id = ?", stale
+            )
+        return len(stale)
+
+    def query(self, object_type, object_id, since=None):
+        """
+        Stored history of a process or workflow, oldest first.
+
+        :param since: Epoch milliseconds. Only records that ended at or after it,
+            or have not ended yet, are returned.
+        :return: list of dicts with HISTORY_COLUMNS keys.
+        """
+        sql = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM history WHERE object_type = ? AND object_id = ?"
+        params = [object_type, object_id]
+        if since is not None:
+            sql += " AND (history_end_time IS NULL OR history_end_time >= ?)"
+            params.append(since)
+        sql += " ORDER BY history_begin_time"
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, params)]
+
+
+_history_store = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """
+    Get the module level store shared by all history commands.
+    """
+    global _history_store
+    if _history_store is None:
+        with _history_store_lock:
+            if _history_store is None:
+                _history_store = HistoryStore()
+    return _history_store
@@ -0,0 +1,181 @@
+"""
+Background persistence of histories recorded by the runtime tags.
+
+Records are put on a bounded queue and written by one daemon thread in
+batches, when HISTORY_WRITER_BATCH_SIZE records are waiting or the oldest
+one has waited HISTORY_WRITER_FLUSH_INTERVAL seconds. Callers never wait
+for disk or network: if the queue is full the record is dropped with a
+warning. Records that could not be written are retried with the next batch,
+up to ``max_attempts`` times. The queue is drained when the interpreter exits.
+"""
+
+import atexit
+import queue
+import threading
+import time
+
+import requests
+
+from pygeoweaver.config import (
+    HISTORY_UPLOAD_ENDPOINT,
+    HISTORY_WRITER_BATCH_SIZE,
+    HISTORY_WRITER_FLUSH_INTERVAL,
+    HISTORY_WRITER_QUEUE_SIZE,
+)
+from pygeoweaver.pgw_log_config import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+def write_history_batch(records):
+    """
+    Default sink of the writer: upload the batch to HISTORY_UPLOAD_ENDPOINT when it is
+    configured and the server is running, otherwise keep it in the local history store.
+
+    Records are stored per process, a process whose records cannot be stored does
+    not keep the others from being stored. They are stored as local records, so
+    syncing the process with the server does not prune them.
+
+    :return: The records that could not be saved.
+    """
+    from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+    from pygeoweaver.pgw_history_store import get_history_store
+    from pygeoweaver.server import check_geoweaver_status
+
+    if HISTORY_UPLOAD_ENDPOINT and check_geoweaver_status():
+        try:
+            response = get_api_client().post(HISTORY_UPLOAD_ENDPOINT, json=records)
+            response.raise_for_status()
+            return []
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not upload {len(records)} history records, storing them locally: {e}")
+
+    store = get_history_store()
+    by_process = {}
+    for record in records:
+        by_process.setdefault(record.get("history_process"), []).append(record)
+    failed = []
+    for process_id, process_records in by_process.items():
+        try:
+            store.upsert("process", process_id, process_records, origin="local")
+        except Exception as e:
+            logger.error(f"Could not store {len(process_records)} history records of process {process_id}: {e}")
+            failed.extend(process_records)
+    return failed
+
+
+class HistoryWriter:
+    """
+    A bounded queue of history records flushed in batches by a daemon thread.
+
+    ``sink`` is called with each batch. It may return a list of the records it could
+    not save, or raise to fail the whole batch; failed records go into the next batch
+    until they have been tried ``max_attempts`` times, then are counted in ``failed``.
+    """
+
+    def __init__(self, sink=write_history_batch, max_queue_size=HISTORY_WRITER_QUEUE_SIZE,
+                 batch_size=HISTORY_WRITER_BATCH_SIZE, flush_interval=HISTORY_WRITER_FLUSH_INTERVAL,
+                 max_attempts=3):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.dropped = 0
+        self.failed = 0
+        self._attempts = {}
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._run, name="geoweaver-history-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """
+        Queue a record without blocking.
+
+        :return: False if the queue was full and the record was dropped.
+        """
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"History queue is full, dropped history {record.get('history_id')}")
+            return False
+
+    def close(self, timeout=10):
+        """
+        Flush everything queued so far and stop the writer thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+            if record is _STOP:
+                while batch:
+                    batch = self._flush(batch)
+                return
+            if record is not None:
+                batch.append(record)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                batch = self._flush(batch)
+                deadline = time.monotonic() + self.flush_interval if batch else None
+
+    def _flush(self, batch):
+        """
+        Save a batch.
+
+        :return: The records to retry with the next batch.
+        """
+        if not batch:
+            return []
+        try:
+            failed = self.sink(batch)
+        except Exception as e:
+            logger.error(f"Could not save {len(batch)} history records: {e}")
+            failed = batch
+        if not isinstance(failed, list):
+            failed = []
+        failed_ids = {id(record) for record in failed}
+        for record in batch:
+            if id(record) not in failed_ids:
+                self._attempts.pop(id(record), None)
+        retry = []
+        for record in failed:
+            attempts = self._attempts.get(id(record), 0) + 1
+            if attempts < self.max_attempts:
+                self._attempts[id(record)] = attempts
+                retry.append(record)
+            else:
+                self._attempts.pop(id(record), None)
+                self.failed += 1
+                logger.error(f"Giving up on history {record.get('history_id')} after {attempts} attempts")
+        return retry
+
+
+_history_writer = None
+_history_writer_lock = threading.Lock()
+
+
+def get_history_writer():
+    """
+    Get the module level writer, started on first use and drained at interpreter exit.
+    """
+    global _history_writer
+    if _history_writer is None:
+        with _history_writer_lock:
+            if _history_writer is None:
+                _history_writer = HistoryWriter()
+                atexit.register(_history_writer.close)
+    return _history_writer
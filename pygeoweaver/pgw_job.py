@@ -0,0 +1,249 @@
+"""
+Handles for Geoweaver runs started in the background.
+
+A Job wraps the ``subprocess.Popen`` of a Geoweaver CLI run. Its stdout and
+stderr go straight to log files under ``~/geoweaver/jobs/<job_id>/``, so many
+jobs can run at once without a reader thread per job, and their output can be
+read, streamed or polled at any time, even after the job has finished.
+Directories of finished jobs are removed by ``prune_jobs`` when a new job
+starts, beyond JOB_MAX_KEPT jobs or JOB_MAX_AGE_DAYS days.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+import uuid
+from datetime import datetime
+
+import psutil
+
+from pygeoweaver.config import JOB_MAX_AGE_DAYS, JOB_MAX_KEPT
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+from pygeoweaver.pgw_daemon import start_geoweaver_cli
+from pygeoweaver.pgw_log_config import get_logger
+from pygeoweaver.utils import get_home_dir
+
+logger = get_logger(__name__)
+
+
+PID_FILE_NAME = "job.pid"
+
+
+def get_jobs_dir():
+    return os.path.join(get_home_dir(), "geoweaver", "jobs")
+
+
+def is_job_running(log_dir):
+    """
+    Whether the process recorded in the pid file of a job directory is still alive.
+    """
+    try:
+        with open(os.path.join(log_dir, PID_FILE_NAME)) as f:
+            pid, create_time = f.read().split()
+        # The create time tells a reused pid apart from the job process
+        return abs(psutil.Process(int(pid)).create_time() - float(create_time)) < 1
+    except FileNotFoundError:
+        # Started but not recorded yet
+        return time.time() - os.path.getmtime(log_dir) < 60
+    except (OSError, ValueError, psutil.Error):
+        return False
+
+
+def prune_jobs(jobs_dir=None, max_jobs=None, max_age_days=None):
+    """
+    Remove the directories of finished jobs older than ``max_age_days`` and of the
+    oldest finished jobs beyond ``max_jobs``. Running jobs are never removed.
+
+    A limit of 0 disables it, None uses JOB_MAX_KEPT and JOB_MAX_AGE_DAYS.
+
+    :return: Number of job directories removed.
+    """
+    jobs_dir = jobs_dir or get_jobs_dir()
+    max_jobs = JOB_MAX_KEPT if max_jobs is None else max_jobs
+    max_age_days = JOB_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    try:
+        entries = []
+        for entry in os.scandir(jobs_dir):
+            if entry.is_dir():
+                # Logs are appended to, the latest write tells when the job was last active
+                mtimes = [f.stat().st_mtime for f in os.scandir(entry.path)] or [entry.stat().st_mtime]
+                entries.append((max(mtimes), entry.path))
+    except OSError:
+        return 0
+    entries.sort(reverse=True)
+    expired = time.time() - max_age_days * 86400 if max_age_days else None
+    removed = 0
+    for n, (mtime, path) in enumerate(entries):
+        if (max_jobs and n >= max_jobs) or (expired is not None and mtime < expired):
+            if is_job_running(path):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    if removed:
+        logger.info(f"Removed {removed} finished job directories from {jobs_dir}")
+    return removed
+
+
+class Job:
+    """
+    A Geoweaver run started in the background.
+
+    Usage::
+
+        job = run_workflow(workflow_id="...", host_list="...", password_list="...", wait=False)
+        while job.status() == ExecutionStatus.RUNNING:
+            for line in job.read_new_lines():
+                print(line)
+            time.sleep(1)
+    """
+
+    def __init__(self, args, name=None):
+        """
+        Start the CLI command ``args`` and return immediately.
+
+        :param args: CLI arguments after ``java -jar geoweaver.jar``.
+        :param name: Readable name used in the job id, e.g. the workflow id.
+        """
+        self.args = list(args)
+        self.name = name or args[0]
+        prune_jobs()
+        self.job_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{self.name}-{uuid.uuid4().hex[:6]}"
+        self.log_dir = os.path.join(get_jobs_dir(), self.job_id)
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.stdout_path = os.path.join(self.log_dir, "stdout.log")
+        self.stderr_path = os.path.join(self.log_dir, "stderr.log")
+        self.started_at = datetime.now()
+        self.cancelled = False
+        self._offsets = {"stdout": 0, "stderr": 0}
+
+        # The child keeps its own copies of the file descriptors, ours can be closed right away
+        with open(self.stdout_path, "w") as stdout, open(self.stderr_path, "w") as stderr:
+            self.process = start_geoweaver_cli(self.args, stdout=stdout, stderr=stderr)
+        try:
+            create_time = psutil.Process(self.process.pid).create_time()
+            with open(os.path.join(self.log_dir, PID_FILE_NAME), "w") as f:
+                f.write(f"{self.process.pid} {create_time}")
+        except psutil.Error:
+            # Already gone, nothing to protect from pruning
+            pass
+        logger.info(f"Started job {self.job_id} (pid {self.process.pid})")
+
+    def __repr__(self):
+        return f"Job(job_id={self.job_id!r}, status={self.status()!r})"
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @property
+    def returncode(self):
+        return self.process.poll()
+
+    def status(self):
+        """
+        Current status of the job, one of the ExecutionStatus constants.
+        """
+        returncode = self.process.poll()
+        if returncode is None:
+            return ExecutionStatus.RUNNING
+        if self.cancelled:
+            return ExecutionStatus.STOPPED
+        return ExecutionStatus.DONE if returncode == 0 else ExecutionStatus.FAILED
+
+    def done(self):
+        return self.process.poll() is not None
+
+    def wait(self, timeout=None):
+        """
+        Wait for the job to finish.
+
+        :param timeout: Maximum seconds to wait, None to wait until the job ends.
+        :return: The job status, still ExecutionStatus.RUNNING if the timeout expired.
+        """
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            pass
+        return self.status()
+
+    def cancel(self, grace_period=5):
+        """
+        Stop the job, killing it if it does not exit within ``grace_period`` seconds.
+
+        :return: True if the job was still running.
+        """
+        if self.done():
+            return False
+        self.cancelled = True
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=grace_period)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        logger.info(f"Cancelled job {self.job_id}")
+        return True
+
+    def remove(self):
+        """
+        Delete the log directory of a finished job.
+
+        :return: False if the job is still running and nothing was removed.
+        """
+        if not self.done():
+            return False
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+        return True
+
+    def get_log_path(self, stream):
+        if stream not in self._offsets:
+            raise ValueError("stream must be 'stdout' or 'stderr'")
+        return self.stdout_path if stream == "stdout" else self.stderr_path
+
+    def read_output(self, stream="stdout"):
+        """
+        Everything the job has written to ``stream`` so far.
+        """
+        with open(self.get_log_path(stream), "r", errors="replace") as f:
+            return f.read()
+
+    def read_new_lines(self, stream="stdout"):
+        """
+        Complete lines written to ``stream`` since the previous call, without blocking.
+        """
+        finished = self.done()
+        with open(self.get_log_path(stream), "rb") as f:
+            f.seek(self._offsets[stream])
+            data = f.read()
+        if not finished:
+            # Keep a partially written last line for the next call
+            data = data[: data.rfind(b"\n") + 1]
+        self._offsets[stream] += len(data)
+        return data.decode(errors="replace").splitlines()
+
+    def iter_lines(self, stream="stdout", follow=True, poll_interval=0.2):
+        """
+        Yield the lines of ``stream`` from the start.
+
+        :param follow: Keep yielding new lines until the job ends, like ``tail -f``.
+        """
+        with open(self.get_log_path(stream), "r", errors="replace") as f:
+            buffer = ""
+            while True:
+                finished = self.done()
+                buffer += f.read()
+                *lines, buffer = buffer.split("\n")
+                yield from lines
+                if finished or not follow:
+                    break
+                if not lines:
+                    time.sleep(poll_interval)
+            if buffer:
+                yield buffer
+
+    def stdout_lines(self, follow=True):
+        return self.iter_lines("stdout", follow=follow)
+
+    def stderr_lines(self, follow=True):
+        return self.iter_lines("stderr", follow=follow)
@@ -0,0 +1,276 @@
+"""
+Bounded capture of the console output of decorated processes.
+
+Output written while a process runs is passed through to the console right
+away, appended to a rotating log file with the full output, and kept in
+memory only as the last CAPTURE_BUFFER_SIZE characters per stream. Every run
+with output gets its own log file; the directory keeps the newest
+CAPTURE_LOG_MAX_FILES files of at most CAPTURE_LOG_MAX_AGE_DAYS days.
+
+sys.stdout and sys.stderr are replaced once by dispatching streams that send
+each write to the capture of the process running in the writer's context, so
+processes running at the same time in threads or asyncio tasks do not swap
+the global streams or read each other's output.
+
+Threads do not inherit context variables, so output written by a thread that
+a process starts is not captured unless the thread runs in a copy of the
+process's context::
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(work,)).start()
+
+Executors that copy the context, like ``asyncio.to_thread``, need nothing more.
+"""
+
+import contextlib
+import contextvars
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+from pygeoweaver.config import (
+    CAPTURE_BUFFER_SIZE,
+    CAPTURE_LOG_BACKUP_COUNT,
+    CAPTURE_LOG_MAX_AGE_DAYS,
+    CAPTURE_LOG_MAX_BYTES,
+    CAPTURE_LOG_MAX_FILES,
+)
+from pygeoweaver.utils import get_home_dir
+
+
+current_capture = contextvars.ContextVar("geoweaver_current_capture", default=None)
+
+
+def get_capture_log_dir():
+    return os.path.join(get_home_dir(), "geoweaver", "logs", "processes")
+
+
+def prune_capture_logs(log_dir, max_files=CAPTURE_LOG_MAX_FILES, max_age_days=CAPTURE_LOG_MAX_AGE_DAYS):
+    """
+    Remove the log files older than ``max_age_days`` and the oldest beyond ``max_files``.
+
+    A limit of 0 disables it. Rotated backups count as files.
+
+    :return: Number of files removed.
+    """
+    try:
+        entries = []
+        for entry in os.scandir(log_dir):
+            if entry.is_file():
+                entries.append((entry.stat().st_mtime, entry.path))
+    except OSError:
+        return 0
+    entries.sort(reverse=True)
+    expired = time.time() - max_age_days * 86400 if max_age_days else None
+    removed = 0
+    for n, (mtime, path) in enumerate(entries):
+        if (max_files and n >= max_files) or (expired is not None and mtime < expired):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+_created_logs = {}
+_created_logs_lock = threading.Lock()
+
+
+def log_created(log_dir):
+    """
+    Count a new log file in ``log_dir`` and prune the directory on the first new file and
+    then every tenth of CAPTURE_LOG_MAX_FILES, so it never holds much more than that.
+    """
+    max_files = CAPTURE_LOG_MAX_FILES
+    with _created_logs_lock:
+        count = _created_logs.get(log_dir, 0)
+        _created_logs[log_dir] = count + 1
+    if count % max(1, max_files // 10) == 0:
+        prune_capture_logs(log_dir, max_files=max_files)
+
+
+class RingBuffer:
+    """
+    Keeps the last ``size`` characters written to it.
+    """
+
+    def __init__(self, size=CAPTURE_BUFFER_SIZE):
+        self.size = size
+        self._chunks = deque()
+        self._length = 0
+
+    def append(self, text):
+        self._chunks.append(text)
+        self._length += len(text)
+        while self._length > self.size:
+            excess = self._length - self.size
+            first = self._chunks[0]
+            if len(first) <= excess:
+                self._chunks.popleft()
+                self._length -= len(first)
+            else:
+                self._chunks[0] = first[excess:]
+                self._length -= excess
+
+    def getvalue(self):
+        return "".join(self._chunks)
+
+
+class RotatingLogFile:
+    """
+    A text file that is rotated to ``path.1``, ``path.2``... once it exceeds ``max_bytes``.
+
+    The file is only created on the first write, so runs without output cost no file.
+    """
+
+    def __init__(self, path, max_bytes=CAPTURE_LOG_MAX_BYTES, backup_count=CAPTURE_LOG_BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file = None
+        self._size = 0
+
+    def write(self, text):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8", errors="replace")
+            self._size = self._file.tell()
+        size = len(text.encode("utf-8", errors="replace"))
+        if self.max_bytes and self._size and self._size + size > self.max_bytes:
+            self.rotate()
+        self._file.write(text)
+        self._size += size
+
+    def rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "w", encoding="utf-8", errors="replace")
+        self._size = 0
+
+    @property
+    def created(self):
+        return self._file is not None
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class DispatchingStream:
+    """
+    A stdout/stderr replacement writing to the original stream and to the capture
+    of the process running in the current context, if any.
+    """
+
+    def __init__(self, original, stream):
+        self.original = original
+        self.stream = stream
+
+    def write(self, text):
+        self.original.write(text)
+        capture = current_capture.get()
+        if capture is not None:
+            capture.record(self.stream, text)
+        return len(text)
+
+    def flush(self):
+        self.original.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+
+def install_output_dispatch():
+    """
+    Make sure sys.stdout and sys.stderr dispatch to the current capture.
+
+    Streams replaced later (e.g. by a notebook or a test runner) are wrapped again
+    on the next call. Without a current capture the streams behave as before.
+    """
+    if not isinstance(sys.stdout, DispatchingStream):
+        sys.stdout = DispatchingStream(sys.stdout, "stdout")
+    if not isinstance(sys.stderr, DispatchingStream):
+        sys.stderr = DispatchingStream(sys.stderr, "stderr")
+
+
+class OutputCapture:
+    """
+    Output of one process run: ``stdout`` and ``stderr`` tails sharing one log file.
+
+    Usage::
+
+        capture = OutputCapture("my_process")
+        with capture.activate():
+            ...
+        print(capture.log_path, capture.stdout_tail())
+    """
+
+    def __init__(self, name, buffer_size=CAPTURE_BUFFER_SIZE, max_bytes=CAPTURE_LOG_MAX_BYTES,
+                 backup_count=CAPTURE_LOG_BACKUP_COUNT, log_dir=None):
+        file_name = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}.log"
+        self.log_dir = log_dir or get_capture_log_dir()
+        self.log_path = os.path.join(self.log_dir, file_name)
+        self.log_file = RotatingLogFile(self.log_path, max_bytes=max_bytes, backup_count=backup_count)
+        self.stdout_buffer = RingBuffer(buffer_size)
+        self.stderr_buffer = RingBuffer(buffer_size)
+        self.parent = None
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def record(self, stream, text):
+        with self._lock:
+            if self.closed:
+                return
+            (self.stdout_buffer if stream == "stdout" else self.stderr_buffer).append(text)
+            self.log_file.write(text)
+        if self.parent is not None:
+            # Output of a process called by another process belongs to both
+            self.parent.record(stream, text)
+
+    def flush(self):
+        with self._lock:
+            self.log_file.flush()
+
+    @contextlib.contextmanager
+    def activate(self):
+        """
+        Capture the output written in the current context until the block exits, then close.
+        """
+        install_output_dispatch()
+        self.parent = current_capture.get()
+        token = current_capture.set(self)
+        try:
+            yield self
+        finally:
+            current_capture.reset(token)
+            self.close()
+
+    def stdout_tail(self):
+        return self.stdout_buffer.getvalue()
+
+    def stderr_tail(self):
+        return self.stderr_buffer.getvalue()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.log_file.close()
+        if not self.log_file.created:
+            self.log_path = None
+        else:
+            log_created(self.log_dir)
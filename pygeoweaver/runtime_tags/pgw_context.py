@@ -0,0 +1,155 @@
+"""
+Runtime context of decorated workflows and processes.
+
+Every call of a ``@pygeoweaver_workflow`` function is a WorkflowRun with its
+own run id. The run being executed is held in a ContextVar, so workflows
+running at the same time in different threads or asyncio tasks each record
+their own process calls. Finished runs stay available by run id until more
+than RUNTIME_MAX_FINISHED_RUNS newer runs have finished.
+
+Threads do not inherit context variables: processes called from a thread
+started inside a workflow are attached to it only when the thread runs in a
+copy of the workflow's context, e.g. ``contextvars.copy_context().run(...)``.
+"""
+
+import contextvars
+import threading
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from datetime import datetime
+
+from pygeoweaver.config import RUNTIME_MAX_FINISHED_RUNS
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+
+current_run = contextvars.ContextVar("geoweaver_current_run", default=None)
+
+
+class WorkflowRun:
+    """
+    One execution of a decorated workflow and the process calls made during it.
+
+    ``workflow_id`` tells apart workflows of the same name in different modules.
+    Parallel runs also record the process calls as a DAG: ``nodes`` maps node ids
+    to their process name, process id and status, ``edges`` lists (dependency,
+    dependent) pairs.
+    """
+
+    def __init__(self, workflow_name, workflow_id=None):
+        self.run_id = uuid.uuid4().hex
+        self.workflow_name = workflow_name
+        self.workflow_id = workflow_id or workflow_name
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.process_calls = []
+        self.nodes = {}
+        self.edges = []
+        self.scheduler = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"WorkflowRun(workflow_name={self.workflow_name!r}, run_id={self.run_id!r})"
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def add_process_call(self, call):
+        with self._lock:
+            self.process_calls.append(call)
+
+    def add_node(self, node_id, name, dependencies=(), process_id=None):
+        with self._lock:
+            self.nodes[node_id] = {"name": name, "process_id": process_id, "status": ExecutionStatus.READY}
+            self.edges.extend((dependency, node_id) for dependency in dependencies)
+
+    def set_node_status(self, node_id, status):
+        with self._lock:
+            self.nodes[node_id]["status"] = status
+
+
+class RunRegistry:
+    """
+    Runs by run id: every running run, and the latest ``max_finished`` finished ones.
+    """
+
+    def __init__(self, max_finished=RUNTIME_MAX_FINISHED_RUNS):
+        self.max_finished = max_finished
+        self._runs = OrderedDict()
+        self._finished = deque()
+        self._lock = threading.Lock()
+
+    def start(self, workflow_name, workflow_id=None):
+        run = WorkflowRun(workflow_name, workflow_id)
+        with self._lock:
+            self._runs[run.run_id] = run
+        return run
+
+    def finish(self, run):
+        run.finished_at = datetime.now()
+        run.scheduler = None
+        with self._lock:
+            self._finished.append(run.run_id)
+            while len(self._finished) > self.max_finished:
+                self._runs.pop(self._finished.popleft(), None)
+
+    def get(self, run_id):
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def list(self, workflow_name=None):
+        with self._lock:
+            runs = list(self._runs.values())
+        return [run for run in runs if workflow_name is None or run.workflow_name == workflow_name]
+
+
+run_registry = RunRegistry()
+
+
+def start_run(workflow_name, workflow_id=None):
+    """
+    Register a new run of ``workflow_name`` and make it the current run of this context.
+
+    :return: (run, token), pass both to finish_run.
+    """
+    run = run_registry.start(workflow_name, workflow_id)
+    return run, current_run.set(run)
+
+
+def finish_run(run, token):
+    current_run.reset(token)
+    run_registry.finish(run)
+
+
+def get_current_run():
+    return current_run.get()
+
+
+def get_run(run_id):
+    return run_registry.get(run_id)
+
+
+def get_runs(workflow_name=None):
+    return run_registry.list(workflow_name)
+
+
+class GeoweaverContextView(Mapping):
+    """
+    Read-only view keeping the former ``geoweaver_context`` dict interface:
+    ``current_workflow`` is the workflow name of the current run, and
+    ``process_calls`` maps workflow names to the calls of their latest run.
+    """
+
+    def __getitem__(self, key):
+        if key == "current_workflow":
+            run = get_current_run()
+            return run.workflow_name if run else None
+        if key == "process_calls":
+            return {run.workflow_name: list(run.process_calls) for run in get_runs()}
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(("current_workflow", "process_calls"))
+
+    def __len__(self):
+        return 2
@@ -0,0 +1,176 @@
+"""
+Parallel execution of the processes of a ``@pygeoweaver_workflow(parallel=True)`` run.
+
+In a parallel run, calling a ``@pygeoweaver_process`` function returns a
+ProcessFuture right away. Futures passed as arguments to later process calls,
+also inside lists, tuples, sets and dicts, are the dependencies of those calls.
+A call is started on the run's pool as soon as all of its dependencies are
+done, so independent calls run concurrently. The arguments the process sees
+are the resolved results. The resulting DAG is recorded on the WorkflowRun
+as ``nodes`` and ``edges``.
+
+A ProcessFuture is not a proxy of its result: only futures passed to other
+process calls or returned by the workflow are resolved. Code in the workflow
+body that uses a result directly, e.g. ``load(1) + 1``, has to call
+``.result()`` first, which waits for that process.
+"""
+
+import concurrent.futures
+import contextvars
+import threading
+
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+
+# True while a process runs on a parallel run's pool: processes it calls run inline
+in_parallel_worker = contextvars.ContextVar("geoweaver_in_parallel_worker", default=False)
+
+
+class ProcessFuture:
+    """
+    Result of a process call in a parallel workflow run, see the module docstring.
+    """
+
+    def __init__(self, node_id, name):
+        self.node_id = node_id
+        self.name = name
+        self._future = concurrent.futures.Future()
+
+    def __repr__(self):
+        state = "done" if self.done() else "pending"
+        return f"ProcessFuture({self.node_id!r}, {state})"
+
+    def result(self, timeout=None):
+        """
+        Wait for the process and return its result, or raise its exception.
+        """
+        return self._future.result(timeout)
+
+    def exception(self, timeout=None):
+        return self._future.exception(timeout)
+
+    def done(self):
+        return self._future.done()
+
+    def add_done_callback(self, fn):
+        self._future.add_done_callback(lambda _: fn(self))
+
+
+def find_futures(value, found=None):
+    """
+    ProcessFutures in ``value`` and the lists, tuples, sets and dicts it contains, without duplicates.
+    """
+    found = {} if found is None else found
+    if isinstance(value, ProcessFuture):
+        found[id(value)] = value
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            find_futures(item, found)
+    elif isinstance(value, dict):
+        for item in value.values():
+            find_futures(item, found)
+    return list(found.values())
+
+
+def resolve(value):
+    """
+    Replace the ProcessFutures in ``value`` by their results, waiting for them if needed.
+    """
+    if isinstance(value, ProcessFuture):
+        return value.result()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        resolved = [resolve(item) for item in value]
+        return type(value)(resolved) if not hasattr(value, "_fields") else type(value)(*resolved)
+    if isinstance(value, dict):
+        return type(value)((key, resolve(item)) for key, item in value.items())
+    return value
+
+
+def run_in_worker(fn, args, kwargs):
+    in_parallel_worker.set(True)
+    return fn(*args, **kwargs)
+
+
+class ParallelScheduler:
+    """
+    Starts the process calls of one workflow run on a pool once their dependencies are done.
+    """
+
+    def __init__(self, run, max_workers=None):
+        self.run = run
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"geoweaver-{run.workflow_name}"
+        )
+        self.futures = []
+        self._lock = threading.Lock()
+
+    def submit(self, fn, args, kwargs, name, process_id=None):
+        """
+        Schedule ``fn(*args, **kwargs)`` after the ProcessFutures in its arguments.
+
+        :return: ProcessFuture of the call.
+        """
+        with self._lock:
+            node_id = f"{name}-{len(self.futures) + 1}"
+            future = ProcessFuture(node_id, name)
+            self.futures.append(future)
+        dependencies = find_futures((args, kwargs))
+        self.run.add_node(node_id, name, [dependency.node_id for dependency in dependencies], process_id)
+        # Copied now so the call runs in the context of the workflow that made it
+        context = contextvars.copy_context()
+
+        def start():
+            failed = next((d for d in dependencies if d.exception() is not None), None)
+            if failed is not None:
+                self.run.set_node_status(node_id, ExecutionStatus.SKIPPED)
+                error = RuntimeError(f"{node_id} skipped because {failed.node_id} failed")
+                error.__cause__ = failed.exception()
+                future._future.set_exception(error)
+                return
+            self.run.set_node_status(node_id, ExecutionStatus.RUNNING)
+            task = self.executor.submit(context.run, run_in_worker, fn, resolve(args), resolve(kwargs))
+            task.add_done_callback(lambda task: self._complete(future, task))
+
+        if not dependencies:
+            start()
+        else:
+            remaining = [len(dependencies)]
+            remaining_lock = threading.Lock()
+
+            def on_dependency_done(_):
+                with remaining_lock:
+                    remaining[0] -= 1
+                    ready = remaining[0] == 0
+                if ready:
+                    start()
+
+            for dependency in dependencies:
+                dependency.add_done_callback(on_dependency_done)
+        return future
+
+    def _complete(self, future, task):
+        error = task.exception()
+        if error is None:
+            self.run.set_node_status(future.node_id, ExecutionStatus.DONE)
+            future._future.set_result(task.result())
+        else:
+            self.run.set_node_status(future.node_id, ExecutionStatus.FAILED)
+            future._future.set_exception(error)
+
+    def wait(self):
+        """
+        Wait for every scheduled call, then raise the error of the first one that failed.
+        """
+        while True:
+            with self._lock:
+                futures = list(self.futures)
+            concurrent.futures.wait([future._future for future in futures])
+            with self._lock:
+                if len(futures) == len(self.futures):
+                    break
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                raise error
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
@@ -1,78 +1,222 @@
+import hashlib
 import inspect
-import io
 import logging
+import weakref
+from collections import namedtuple
 from functools import wraps
 import os
-import sys
+import time
 
 from pygeoweaver.commands.pgw_history import save_history
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+from pygeoweaver.runtime_tags.pgw_capture import OutputCapture
+from pygeoweaver.runtime_tags.pgw_context import GeoweaverContextView, get_current_run
+from pygeoweaver.runtime_tags.pgw_parallel import in_parallel_worker
+from pygeoweaver.runtime_tags.pgw_process_pool import call_in_process_pool, is_process_worker
+from pygeoweaver.runtime_tags.pgw_profile import finish_profile, start_profile
+from pygeoweaver.runtime_tags.pgw_result_cache import get_result_cache
 
 logger = logging.getLogger(__name__)
 
-# Global context for tracking
-geoweaver_context = {
-    'current_workflow': None,
-    'process_calls': {}
-}
+# Read-only view of the runtime context, the runs themselves live in pgw_context
+geoweaver_context = GeoweaverContextView()
 
+ProcessInfo = namedtuple("ProcessInfo", ["name", "process_id", "code", "code_hash"])
 
-def pygeoweaver_process(func):
-    
-    @wraps(func)
-    def wrapper(*args, **kwargs):
+# Source, id and code hash of decorated functions, computed once per function object
+process_info_cache = weakref.WeakKeyDictionary()
+
+
+def get_module_name(func):
+    """
+    Name of the file that defines ``func`` without its extension, or its module name.
+    """
+    try:
+        source_file = inspect.getsourcefile(func) or inspect.getfile(func)
+        return os.path.splitext(os.path.basename(source_file))[0]
+    except TypeError:
+        return func.__module__
+
+
+def get_process_info(func):
+    """
+    Get the name, Geoweaver process id, source code and code hash of a function.
+
+    The process id is ``<module file name>.<function name>``. The code hash is the
+    sha256 of the source, or of the bytecode when the source is not available.
+    """
+    info = process_info_cache.get(func)
+    if info is None:
         func_name = func.__name__
-        current_file = inspect.getfile(inspect.currentframe())
-        current_file = os.path.basename(current_file)
-        current_file_without_extension = os.path.splitext(current_file)[0]
+        module_name = get_module_name(func)
         try:
             # Capture the source code of the wrapped function
             func_code = inspect.getsource(func)
-        except OSError:
+            code_hash = hashlib.sha256(func_code.encode()).hexdigest()
+        except (OSError, TypeError):
             func_code = f"# Source code not available for {func_name}"
+            code_hash = hashlib.sha256(func.__code__.co_code).hexdigest()
+        info = ProcessInfo(func_name, f"{module_name}.{func_name}", func_code, code_hash)
+        process_info_cache[func] = info
+        logger.debug("this process id should be unique: %s", info.process_id)
+    return info
+
+
+def start_process_call(func):
+    func_name, geoweaver_process_id, func_code, code_hash = get_process_info(func)
+    logger.debug("geoweaver captured %s", func_name)
+    return {
+        "info": (func_name, geoweaver_process_id, func_code, code_hash),
+        # Console output: streamed to the console and a rotating log file, only the tail kept in memory
+        "capture": OutputCapture(geoweaver_process_id),
+        "begin_time": int(time.time() * 1000),
+        "profile": start_profile(),
+    }
+
+
+def finish_process_call(call, status, error=None, outcome=None):
+    """
+    Save the history of a process call and add it to the current workflow run.
+
+    :param outcome: Outcome of a call run in a worker process, see pgw_process_pool,
+        whose output and profile replace the ones of this process.
+    """
+    func_name, geoweaver_process_id, func_code, code_hash = call["info"]
+    if outcome is None:
+        profile = finish_profile(call["profile"], error)
+        capture = call["capture"]
+        stdout_content = capture.stdout_tail()
+        stderr_content = capture.stderr_tail()
+        log_path = capture.log_path
+    else:
+        profile = outcome["profile"]
+        stdout_content = outcome["stdout"]
+        stderr_content = outcome["stderr"]
+        log_path = outcome["log_path"]
+    if stderr_content:
+        logger.error(f"Standard Error (last {len(stderr_content)} characters):\n{stderr_content}")
+
+    logger.debug("Finished %s, output in %s", func_name, log_path)
+
+    # Queued for the background history writer, never blocks on I/O
+    history_id = save_history(
+        code=func_code,
+        status=status,
+        log_output=f"{stdout_content}\n{stderr_content}",
+        process_id=geoweaver_process_id,
+        begin_time=call["begin_time"],
+        notes=f"Code hash: {code_hash}" + (f". Full output: {log_path}" if log_path else ""),
+    )
+
+    run = get_current_run()
+    if run is not None:
+        run.add_process_call({
+            'name': func_name,
+            'process_id': geoweaver_process_id,
+            'history_id': history_id,
+            'run_id': run.run_id,
+            'status': status,
+            'code': func_code,
+            'code_hash': code_hash,
+            'log': f"{stdout_content}\n{stderr_content}",
+            'log_file': log_path,
+            **profile,
+        })
+
+
+def pygeoweaver_process(func=None, *, cache=False, executor=None):
+    """
+    Record every call of ``func`` as a Geoweaver process run: its output, status and
+    history, attached to the workflow run of the calling context. Works on plain
+    functions and on ``async def`` coroutines.
+
+    Inside a ``@pygeoweaver_workflow(parallel=True)`` run, calls of plain functions
+    return a ProcessFuture and run on the workflow's pool, see pgw_parallel.
+
+    Output of threads the function starts is captured only if they run in a copy of
+    its context, see pgw_capture.
+
+    Usage::
+
+        @pygeoweaver_process
+        def step(): ...
+
+        @pygeoweaver_process(cache=True)
+        def expensive_step(tile): ...
+
+    :param cache: Reuse the result of an earlier call with the same code and arguments
+        from the on-disk result cache, see pgw_result_cache. Hits are recorded with
+        the ExecutionStatus.CACHED status. Calls whose arguments or result cannot be
+        pickled, and ``async def`` processes, always run.
+    :param executor: None to run in the calling thread, or ``"process"`` to run each call
+        on the process pool shared by all processes, see pgw_process_pool, for CPU-bound
+        steps. The function must be defined at module level; calls whose arguments
+        cannot be pickled run in the calling thread instead. Ignored for ``async def``
+        processes and for calls made by a process already running in a worker.
+    """
+    if executor not in (None, "process"):
+        raise ValueError(f"Unknown executor {executor!r}, expected None or 'process'")
+    if func is None:
+        return lambda f: pygeoweaver_process(f, cache=cache, executor=executor)
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            call = start_process_call(func)
+            try:
+                with call["capture"].activate():
+                    result = await func(*args, **kwargs)
+            except BaseException as e:
+                finish_process_call(call, ExecutionStatus.FAILED, error=e)
+                raise
+            finish_process_call(call, ExecutionStatus.DONE)
+            return result
+
+        return async_wrapper
+
+    def run_process(*args, **kwargs):
+        call = start_process_call(func)
+        cache_key = get_result_cache().make_key(call["info"][1], call["info"][3], args, kwargs) if cache else None
+        if cache_key is not None:
+            hit, result = get_result_cache().get(cache_key)
+            if hit:
+                # Nothing ran, closing the unused capture clears its log path
+                call["capture"].close()
+                finish_process_call(call, ExecutionStatus.CACHED)
+                return result
+
+        outcome = None
+        if executor == "process" and not is_process_worker():
+            outcome = call_in_process_pool(func, call["info"][1], args, kwargs)
+        if outcome is not None:
+            if outcome["error"] is not None:
+                finish_process_call(call, ExecutionStatus.FAILED, outcome=outcome)
+                raise outcome["error"]
+            result = outcome["result"]
+            finish_process_call(call, ExecutionStatus.DONE, outcome=outcome)
+            if cache_key is not None:
+                get_result_cache().set(cache_key, result)
+            return result
 
-        geoweaver_process_id = f"{current_file_without_extension}.{func_name}"
-        logger.info("this process id should be unique: %s", geoweaver_process_id)
-        
-        # Capture logging output
-        logger.info(f"geoweaver captured {func_name}")
-
-        # Capture console output
-        captured_stdout = io.StringIO()
-        captured_stderr = io.StringIO()
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        sys.stdout = captured_stdout
-        sys.stderr = captured_stderr
-        
         try:
-            result = func(*args, **kwargs)
-        finally:
-            # Restore standard output and error
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
-
-            # Log the captured output
-            stdout_content = captured_stdout.getvalue()
-            stderr_content = captured_stderr.getvalue()
-            if stdout_content:
-                logger.info(f"Standard Output:\n{stdout_content}")
-                print(stdout_content)
-            if stderr_content:
-                logger.error(f"Standard Error:\n{stderr_content}")
-                print(stderr_content)
-
-            logger.info(f"Finished {func_name}")
-            
-        current_workflow = geoweaver_context['current_workflow']
-        if current_workflow:
-            if current_workflow not in geoweaver_context['process_calls']:
-                geoweaver_context['process_calls'][current_workflow] = []
-            geoweaver_context['process_calls'][current_workflow].append({
-                'name': func_name,
-                'code': func_code,
-                'log': f"{stdout_content}\n{stderr_content}"
-            })
-            
+            with call["capture"].activate():
+                result = func(*args, **kwargs)
+        except BaseException as e:
+            finish_process_call(call, ExecutionStatus.FAILED, error=e)
+            raise
+        finish_process_call(call, ExecutionStatus.DONE)
+        if cache_key is not None:
+            get_result_cache().set(cache_key, result)
         return result
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        run = get_current_run()
+        if run is not None and run.scheduler is not None and not in_parallel_worker.get():
+            # Parallel workflow run: schedule the call and return a ProcessFuture
+            return run.scheduler.submit(
+                run_process, args, kwargs, name=func.__name__, process_id=get_process_info(func).process_id
+            )
+        return run_process(*args, **kwargs)
     
     return wrapper
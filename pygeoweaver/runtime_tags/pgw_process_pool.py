@@ -0,0 +1,178 @@
+"""
+Shared process pool of ``@pygeoweaver_process(executor="process")`` calls.
+
+The decorated function is looked up by module and qualified name in the
+worker, so it has to be defined at module level, and its arguments and
+result have to be picklable.
+
+A call runs in the calling process instead when nothing can have run yet: its
+function is defined in ``__main__`` (scripts, notebooks), its arguments cannot
+be pickled, or the worker cannot find its function. Once the function started
+in a worker the call never runs again, and a result that cannot be pickled
+fails it.
+
+In the worker the call runs with its own output capture and collects the log
+records it emits. Its result, output tails, log file, log records, profile and
+exception are shipped back to the calling process, which records them in the
+workflow context like any other call.
+"""
+
+import atexit
+import concurrent.futures
+import importlib
+import logging
+import pickle
+import threading
+from collections import deque
+
+from pygeoweaver.config import PROCESS_POOL_WORKERS
+from pygeoweaver.runtime_tags.pgw_capture import OutputCapture
+from pygeoweaver.runtime_tags.pgw_profile import finish_profile, start_profile
+
+logger = logging.getLogger(__name__)
+
+# Set in pool workers, where processes called by a dispatched process run inline
+in_process_worker = False
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def init_worker():
+    global in_process_worker
+    in_process_worker = True
+
+
+def is_process_worker():
+    return in_process_worker
+
+
+def get_process_pool():
+    """
+    Get the pool shared by all process calls, created on first use and shut down at exit.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=PROCESS_POOL_WORKERS or None, initializer=init_worker
+                )
+                atexit.register(shutdown_process_pool)
+    return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True)
+            _process_pool = None
+
+
+class LogRecordCollector(logging.Handler):
+    """
+    Keeps the last ``capacity`` log records as (logger name, level, message) tuples.
+    """
+
+    def __init__(self, capacity=1000):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.records.append((record.name, record.levelno, self.format(record)))
+        except Exception:
+            self.handleError(record)
+
+
+def resolve_function(module_name, qualname):
+    target = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        target = getattr(target, name)
+    # The module attribute is the decorated wrapper, run the original function
+    return getattr(target, "__wrapped__", target)
+
+
+def picklable_error(error):
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def run_in_worker_process(module_name, qualname, process_id, args, kwargs):
+    """
+    Run a decorated function in a pool worker and return everything the caller records.
+    """
+    try:
+        func = resolve_function(module_name, qualname)
+    except Exception as e:
+        # Nothing ran, the caller can run the function itself
+        return {"unresolved": f"{type(e).__name__}: {e}"}
+    capture = OutputCapture(process_id)
+    collector = LogRecordCollector()
+    root_logger = logging.getLogger()
+    root_logger.addHandler(collector)
+    profile = start_profile()
+    result = error = None
+    try:
+        with capture.activate():
+            result = func(*args, **kwargs)
+    except Exception as e:
+        error = e
+    finally:
+        root_logger.removeHandler(collector)
+    data = None
+    if error is None:
+        try:
+            data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            error = TypeError(f"Result of {qualname} cannot be sent back from the worker process: {e}")
+    return {
+        "result": data,
+        "error": picklable_error(error) if error is not None else None,
+        "profile": finish_profile(profile, error),
+        "stdout": capture.stdout_tail(),
+        "stderr": capture.stderr_tail(),
+        "log_path": capture.log_path,
+        "log_records": list(collector.records),
+    }
+
+
+def call_in_process_pool(func, process_id, args, kwargs):
+    """
+    Run ``func(*args, **kwargs)`` on the shared pool and wait for it.
+
+    Log records emitted in the worker are re-emitted here by loggers of the same name.
+
+    :return: The outcome of run_in_worker_process with the result unpickled, or None if
+        the call cannot be run by a worker (local function, function of ``__main__``,
+        arguments that cannot be pickled, or a function the worker cannot find), in
+        which case it did not run.
+    """
+    if "<locals>" in func.__qualname__:
+        logger.warning(f"{func.__qualname__} is not defined at module level, running it in this process")
+        return None
+    if func.__module__ == "__main__":
+        # Workers started with spawn, or forked before the definition, do not have it
+        logger.warning(f"{func.__qualname__} is defined in __main__, running it in this process")
+        return None
+    try:
+        pickle.dumps((args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        logger.warning(f"Arguments of {func.__qualname__} cannot be sent to a worker process, running it in this process: {e}")
+        return None
+    # Once submitted the call may have run, so errors from here on are never retried
+    outcome = get_process_pool().submit(
+        run_in_worker_process, func.__module__, func.__qualname__, process_id, args, kwargs
+    ).result()
+    if "unresolved" in outcome:
+        logger.warning(f"Worker process could not find {func.__qualname__}, running it in this process: {outcome['unresolved']}")
+        return None
+    if outcome["result"] is not None:
+        outcome["result"] = pickle.loads(outcome["result"])
+    for name, level, message in outcome["log_records"]:
+        logging.getLogger(name).log(level, message)
+    return outcome
@@ -0,0 +1,100 @@
+"""
+Resource usage of decorated process calls and timing tables of workflow runs.
+"""
+
+import os
+import time
+import traceback
+
+import pandas as pd
+import psutil
+
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_process = None
+
+
+def get_psutil_process():
+    global _process
+    # Re-created after a fork, a psutil.Process is bound to one pid
+    if _process is None or _process.pid != os.getpid():
+        _process = psutil.Process()
+    return _process
+
+
+def get_memory_usage():
+    """
+    :return: (rss, peak rss) of this process in bytes.
+    """
+    memory = get_psutil_process().memory_info()
+    peak = getattr(memory, "peak_wset", None)
+    if peak is None and resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak = max_rss if psutil.MACOS else max_rss * 1024
+    return memory.rss, peak or memory.rss
+
+
+def start_profile():
+    rss, peak = get_memory_usage()
+    return {
+        "wall": time.perf_counter(),
+        "cpu": time.thread_time(),
+        "rss": rss,
+        "peak_rss": peak,
+    }
+
+
+def finish_profile(profile, error=None):
+    """
+    Usage of a call since start_profile, as the profiling fields of a process call.
+
+    CPU time is the time of the calling thread. The peak RSS delta is how much the
+    peak memory of the whole process grew during the call, 0 if it did not.
+    """
+    rss, peak = get_memory_usage()
+    return {
+        "wall_s": time.perf_counter() - profile["wall"],
+        "cpu_s": time.thread_time() - profile["cpu"],
+        "rss_delta": rss - profile["rss"],
+        "peak_rss_delta": max(0, peak - profile["peak_rss"]),
+        "exception": f"{type(error).__name__}: {error}" if error is not None else None,
+        "traceback": "".join(traceback.format_exception(type(error), error, error.__traceback__)) if error is not None else None,
+    }
+
+
+def timing_table(process_calls):
+    """
+    Aggregate profiled process calls per process, slowest total wall time first.
+
+    :return: DataFrame indexed by process name with ``calls``, ``failed``, ``cached``,
+        ``total_wall_s``, ``mean_wall_s``, ``max_wall_s``, ``total_cpu_s``,
+        ``max_peak_rss_delta_mb`` and ``wall_share`` (fraction of all process wall time).
+    """
+    columns = ["calls", "failed", "cached", "total_wall_s", "mean_wall_s", "max_wall_s",
+               "total_cpu_s", "max_peak_rss_delta_mb", "wall_share"]
+    if not process_calls:
+        return pd.DataFrame(columns=columns).rename_axis("name")
+    df = pd.DataFrame(process_calls)
+    table = df.assign(
+        failed=df["exception"].notna(),
+        cached=df["status"] == ExecutionStatus.CACHED,
+        peak_rss_delta_mb=df["peak_rss_delta"] / 2 ** 20,
+    ).groupby("name").agg(
+        calls=("wall_s", "size"),
+        failed=("failed", "sum"),
+        cached=("cached", "sum"),
+        total_wall_s=("wall_s", "sum"),
+        mean_wall_s=("wall_s", "mean"),
+        max_wall_s=("wall_s", "max"),
+        total_cpu_s=("cpu_s", "sum"),
+        max_peak_rss_delta_mb=("peak_rss_delta_mb", "max"),
+    )
+    total = table["total_wall_s"].sum()
+    table["wall_share"] = table["total_wall_s"] / total if total else 0.0
+    return table.sort_values("total_wall_s", ascending=False)[columns]
@@ -0,0 +1,208 @@
+"""
+Publish the processes and graph of a decorated workflow run to the Geoweaver server.
+
+Every distinct process called during the run becomes a Geoweaver process, and
+the run itself a workflow whose nodes are the process calls of a parallel run,
+or the distinct processes of a sequential run. Processes and
+workflows are told apart by their ``<module>.<name>`` ids. The server ids and
+code hashes of published objects are kept in ``~/geoweaver/published.json``, so
+publishing again only edits the processes whose code changed, and the workflow
+only when its graph changed. Requests go concurrently through the pooled API client.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.commands.pgw_create import ProcessData, WorkflowData
+from pygeoweaver.commands.pgw_list import invalidate_lists, model_to_dict
+from pygeoweaver.config import HTTP_POOL_SIZE
+from pygeoweaver.constants import COMMON_API_HEADER
+from pygeoweaver.server import ensure_geoweaver_started
+from pygeoweaver.utils import get_home_dir
+
+logger = logging.getLogger(__name__)
+
+_state_lock = threading.Lock()
+
+
+def get_publish_state_path():
+    return os.path.join(get_home_dir(), "geoweaver", "published.json")
+
+
+def load_publish_state(path):
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable publish state {path}: {e}")
+        state = {}
+    state.setdefault("processes", {})
+    state.setdefault("workflows", {})
+    return state
+
+
+def save_publish_state(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def post_object(kind, data, object_id=None):
+    """
+    Add a process or workflow, or edit it when ``object_id`` is given.
+
+    :return: The server id of the object.
+    """
+    payload = dict(model_to_dict(data), id=object_id) if object_id else model_to_dict(data)
+    action = "edit" if object_id else "add"
+    r = get_api_client().post(f"/web/{action}/{kind}", data=json.dumps(payload), headers=COMMON_API_HEADER)
+    r.raise_for_status()
+    invalidate_lists(kind)
+    if object_id:
+        return object_id
+    return r.json()["id"]
+
+
+def get_run_processes(run):
+    """
+    Latest call of every distinct process of a run, by local process id.
+    """
+    processes = {}
+    for call in run.process_calls:
+        processes[call["process_id"]] = call
+    return processes
+
+
+def build_workflow_graph(run, server_ids):
+    """
+    Geoweaver nodes and edges of a run.
+
+    Parallel runs use the DAG recorded by the scheduler, its edges are the data
+    dependencies between process calls. Sequential runs do not record dependencies:
+    they get one node per distinct process, and one edge per distinct pair of
+    processes called one after the other, so a process called in a loop is one
+    node and the graph does not change with the number of calls.
+
+    :param server_ids: Server process ids by local process id.
+    """
+    if run.nodes:
+        calls = [(node_id, node["name"], node["process_id"]) for node_id, node in run.nodes.items()]
+        edges = list(run.edges)
+    else:
+        calls = {}
+        edges = {}
+        previous = None
+        for call in run.process_calls:
+            process_id = call["process_id"]
+            calls.setdefault(process_id, (process_id, call["name"], process_id))
+            if previous is not None and previous != process_id:
+                edges.setdefault((previous, process_id), None)
+            previous = process_id
+        calls = list(calls.values())
+        edges = list(edges)
+
+    # Geoweaver node ids are "<process id>-<instance id>"
+    instance_ids = {
+        node_id: f"{server_ids[process_id]}-{hashlib.sha1(node_id.encode()).hexdigest()[:6]}"
+        for node_id, _, process_id in calls if process_id in server_ids
+    }
+    nodes = [
+        {"id": instance_ids[node_id], "title": name, "x": 150 * (n % 8), "y": 100 * (n // 8)}
+        for n, (node_id, name, _) in enumerate(calls) if node_id in instance_ids
+    ]
+    edges = [
+        {"source": {"id": instance_ids[source]}, "target": {"id": instance_ids[target]}}
+        for source, target in edges if source in instance_ids and target in instance_ids
+    ]
+    return nodes, edges
+
+
+def publish_run(run, max_workers=HTTP_POOL_SIZE, state_path=None):
+    """
+    Create or update the processes and the workflow of a finished run on the server.
+
+    Processes whose code hash is the one last published are skipped, the others are
+    sent at the same time, at most ``max_workers`` at once. The workflow is published
+    once all of its processes are.
+
+    :return: Dict with ``processes`` mapping local process ids to their server id and
+        action ("created", "updated", "unchanged" or "failed"), and ``workflow`` with
+        the server id and action of the workflow.
+    """
+    state_path = state_path or get_publish_state_path()
+    ensure_geoweaver_started()
+    processes = get_run_processes(run)
+    with _state_lock:
+        state = load_publish_state(state_path)
+    published = state["processes"]
+    process_updates = {}
+    workflow_updates = {}
+
+    def publish_process(process_id, call):
+        previous = published.get(process_id, {})
+        if previous.get("id") and previous.get("code_hash") == call["code_hash"]:
+            return process_id, previous["id"], "unchanged"
+        data = ProcessData(
+            lang="python",
+            description=f"{call['name']} of workflow {run.workflow_name}",
+            name=call["name"],
+            code=call["code"],
+        )
+        try:
+            server_id = post_object("process", data, previous.get("id"))
+        except Exception as e:
+            logger.error(f"Could not publish process {process_id}: {e}")
+            return process_id, previous.get("id"), "failed"
+        return process_id, server_id, "updated" if previous.get("id") else "created"
+
+    summary = {"processes": {}, "workflow": None}
+    if processes:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(processes)))) as pool:
+            results = list(pool.map(lambda item: publish_process(*item), processes.items()))
+        for process_id, server_id, action in results:
+            summary["processes"][process_id] = {"id": server_id, "action": action}
+            if action in ("created", "updated"):
+                process_updates[process_id] = {"id": server_id, "code_hash": processes[process_id]["code_hash"]}
+
+    if any(process["action"] == "failed" for process in summary["processes"].values()):
+        logger.error(f"Not publishing workflow {run.workflow_name}, some of its processes failed")
+        summary["workflow"] = {"id": state["workflows"].get(run.workflow_id, {}).get("id"), "action": "failed"}
+    else:
+        server_ids = {process_id: process["id"] for process_id, process in summary["processes"].items()}
+        nodes, edges = build_workflow_graph(run, server_ids)
+        graph_hash = hashlib.sha256(json.dumps([nodes, edges], sort_keys=True).encode()).hexdigest()
+        previous = state["workflows"].get(run.workflow_id, {})
+        if previous.get("id") and previous.get("graph_hash") == graph_hash:
+            summary["workflow"] = {"id": previous["id"], "action": "unchanged"}
+        else:
+            data = WorkflowData(
+                description=f"Published from the {run.workflow_name} workflow function",
+                name=run.workflow_name,
+                nodes=json.dumps(nodes),
+                edges=json.dumps(edges),
+            )
+            try:
+                server_id = post_object("workflow", data, previous.get("id"))
+                workflow_updates[run.workflow_id] = {"id": server_id, "graph_hash": graph_hash}
+                summary["workflow"] = {"id": server_id, "action": "updated" if previous.get("id") else "created"}
+            except Exception as e:
+                logger.error(f"Could not publish workflow {run.workflow_name}: {e}")
+                summary["workflow"] = {"id": previous.get("id"), "action": "failed"}
+
+    if process_updates or workflow_updates:
+        with _state_lock:
+            # Merged into the latest state, another run may have published meanwhile
+            latest = load_publish_state(state_path)
+            latest["processes"].update(process_updates)
+            latest["workflows"].update(workflow_updates)
+            save_publish_state(state_path, latest)
+    return summary
@@ -0,0 +1,155 @@
+"""
+On-disk cache of the results of ``@pygeoweaver_process(cache=True)`` calls.
+
+Results are pickled under ``~/gw-workspace/result_cache``, addressed by the
+sha256 of the process id, the function's code hash and its pickled arguments,
+so a cached result is reused only by the same process while neither its code
+nor the inputs change. Reading
+an entry refreshes its modification time; once the cache grows beyond
+``max_bytes`` the least recently used entries are removed.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import uuid
+
+from pygeoweaver.config import GW_WORKSPACE, RESULT_CACHE_MAX_BYTES
+from pygeoweaver.utils import get_home_dir
+
+logger = logging.getLogger(__name__)
+
+
+def get_result_cache_dir():
+    return os.path.join(get_home_dir(), GW_WORKSPACE, "result_cache")
+
+
+class ResultCache:
+    """
+    Pickled results stored as ``<root>/<key[:2]>/<key>.pkl`` with LRU eviction.
+    """
+
+    def __init__(self, root=None, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.root = root or get_result_cache_dir()
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def make_key(self, process_id, code_hash, args, kwargs):
+        """
+        Key of a call, or None if its arguments cannot be pickled.
+
+        The process id keeps apart processes with the same code in different modules.
+        """
+        try:
+            arguments = pickle.dumps((args, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Arguments cannot be pickled, not caching: {e}")
+            return None
+        return hashlib.sha256(f"{process_id}\0{code_hash}\0".encode() + arguments).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def get(self, key):
+        """
+        :return: (True, result) on a hit, (False, None) otherwise.
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {path}: {e}")
+            self.remove(path)
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, result
+
+    def set(self, key, result):
+        """
+        Store a result, silently skipping results that cannot be pickled.
+        """
+        try:
+            data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Result cannot be pickled, not caching: {e}")
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            if self._size is None:
+                self._size = self.scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self.evict()
+        return True
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def list_entries(self):
+        entries = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".pkl"):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def scan_size(self):
+        return sum(size for _, size, _ in self.list_entries())
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache is at most 80% of ``max_bytes``.
+        """
+        entries = sorted(self.list_entries())
+        size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.8
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            self.remove(path)
+            size -= entry_size
+        self._size = size
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self.list_entries():
+                self.remove(path)
+            self._size = 0
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache()
+    return _result_cache
@@ -1,43 +1,138 @@
+import asyncio
 import inspect
-import io
 import logging
 from functools import wraps
-import os
-import sys
 
-from pygeoweaver.runtime_tags.pgw_process import geoweaver_context
+from tabulate import tabulate
+
+from pygeoweaver.runtime_tags.pgw_context import finish_run, start_run
+from pygeoweaver.runtime_tags.pgw_process import get_module_name
+from pygeoweaver.runtime_tags.pgw_parallel import ParallelScheduler, resolve
+from pygeoweaver.runtime_tags.pgw_profile import timing_table
+from pygeoweaver.runtime_tags.pgw_publish import publish_run
 
 
 logger = logging.getLogger(__name__)
 
 
-def pygeoweaver_workflow(func):
+def print_timing_table(run, table):
+    print(f"Workflow {run.workflow_name} (run {run.run_id}) took "
+          f"{(run.finished_at - run.started_at).total_seconds():.3f}s")
+    # Records keep the integer columns integers, a DataFrame would be upcast to floats
+    print(tabulate(table.reset_index().to_dict("records"), headers="keys", tablefmt="psql", floatfmt=".3f"))
+
+
+def pygeoweaver_workflow(func=None, *, parallel=False, max_workers=None, report="print", publish=False):
+    """
+    Record every call of ``func`` as a workflow run with its own run id.
+
+    Process calls made while it runs are attached to that run only, also when
+    several workflows run at the same time in threads or asyncio tasks. Works on
+    plain functions and on ``async def`` coroutines.
+
+    Usage::
+
+        @pygeoweaver_workflow
+        def workflow(): ...
+
+        @pygeoweaver_workflow(parallel=True, max_workers=8)
+        def fan_out(tiles):
+            results = [process_tile(tile) for tile in tiles]  # ProcessFutures, running concurrently
+            return merge(results)  # starts once every process_tile call is done
+
+    :param parallel: Make process calls return ProcessFutures and run each one on a
+        thread pool as soon as the futures it gets as arguments are done. Futures in
+        the arguments of other process calls and in the value returned by the workflow
+        are replaced by their results; anywhere else in the body a ProcessFuture is not
+        its result, call ``.result()`` on it, which waits for the process.
+    :param max_workers: Size of the pool of a parallel run.
+    :param report: What to do with the timing table of the run (see pgw_profile.timing_table):
+        "print" it, "return" it with the result as ``(result, table)``, or None to do neither.
+        The code, logs and profile of every call stay available on the WorkflowRun.
+    :param publish: After every run, create or update its processes and workflow graph on
+        the Geoweaver server in one batched step, skipping processes whose code did not
+        change, see pgw_publish. Publishing errors are logged and never fail the run.
+    """
+    if report not in ("print", "return", None):
+        raise ValueError('report must be "print", "return" or None')
+    if func is None:
+        return lambda f: pygeoweaver_workflow(
+            f, parallel=parallel, max_workers=max_workers, report=report, publish=publish
+        )
+
+    def report_run(run, result):
+        if publish:
+            try:
+                publish_run(run)
+            except Exception as e:
+                logger.error(f"Could not publish workflow {run.workflow_name}: {e}")
+        if report is None:
+            return result
+        table = timing_table(run.process_calls)
+        if report == "return":
+            return result, table
+        print_timing_table(run, table)
+        return result
+
+    def start(name):
+        run, token = start_run(name, workflow_id=f"{get_module_name(func)}.{name}")
+        if parallel:
+            run.scheduler = ParallelScheduler(run, max_workers=max_workers)
+        return run, token
+
+    def settle(run, result, failed=False):
+        """
+        Wait for the process calls of a parallel run and resolve the futures in its result.
+
+        When the workflow body itself ``failed``, the errors of its process calls are
+        only logged so the body's exception is the one raised.
+        """
+        scheduler = run.scheduler
+        if scheduler is None:
+            return result
+        try:
+            try:
+                scheduler.wait()
+            except Exception as e:
+                if not failed:
+                    raise
+                logger.error(f"Process call of workflow {run.workflow_name} failed: {e}")
+            return result if failed else resolve(result)
+        finally:
+            scheduler.shutdown()
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            run, token = start(func.__name__)
+            loop = asyncio.get_running_loop()
+            try:
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException:
+                    await loop.run_in_executor(None, settle, run, None, True)
+                    raise
+                # Waiting for the scheduler blocks, keep it off the event loop
+                result = await loop.run_in_executor(None, settle, run, result)
+            finally:
+                finish_run(run, token)
+            return report_run(run, result)
+
+        return async_wrapper
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        workflow_name = func.__name__
-        
-        # Set the current workflow in context
-        geoweaver_context['current_workflow'] = workflow_name
-        
-        # Execute the workflow function
-        result = func(*args, **kwargs)
-        
-        # Clear the current workflow in context
-        geoweaver_context['current_workflow'] = None
-        
-        # Retrieve the process calls for this workflow
-        process_calls = geoweaver_context['process_calls'].get(workflow_name, [])
-        
-        # Print process calls (for demonstration)
-        for call in process_calls:
-            print(f"Process Name: {call['name']}")
-            print("Source Code:")
-            print(call['code'])
-            print("Logs:")
-            print(call['log'])
-            print("-" * 40)
-        
-        return result
+        run, token = start(func.__name__)
+        try:
+            try:
+                # Execute the workflow function
+                result = func(*args, **kwargs)
+            except BaseException:
+                settle(run, None, failed=True)
+                raise
+            result = settle(run, result)
+        finally:
+            finish_run(run, token)
+        return report_run(run, result)
     
     return wrapper
-
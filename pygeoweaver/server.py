@@ -1,4 +1,5 @@
 import os
+import re
 import socket
 import subprocess
 import sys
@@ -8,13 +9,17 @@ import psutil
 import requests
 from halo import Halo
 
+from pygeoweaver.api_call.pgw_base_api_caller import get_api_client
+from pygeoweaver.config import STARTUP_TIMEOUT, STATUS_CACHE_TTL
 from pygeoweaver.constants import GEOWEAVER_DEFAULT_ENDPOINT_URL
 from pygeoweaver.jdk_utils import check_java
+from pygeoweaver.pgw_cache import TTLCache
 from pygeoweaver.pgw_log_config import get_logger
 from pygeoweaver.utils import (
     check_ipython,
     check_os,
     download_geoweaver_jar,
+    get_geoweaver_port,
     get_log_file_path,
     get_module_absolute_path,
     get_root_dir,
@@ -34,33 +39,173 @@ logger = get_logger(__name__)
 # Get the user's home directory
 home_dir = os.path.expanduser("~")
 
+status_cache = TTLCache(ttl=STATUS_CACHE_TTL)
 
-def check_geoweaver_status() -> bool:
+
+def get_pid_file_path():
+    """
+    Get the path of the PID file written when pygeoweaver starts Geoweaver.
+    """
+    return os.path.join(home_dir, "geoweaver", "geoweaver.pid")
+
+
+def write_pid_file(pid):
+    pid_file = get_pid_file_path()
+    os.makedirs(os.path.dirname(pid_file), exist_ok=True)
+    with open(pid_file, "w") as f:
+        f.write(str(pid))
+
+
+def read_pid_file():
+    try:
+        with open(get_pid_file_path(), "r") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def remove_pid_file():
+    try:
+        os.remove(get_pid_file_path())
+    except FileNotFoundError:
+        pass
+
+
+def check_pid_file() -> bool:
+    """
+    Check if the process recorded in the PID file is a live Geoweaver server.
+    Stale PID files are removed.
+    """
+    pid = read_pid_file()
+    if pid is None:
+        return False
+    try:
+        # Compare the command line too, in case the PID was reused by another process
+        cmdline = " ".join(psutil.Process(pid).cmdline())
+        if "geoweaver.jar" in cmdline or "GeoweaverApplication" in cmdline:
+            return True
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        pass
+    remove_pid_file()
+    return False
+
+
+def check_geoweaver_port(host="localhost", port=None, timeout=0.2) -> bool:
+    """
+    Check if something accepts TCP connections on the Geoweaver port.
+    """
+    port = int(port or get_geoweaver_port())
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def check_geoweaver_http(timeout=2) -> bool:
+    """
+    Check if the Geoweaver web endpoint answers.
+    """
+    try:
+        response = get_api_client().get("", allow_redirects=False, timeout=timeout)
+        return response.status_code in (200, 302)
+    except requests.exceptions.RequestException:
+        return False
+
+
+def probe_geoweaver() -> bool:
+    """
+    Layered liveness check, cheapest first: the PID file written by `start`,
+    then a TCP connect to GEOWEAVER_PORT, then an HTTP request to confirm
+    the port is served by Geoweaver.
+    """
+    if check_pid_file():
+        return True
+    if not check_geoweaver_port():
+        return False
+    return check_geoweaver_http()
+
+
+def invalidate_geoweaver_status():
+    status_cache.invalidate()
+
+
+def check_geoweaver_status(use_cache: bool = True) -> bool:
     """
     Check if geoweaver is running
+
+    The result is reused for GEOWEAVER_STATUS_CACHE_TTL seconds unless use_cache is False.
+    """
+    geoweaver_running = status_cache.get("running") if use_cache else None
+    if geoweaver_running is None:
+        geoweaver_running = probe_geoweaver()
+        status_cache.set("running", geoweaver_running)
+
+    if geoweaver_running:
+        logger.info("Geoweaver is running.")
+    else:
+        logger.info("Geoweaver is not running.")
+    return geoweaver_running
+
+
+# Spring Boot logs e.g. "Started GeoweaverApplication in 8.123 seconds (JVM running for 9.4)"
+STARTED_LOG_PATTERN = re.compile(rb"Started \w+ in [\d.]+ seconds")
+
+
+def read_new_log_lines(log_path, offset):
+    """
+    Read the complete lines appended to a log file since ``offset``.
+
+    :return: (bytes of the new complete lines, new offset)
     """
     try:
-        # Run 'ps' command to list all processes
-        ps_output = subprocess.check_output(['ps', 'aux']).decode('utf-8').splitlines()
-        
-        # Check each line of ps output for 'geoweaver.jar'
-        geoweaver_running = False
-        for line in ps_output:
-            if 'geoweaver.jar' in line:
-                geoweaver_running = True
+        with open(log_path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+    except OSError:
+        return b"", offset
+    # Leave a trailing partial line for the next read
+    end = chunk.rfind(b"\n") + 1
+    return chunk[:end], offset + end
+
+
+def wait_for_geoweaver_ready(server_process=None, log_path=None, timeout=STARTUP_TIMEOUT,
+                             initial_delay=0.05, max_delay=1.0):
+    """
+    Wait until a starting Geoweaver server is ready.
+
+    Tails the server log for Spring Boot's "Started" line and probes the port,
+    backing off exponentially from ``initial_delay`` to ``max_delay`` between
+    checks. Returns as soon as the server is up, or early if the server process exits.
+
+    :param server_process: The Popen of the starting server, if known.
+    :param log_path: The log file the server writes its stdout to, if any.
+    :param timeout: Maximum seconds to wait.
+    :return: The measured startup time in seconds, or None if the server did not come up.
+    """
+    start_time = time.monotonic()
+    log_offset = 0
+    delay = initial_delay
+    while True:
+        if log_path:
+            new_lines, log_offset = read_new_log_lines(log_path, log_offset)
+            if STARTED_LOG_PATTERN.search(new_lines):
                 break
-        
-        if geoweaver_running:
-            logger.info("Geoweaver is running.")
-            return True
-        else:
-            logger.info("Geoweaver is not running.")
-            return False
-    
-    except subprocess.CalledProcessError as e:
-        err_msg = f"Error checking Geoweaver status: {e}"
-        logger.error(err_msg)
-        raise ValueError(err_msg)
+        if check_geoweaver_port() and check_geoweaver_http():
+            break
+        if server_process is not None and server_process.poll() is not None:
+            logger.error(f"Geoweaver exited with code {server_process.returncode} during startup")
+            return None
+        remaining = timeout - (time.monotonic() - start_time)
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+    startup_time = time.monotonic() - start_time
+    logger.info(f"Geoweaver started in {startup_time:.2f} seconds")
+    invalidate_geoweaver_status()
+    return startup_time
 
 
 def start_on_windows(force_restart=False, force_download=False, exit_on_finish=True):
@@ -84,29 +229,21 @@ def start_on_windows(force_restart=False, force_download=False, exit_on_finish=T
     with get_spinner(text=f'Starting Geowaever...', spinner='dots'):
         geoweaver_jar = os.path.join(home_dir, "geoweaver.jar")
         print(f'"{java_cmd}" -jar "{geoweaver_jar}"')
-        subprocess.Popen([java_cmd, "-jar", geoweaver_jar], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NEW_CONSOLE)
-
-        status = 0
-        counter = 0
-        max_attempts = 20
-        retry_delay = 2
-        while counter < max_attempts:
-            time.sleep(retry_delay)
-            counter += 1
-            try:
-                response = requests.get(GEOWEAVER_DEFAULT_ENDPOINT_URL, allow_redirects=False)
-                if response.status_code == 302:
-                    log_file = get_log_file_path()
-                    # Now you can safely open the log file for reading
-                    with open(log_file, "r") as f:
-                        print(f.read())
-                    print("Success: Geoweaver is up")
-                    if exit_on_finish:
-                        safe_exit(0)
-            except Exception as e:
-                # print(f"Error occurred during request: {e}")
-                continue
-
+        server_process = subprocess.Popen([java_cmd, "-jar", geoweaver_jar], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NEW_CONSOLE)
+        write_pid_file(server_process.pid)
+        invalidate_geoweaver_status()
+
+        startup_time = wait_for_geoweaver_ready(server_process=server_process)
+
+    if startup_time is not None:
+        log_file = get_log_file_path()
+        # Now you can safely open the log file for reading
+        with open(log_file, "r") as f:
+            print(f.read())
+        print(f"Success: Geoweaver is up (started in {startup_time:.1f}s)")
+        if exit_on_finish:
+            safe_exit(0)
+    else:
         print("Error: Geoweaver is not up")
         if exit_on_finish:
             safe_exit(1)
@@ -115,6 +252,8 @@ def start_on_windows(force_restart=False, force_download=False, exit_on_finish=T
 def stop_on_windows():
     print("Stopping Geoweaver...")
     subprocess.run(["taskkill", "/f", "/im", "java.exe"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    remove_pid_file()
+    invalidate_geoweaver_status()
     print("Geoweaver stopped successfully.")
 
 
@@ -154,35 +293,24 @@ def start_on_mac_linux(force_restart: bool=False, force_download: bool=False, ex
         cmds = [java_path, "-jar", os.path.expanduser("~/geoweaver.jar")]
         logger.info("Running %s", " ".join(cmds))
         with open(os.path.expanduser("~/geoweaver.log"), 'w') as log_file:
-            subprocess.Popen(cmds, 
+            server_process = subprocess.Popen(cmds, 
                             stdout=log_file, 
                             stderr=subprocess.STDOUT)
+        write_pid_file(server_process.pid)
+        invalidate_geoweaver_status()
 
-        # Wait for Geoweaver to start
-        time.sleep(2)  # Adjust as necessary
+        startup_time = wait_for_geoweaver_ready(
+            server_process=server_process, log_path=os.path.expanduser("~/geoweaver.log")
+        )
 
-        status = 0
-        counter = 0
-        max_counter = 10
-        while counter != max_counter:  # max wait for 20 seconds
-            try:
-                status = requests.get(GEOWEAVER_DEFAULT_ENDPOINT_URL).status_code
-                logger.debug(f"Received code {status}")
-                if status == 302 or status == 200:
-                    break
-            except requests.exceptions.ConnectionError:
-                pass  # Connection error, retrying
-            time.sleep(2)
-            counter += 1
-
-        if counter == max_counter:
-            print("Error: Geoweaver is not up")
-            if exit_on_finish:
-                safe_exit(1)
-        else:
-            print("Success: Geoweaver is up")
-            if exit_on_finish:
-                safe_exit(0)
+    if startup_time is None:
+        print("Error: Geoweaver is not up")
+        if exit_on_finish:
+            safe_exit(1)
+    else:
+        print(f"Success: Geoweaver is up (started in {startup_time:.1f}s)")
+        if exit_on_finish:
+            safe_exit(0)
 
 
 def find_geoweaver_processes(current_uid):
@@ -213,6 +341,8 @@ def stop_on_mac_linux(exit_on_finish: bool = False) -> int:
 
         # Find all processes running geoweaver.jar or GeoweaverApplication that are started by the current user
         processes = find_geoweaver_processes(current_uid)
+        remove_pid_file()
+        invalidate_geoweaver_status()
 
         if not processes:
             print("No running Geoweaver processes found for the current user.")
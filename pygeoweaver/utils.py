@@ -1,6 +1,9 @@
 import os
 import sys
+import json
+import stat
 import shutil
+import hashlib
 import logging
 import subprocess
 import requests
@@ -105,30 +108,11 @@ def detect_rc_file():
 
 def get_java_bin_from_which():
     """
-    Get the path of the Java binary using the 'which' command.
+    Get the path of the Java binary on the PATH, like the 'which' command.
     """
-    system = platform.system()
-
-    if system == "Darwin" or system == "Linux":
-        try:
-            # Source ~/.bashrc (Assuming it's a non-login shell)
-            bashrc_path = detect_rc_file()
-            subprocess.run(["bash", "-c", f"source {bashrc_path}"])
-
-            # Check the location of Java executable
-            result = subprocess.run(["which", "java"], capture_output=True, text=True)
-            java_bin_path = result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            print(f"Command execution failed: {e.output}")
-            return None
-    elif system == "Windows":
-        # Check the location of Java executable
-        result = subprocess.run(["where", "java"], capture_output=True, text=True)
-        java_bin_path = result.stdout.strip()
-        
-    else:
-        print("Unsupported platform.")
-
+    java_bin_path = shutil.which("java")
+    if java_bin_path is None:
+        print("Java is not found on the PATH.")
     return java_bin_path
 
 
@@ -144,7 +128,100 @@ def check_java_in_default_env(java_exe="java"):
         # If 'java' is found but there is an issue with execution
         return False
 
+def get_java_cache_file_path():
+    """
+    Get the path of the file that persists resolved Java binaries between runs.
+    """
+    return os.path.join(get_home_dir(), "geoweaver", "java_bin_cache.json")
+
+
+# In-process copy of the Java cache file, keyed like the file entries
+java_bin_cache = {}
+
+
+def get_java_cache_key(java_exe):
+    """
+    Resolution depends on PATH and JAVA_HOME, so both are part of the key.
+    """
+    return "|".join([os.environ.get("PATH", ""), os.environ.get("JAVA_HOME", ""), java_exe])
+
+
+def resolve_java_executable(java_bin_path):
+    """
+    Get the absolute path of a Java binary, which may be a bare command name.
+    """
+    if os.path.isabs(java_bin_path):
+        return java_bin_path if os.path.isfile(java_bin_path) else None
+    return shutil.which(java_bin_path)
+
+
+def load_java_bin_cache():
+    try:
+        with open(get_java_cache_file_path(), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_cached_java_bin_path(java_exe="java"):
+    """
+    Get a previously resolved Java binary if PATH, JAVA_HOME and the binary's mtime are unchanged.
+    """
+    key = get_java_cache_key(java_exe)
+    entry = java_bin_cache.get(key)
+    if entry is None:
+        entry = load_java_bin_cache().get(key)
+    if entry is None:
+        return None
+    try:
+        if os.path.getmtime(entry["executable"]) != entry["mtime"]:
+            return None
+    except (OSError, KeyError):
+        return None
+    java_bin_cache[key] = entry
+    return entry["java_bin_path"]
+
+
+def save_cached_java_bin_path(java_exe, java_bin_path):
+    executable = resolve_java_executable(java_bin_path)
+    if executable is None:
+        return
+    key = get_java_cache_key(java_exe)
+    entry = {
+        "java_bin_path": java_bin_path,
+        "executable": executable,
+        "mtime": os.path.getmtime(executable),
+    }
+    java_bin_cache[key] = entry
+    cache = load_java_bin_cache()
+    cache[key] = entry
+    cache_file = get_java_cache_file_path()
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.debug(f"Could not write Java cache file {cache_file}: {e}")
+
+
 def get_java_bin_path(java_exe="java"):
+    """
+    Get the Java binary to run Geoweaver with.
+
+    A successful resolution is cached in memory and in ~/geoweaver/java_bin_cache.json,
+    keyed on PATH, JAVA_HOME and the binary's mtime, so later calls skip the
+    'java -version' subprocess and the directory walk.
+    """
+    java_bin_path = get_cached_java_bin_path(java_exe)
+    if java_bin_path is None:
+        java_bin_path = find_java_bin_path(java_exe)
+        save_cached_java_bin_path(java_exe, java_bin_path)
+    return java_bin_path
+
+
+def find_java_bin_path(java_exe="java"):
     java_bin_path = None
     home_dir = get_home_dir()
 
@@ -213,31 +290,174 @@ def check_geoweaver_jar():
     return os.path.isfile(get_geoweaver_jar_path())
 
 
+def get_geoweaver_jar_checksum_path():
+    """
+    Get the path of the SHA-256 sidecar of the Geoweaver JAR file.
+    """
+    return f"{get_geoweaver_jar_path()}.sha256"
+
+
+def get_geoweaver_jar_metadata_path():
+    """
+    Get the path of the file recording the HTTP validators of the downloaded JAR.
+    """
+    return f"{get_geoweaver_jar_path()}.meta.json"
+
+
+def read_geoweaver_jar_metadata():
+    try:
+        with open(get_geoweaver_jar_metadata_path(), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_geoweaver_jar_metadata(metadata):
+    with open(get_geoweaver_jar_metadata_path(), "w") as f:
+        json.dump(metadata, f)
+
+
+def compute_sha256(file_path, chunk_size=1024 * 1024):
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def verify_geoweaver_jar():
+    """
+    Check the Geoweaver JAR file against its SHA-256 sidecar.
+    A JAR without a sidecar (e.g. downloaded by an older version) is trusted.
+    """
+    try:
+        with open(get_geoweaver_jar_checksum_path(), "r") as f:
+            expected = f.read().split()[0]
+    except (OSError, IndexError):
+        return True
+    return compute_sha256(get_geoweaver_jar_path()) == expected
+
+
+def ensure_geoweaver_jar_executable():
+    if platform.system() == "Windows":  # Windows files are exec by default
+        return
+    jar_path = get_geoweaver_jar_path()
+    mode = os.stat(jar_path).st_mode
+    if not mode & stat.S_IXUSR:
+        os.chmod(jar_path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def fetch_geoweaver_jar(revalidate=False, chunk_size=1024 * 1024):
+    """
+    Stream the Geoweaver JAR into ``geoweaver.jar.part`` and atomically move it into place.
+
+    An interrupted download is resumed with an HTTP Range request as long as the
+    server still serves the same file (If-Range). With ``revalidate`` the existing
+    JAR is only replaced if the server reports a change since the stored ETag or
+    Last-Modified date.
+
+    :return: True if a new JAR was written, False if the existing one is up to date.
+    """
+    jar_path = get_geoweaver_jar_path()
+    part_path = f"{jar_path}.part"
+    metadata = read_geoweaver_jar_metadata()
+    headers = {}
+
+    resume_from = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+    if resume_from and metadata.get("partial_etag"):
+        headers["Range"] = f"bytes={resume_from}-"
+        headers["If-Range"] = metadata["partial_etag"]
+    elif revalidate:
+        resume_from = 0
+        if metadata.get("etag"):
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            headers["If-Modified-Since"] = metadata["last_modified"]
+    else:
+        resume_from = 0
+
+    with requests.get(GEOWEAVER_URL, headers=headers, stream=True, timeout=(10, 60)) as r:
+        if r.status_code == 304:
+            logger.info("Geoweaver.jar is up to date")
+            return False
+        if r.status_code == 206 and not resume_from:
+            raise requests.exceptions.HTTPError(
+                f"Unexpected partial response to a full download: {r.headers.get('Content-Range')}", response=r
+            )
+        resumed = r.status_code == 206 and r.headers.get("Content-Range", "").startswith(f"bytes {resume_from}-")
+        if r.status_code == 416 or (r.status_code == 206 and not resumed):
+            # The partial file is not a prefix of the current JAR, or the server sent
+            # another range than the one requested, start over without Range
+            os.remove(part_path)
+            write_geoweaver_jar_metadata(dict(metadata, partial_etag=None))
+            return fetch_geoweaver_jar(revalidate=revalidate, chunk_size=chunk_size)
+        r.raise_for_status()
+
+        sha256 = hashlib.sha256()
+        if resumed:
+            logger.info(f"Resuming Geoweaver.jar download at byte {resume_from}")
+            with open(part_path, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    sha256.update(chunk)
+            mode = "ab"
+        else:
+            mode = "wb"
+
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        write_geoweaver_jar_metadata(dict(metadata, partial_etag=etag))
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                sha256.update(chunk)
+
+    os.replace(part_path, jar_path)
+    with open(get_geoweaver_jar_checksum_path(), "w") as f:
+        f.write(f"{sha256.hexdigest()}  geoweaver.jar\n")
+    write_geoweaver_jar_metadata({
+        "etag": etag,
+        "last_modified": last_modified,
+        "size": os.path.getsize(jar_path),
+    })
+    return True
+
+
 def download_geoweaver_jar(overwrite=False):
     """
     Download the latest version of Geoweaver JAR file.
+
+    If the JAR already exists nothing is downloaded, unless ``overwrite`` is set,
+    in which case the server is asked whether a newer JAR is available. A JAR whose
+    size or checksum does not match what was recorded at download time is replaced.
     """
     with get_spinner(text='Checking Geoweaver JAR file...', spinner='dots'):
+        revalidate = False
         if check_geoweaver_jar():
-            if overwrite:
-                os.remove(get_geoweaver_jar_path())
-            else:
-                system = platform.system()
-                if not system == "Windows":  # Windows files are exec by default
-                    subprocess.run(
-                        ["chmod", "+x", get_geoweaver_jar_path()], cwd=f"{get_root_dir()}/"
-                    )
+            recorded_size = read_geoweaver_jar_metadata().get("size")
+            if recorded_size is not None and recorded_size != os.path.getsize(get_geoweaver_jar_path()):
+                logger.warning("Geoweaver.jar size does not match the download, fetching it again")
+            elif not overwrite:
+                ensure_geoweaver_jar_executable()
                 return
+            elif verify_geoweaver_jar():
+                revalidate = True
+            else:
+                logger.warning("Geoweaver.jar checksum does not match, fetching it again")
 
     with get_spinner(text='Downloading latest version of Geoweaver...', spinner='dots'):
-        r = requests.get(GEOWEAVER_URL)
-        with open(get_geoweaver_jar_path(), "wb") as f:
-            f.write(r.content)
+        try:
+            downloaded = fetch_geoweaver_jar(revalidate=revalidate)
+        except (requests.exceptions.RequestException, OSError) as e:
+            logger.error(f"Fail to download geoweaver.jar: {e}")
+            raise RuntimeError("Fail to download geoweaver.jar") from e
 
-        if check_geoweaver_jar():
+        if not check_geoweaver_jar():
+            raise RuntimeError("Fail to download geoweaver.jar")
+        ensure_geoweaver_jar_executable()
+        if downloaded:
             print("Geoweaver.jar is downloaded")
         else:
-            raise RuntimeError("Fail to download geoweaver.jar")
+            print("Geoweaver.jar is already the latest version")
 
 
 def check_os():
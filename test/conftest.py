@@ -0,0 +1,67 @@
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from pygeoweaver.runtime_tags import pgw_context
+from pygeoweaver.runtime_tags.pgw_context import RunRegistry
+
+
+@pytest.fixture
+def quiet(tmp_path):
+    """
+    Keep decorated runs from writing to the home directory, the history store or the terminal.
+    """
+    with patch("pygeoweaver.runtime_tags.pgw_capture.get_home_dir", return_value=str(tmp_path)), \
+         patch("pygeoweaver.runtime_tags.pgw_process.save_history"), \
+         patch("pygeoweaver.runtime_tags.pgw_workflow.print_timing_table"), \
+         patch.object(pgw_context, "run_registry", RunRegistry()):
+        yield
+
+
+def build_response(payload=None, status_code=200, headers=None, body=None, chunk_size=None):
+    """
+    Mock ``requests`` response whose body is ``body``, or ``payload`` as JSON.
+
+    :param chunk_size: Size of the chunks yielded by iter_content, whatever the caller asks for.
+    """
+    fixed_chunk_size = chunk_size
+    if body is None:
+        body = json.dumps(payload).encode() if payload is not None else b""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.encoding = "utf-8"
+    response.content = body
+    response.json.return_value = payload
+
+    def iter_content(chunk_size=None, decode_unicode=False):
+        size = fixed_chunk_size or chunk_size or max(len(body), 1)
+        return (body[i:i + size] for i in range(0, len(body), size))
+
+    response.iter_content.side_effect = iter_content
+    response.__enter__.return_value = response
+    response.__exit__.return_value = False
+    return response
+
+
+def build_client(payload=None, error=None, **response_options):
+    """
+    Mock API client whose ``post`` raises ``error`` or returns build_response(payload, **response_options).
+    """
+    client = MagicMock()
+    if error:
+        client.post.side_effect = error
+    else:
+        client.post.return_value = build_response(payload, **response_options)
+    return client
+
+
+@pytest.fixture
+def make_response():
+    return build_response
+
+
+@pytest.fixture
+def make_client():
+    return build_client
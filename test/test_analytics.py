@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from pygeoweaver.commands import pgw_analytics
+from pygeoweaver.commands.pgw_history import history_page_to_dataframe
+
+START = 1700000000000
+HOUR = 3600 * 1000
+
+
+@pytest.fixture
+def history():
+    records = []
+    for i in range(20):
+        # "train" takes 10s for ten runs, then 30s; "prep" always takes 5s and fails every fourth run
+        for process, host, duration, failed in (
+            ("train", "h1", 10 if i < 10 else 30, False),
+            ("prep", "h2", 5, i % 4 == 0),
+        ):
+            begin = START + i * HOUR
+            records.append({
+                "history_id": f"{process}{i}",
+                "history_process": process,
+                "host_id": host,
+                "history_begin_time": begin,
+                "history_end_time": begin + duration * 1000,
+                "indicator": "Failed" if failed else "Done",
+            })
+    records.append({"history_id": "running", "history_process": "train", "host_id": "h1",
+                    "history_begin_time": START + 20 * HOUR, "indicator": "Running"})
+    return history_page_to_dataframe(records)
+
+
+def test_duration_percentiles(history):
+    result = pgw_analytics.duration_percentiles(history, percentiles=(0.5, 0.9))
+    assert list(result.columns) == ["p50", "p90"]
+    assert result.loc["prep", "p90"] == 5
+    assert result.loc["train", "p50"] == 20
+
+
+def test_failure_rates(history):
+    result = pgw_analytics.failure_rates(history)
+    assert result.loc["prep", "failure_rate"] == 0.25
+    assert result.loc["train", "failure_rate"] == 0
+    assert result.loc["train", "runs"] == 21
+    assert result.loc["train", "Running"] == pytest.approx(1 / 21)
+
+
+def test_host_throughput(history):
+    result = pgw_analytics.host_throughput(history, freq="1D")
+    assert result.loc[("h1", pd.Timestamp("2023-11-14")), "runs"] == 2
+    assert result.xs("h1")["runs"].sum() == 21
+    assert result.xs("h2")["finished"].sum() == 20
+    assert result.xs("h2")["busy_s"].sum() == 100
+
+
+def test_detect_regressions_across_workflows(history):
+    df = pd.concat([history.assign(object_id="w1"), history.assign(object_id="w2")], ignore_index=True)
+    result = pgw_analytics.detect_regressions(df, split=pd.Timestamp(START + 10 * HOUR, unit="ms"), by=["object_id", "history_process"])
+
+    assert result.loc[("w1", "train"), "ratio"] == 3
+    assert result["regressed"].sum() == 2
+    assert not result.loc[("w2", "prep"), "regressed"]
+
+
+def test_summarize_history(history):
+    summary = pgw_analytics.summarize_history(history)
+    assert list(summary.columns) == ["runs", "failures", "failure_rate", "p50", "p90", "p99"]
+    assert summary.loc["prep", "failures"] == 5
@@ -0,0 +1,29 @@
+from unittest.mock import patch, MagicMock
+
+from pygeoweaver.api_call.pgw_base_api_caller import BaseAPI, get_api_client
+from pygeoweaver.constants import GEOWEAVER_DEFAULT_ENDPOINT_URL
+
+
+def test_get_api_client_is_shared():
+    client = get_api_client()
+    assert client is get_api_client()
+    assert client.base_url == GEOWEAVER_DEFAULT_ENDPOINT_URL
+
+
+def test_session_uses_pool_and_retries():
+    api = BaseAPI("http://localhost:8070/Geoweaver", pool_size=4, max_retries=2, backoff_factor=0.5)
+    adapter = api.session.get_adapter("http://localhost:8070/Geoweaver")
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
+    assert adapter.max_retries.backoff_factor == 0.5
+    # POST must not be replayed on a bad status, only on connection errors
+    assert "POST" not in adapter.max_retries.allowed_methods
+
+
+def test_request_builds_url_and_default_timeout():
+    api = BaseAPI("http://localhost:8070/Geoweaver", timeout=(1, 2))
+    with patch.object(api.session, "request", return_value=MagicMock()) as mock_request:
+        api.post("/web/list", data={"type": "process"})
+    mock_request.assert_called_once_with(
+        "POST", "http://localhost:8070/Geoweaver/web/list", data={"type": "process"}, timeout=(1, 2)
+    )
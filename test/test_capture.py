@@ -0,0 +1,121 @@
+import contextvars
+import hashlib
+import inspect
+import io
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+from pygeoweaver.runtime_tags.pgw_capture import OutputCapture, RingBuffer, RotatingLogFile, prune_capture_logs
+from pygeoweaver.runtime_tags.pgw_context import finish_run, start_run
+from pygeoweaver.runtime_tags.pgw_process import get_process_info, pygeoweaver_process
+
+
+def test_ring_buffer_keeps_only_the_tail():
+    buffer = RingBuffer(size=10)
+    for chunk in ("0123", "4567", "89ab", "cdef"):
+        buffer.append(chunk)
+    assert buffer.getvalue() == "6789abcdef"
+    buffer.append("x" * 25)
+    assert buffer.getvalue() == "x" * 10
+
+
+def test_log_file_rotates(tmp_path):
+    log = RotatingLogFile(str(tmp_path / "run.log"), max_bytes=10, backup_count=2)
+    for line in ("aaaaaaa\n", "bbbbbbb\n", "ccccccc\n", "ddddddd\n"):
+        log.write(line)
+    log.close()
+    assert (tmp_path / "run.log").read_text() == "ddddddd\n"
+    assert (tmp_path / "run.log.1").read_text() == "ccccccc\n"
+    assert (tmp_path / "run.log.2").read_text() == "bbbbbbb\n"
+    assert not (tmp_path / "run.log.3").exists()
+
+
+def test_output_is_streamed_and_bounded(tmp_path):
+    console = io.StringIO()
+    capture = OutputCapture("p", buffer_size=16, log_dir=str(tmp_path))
+    with patch.object(sys, "stdout", console), capture.activate():
+        for i in range(1000):
+            print(f"line {i}")
+
+    assert console.getvalue().count("\n") == 1000
+    assert capture.stdout_tail() == "ne 998\nline 999\n"
+    with open(capture.log_path) as f:
+        assert len(f.readlines()) == 1000
+
+
+def test_log_directory_keeps_the_newest_files(tmp_path):
+    old = time.time() - 40 * 86400
+    for i in range(5):
+        path = tmp_path / f"p-{i}.log"
+        path.write_text("x")
+        os.utime(path, (old + i, old + i) if i == 0 else (time.time() - 100 + i, time.time() - 100 + i))
+
+    assert prune_capture_logs(str(tmp_path), max_files=3, max_age_days=30) == 2
+    assert sorted(os.listdir(tmp_path)) == ["p-2.log", "p-3.log", "p-4.log"]
+
+
+def test_captures_prune_their_log_directory(tmp_path):
+    with patch("pygeoweaver.runtime_tags.pgw_capture.CAPTURE_LOG_MAX_FILES", 5):
+        for i in range(50):
+            capture = OutputCapture("p", log_dir=str(tmp_path))
+            capture.record("stdout", f"run {i}\n")
+            capture.close()
+    assert len(os.listdir(tmp_path)) <= 5
+    assert capture.log_path in [str(path) for path in tmp_path.iterdir()]
+
+
+def test_decorated_process_stores_log_file_reference(tmp_path):
+    @pygeoweaver_process
+    def chatty():
+        for i in range(100):
+            print(f"row {i}")
+
+    console = io.StringIO()
+    with patch("pygeoweaver.runtime_tags.pgw_capture.get_home_dir", return_value=str(tmp_path)), \
+         patch("pygeoweaver.runtime_tags.pgw_process.save_history"), \
+         patch.object(sys, "stdout", console):
+        run, token = start_run("wf")
+        try:
+            chatty()
+        finally:
+            finish_run(run, token)
+
+    call = run.process_calls[-1]
+    assert "row 99" in console.getvalue()
+    assert os.path.dirname(call["log_file"]).startswith(str(tmp_path))
+    with open(call["log_file"]) as f:
+        assert f.read().count("row") == 100
+
+
+def test_process_info_is_computed_once_per_function(tmp_path):
+    @pygeoweaver_process
+    def quiet(x):
+        return x + 1
+
+    with patch("pygeoweaver.runtime_tags.pgw_capture.get_home_dir", return_value=str(tmp_path)), \
+         patch("pygeoweaver.runtime_tags.pgw_process.save_history") as mock_save, \
+         patch("pygeoweaver.runtime_tags.pgw_process.inspect.getsource", wraps=inspect.getsource) as mock_source:
+        assert [quiet(i) for i in range(50)] == list(range(1, 51))
+
+    mock_source.assert_called_once()
+    info = get_process_info(quiet.__wrapped__)
+    assert info.process_id == "test_capture.quiet"
+    assert info.code_hash == hashlib.sha256(info.code.encode()).hexdigest()
+    assert mock_save.call_args.kwargs["process_id"] == "test_capture.quiet"
+    assert not os.listdir(tmp_path)  # nothing printed, no log file created
+
+
+def test_threads_in_a_copied_context_are_captured(tmp_path):
+    capture = OutputCapture("p", log_dir=str(tmp_path))
+    with patch.object(sys, "stdout", io.StringIO()), capture.activate():
+        threads = [
+            threading.Thread(target=print, args=("not captured",)),
+            threading.Thread(target=contextvars.copy_context().run, args=(print, "captured")),
+        ]
+        for thread in threads:
+            thread.start()
+            thread.join()
+    assert capture.stdout_tail() == "captured\n"
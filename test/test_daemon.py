@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+import requests
+
+from pygeoweaver import pgw_daemon
+
+
+@patch("pygeoweaver.server.ensure_geoweaver_started")
+@patch("pygeoweaver.pgw_daemon.subprocess.run")
+def test_detail_is_answered_by_the_server(mock_run, mock_started, make_client):
+    client = make_client({"id": "p1", "name": "download_data"})
+    with patch("pygeoweaver.pgw_daemon.get_api_client", return_value=client):
+        process = pgw_daemon.run_geoweaver_cli(["detail", "--process-id", "p1"], capture_output=True)
+
+    client.post.assert_called_once_with("/web/detail", data={"type": "process", "id": "p1"})
+    mock_run.assert_not_called()
+    assert process.returncode == 0
+    assert "download_data" in process.stdout
+
+
+@patch("pygeoweaver.pgw_daemon.download_geoweaver_jar")
+@patch("pygeoweaver.pgw_daemon.get_java_bin_path", return_value="java")
+@patch("pygeoweaver.pgw_daemon.get_geoweaver_jar_path", return_value="geoweaver.jar")
+@patch("pygeoweaver.server.ensure_geoweaver_started")
+@patch("pygeoweaver.pgw_daemon.subprocess.run")
+def test_falls_back_to_cli_when_server_fails(mock_run, mock_started, mock_jar_path, mock_java, mock_download, make_client):
+    client = make_client(error=requests.exceptions.ConnectionError())
+    with patch("pygeoweaver.pgw_daemon.get_api_client", return_value=client):
+        pgw_daemon.run_geoweaver_cli(["detail", "--workflow-id=w1"], capture_output=True)
+
+    assert mock_run.call_args.args[0] == ["java", "-jar", "geoweaver.jar", "detail", "--workflow-id=w1"]
+
+
+@patch("pygeoweaver.pgw_daemon.download_geoweaver_jar")
+@patch("pygeoweaver.pgw_daemon.get_java_bin_path", return_value="java")
+@patch("pygeoweaver.pgw_daemon.get_geoweaver_jar_path", return_value="geoweaver.jar")
+@patch("pygeoweaver.pgw_daemon.subprocess.run")
+def test_commands_without_server_route_use_cli(mock_run, *_):
+    with patch("pygeoweaver.pgw_daemon.get_api_client") as mock_client:
+        pgw_daemon.run_geoweaver_cli(["import", "workflow", "wf.zip"])
+
+    mock_client.assert_not_called()
+    assert mock_run.call_args.args[0][-3:] == ["import", "workflow", "wf.zip"]
@@ -0,0 +1,72 @@
+import hashlib
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pygeoweaver import utils
+
+JAR_CONTENT = b"PK" + b"geoweaver" * 1000
+
+
+@pytest.fixture
+def home(tmp_path):
+    with patch("pygeoweaver.utils.get_home_dir", return_value=str(tmp_path)):
+        yield tmp_path
+
+
+def test_download_streams_to_disk_with_checksum(home, make_response):
+    response = make_response(status_code=200, body=JAR_CONTENT, headers={"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    with patch("pygeoweaver.utils.requests.get", return_value=response) as mock_get:
+        utils.download_geoweaver_jar()
+
+    jar = home / "geoweaver.jar"
+    assert jar.read_bytes() == JAR_CONTENT
+    assert not (home / "geoweaver.jar.part").exists()
+    assert os.access(jar, os.X_OK)
+    assert (home / "geoweaver.jar.sha256").read_text().split()[0] == hashlib.sha256(JAR_CONTENT).hexdigest()
+    assert mock_get.call_args.kwargs["stream"] is True
+    assert utils.read_geoweaver_jar_metadata()["etag"] == '"abc"'
+
+
+def test_existing_jar_is_not_downloaded_again(home):
+    (home / "geoweaver.jar").write_bytes(JAR_CONTENT)
+    with patch("pygeoweaver.utils.requests.get") as mock_get:
+        utils.download_geoweaver_jar()
+    mock_get.assert_not_called()
+    assert os.access(home / "geoweaver.jar", os.X_OK)
+
+
+def test_overwrite_revalidates_with_stored_etag(home, make_response):
+    with patch("pygeoweaver.utils.requests.get", return_value=make_response(status_code=200, body=JAR_CONTENT, headers={"ETag": '"abc"'})):
+        utils.download_geoweaver_jar()
+
+    with patch("pygeoweaver.utils.requests.get", return_value=make_response(status_code=304)) as mock_get:
+        utils.download_geoweaver_jar(overwrite=True)
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+    assert (home / "geoweaver.jar").read_bytes() == JAR_CONTENT
+
+
+def test_interrupted_download_is_resumed(home, make_response):
+    (home / "geoweaver.jar.part").write_bytes(JAR_CONTENT[:100])
+    utils.write_geoweaver_jar_metadata({"partial_etag": '"abc"'})
+    response = make_response(status_code=206, body=JAR_CONTENT[100:], headers={"ETag": '"abc"', "Content-Range": f"bytes 100-{len(JAR_CONTENT) - 1}/{len(JAR_CONTENT)}"})
+    with patch("pygeoweaver.utils.requests.get", return_value=response) as mock_get:
+        utils.download_geoweaver_jar()
+
+    assert mock_get.call_args.kwargs["headers"] == {"Range": "bytes=100-", "If-Range": '"abc"'}
+    assert (home / "geoweaver.jar").read_bytes() == JAR_CONTENT
+    assert utils.verify_geoweaver_jar()
+
+
+def test_mismatched_range_restarts_the_download(home, make_response):
+    (home / "geoweaver.jar.part").write_bytes(JAR_CONTENT[:100])
+    utils.write_geoweaver_jar_metadata({"partial_etag": '"abc"'})
+    wrong_range = make_response(status_code=206, body=JAR_CONTENT[50:], headers={"ETag": '"abc"', "Content-Range": f"bytes 50-{len(JAR_CONTENT) - 1}/{len(JAR_CONTENT)}"})
+    full = make_response(status_code=200, body=JAR_CONTENT, headers={"ETag": '"abc"'})
+    with patch("pygeoweaver.utils.requests.get", side_effect=[wrong_range, full]) as mock_get:
+        utils.download_geoweaver_jar()
+
+    assert mock_get.call_args.kwargs["headers"] == {}
+    assert (home / "geoweaver.jar").read_bytes() == JAR_CONTENT
+    assert utils.verify_geoweaver_jar()
@@ -0,0 +1,89 @@
+from unittest.mock import patch, MagicMock
+
+from pygeoweaver.commands.pgw_find import ProcessCatalog
+
+
+PROCESSES = [
+    {"id": "p1", "name": "download_data", "lang": "python", "owner": "111111"},
+    {"id": "p2", "name": "train_model", "lang": "python", "owner": "222222"},
+    {"id": "p3", "name": "data_cleanup", "lang": "shell", "owner": "111111"},
+]
+
+
+def make_catalog(client):
+    with patch("pygeoweaver.commands.pgw_find.get_api_client", return_value=client):
+        catalog = ProcessCatalog(max_age=3600)
+        catalog.refresh()
+    return catalog
+
+
+def test_indexed_lookups(make_response):
+    client = MagicMock()
+    client.post.return_value = make_response(PROCESSES)
+    catalog = make_catalog(client)
+
+    assert [p["id"] for p in catalog.find(id="p2")] == ["p2"]
+    assert {p["id"] for p in catalog.find(lang="python")} == {"p1", "p2"}
+    assert [p["id"] for p in catalog.find(name="data_cleanup")] == ["p3"]
+    assert [p["id"] for p in catalog.find(name_prefix="DATA")] == ["p3"]
+    assert {p["id"] for p in catalog.find(name_contains="data")} == {"p1", "p3"}
+    assert [p["id"] for p in catalog.find(name_contains="data", lang="shell")] == ["p3"]
+    assert [p["id"] for p in catalog.find(lang="python", owner="222222")] == ["p2"]
+    assert catalog.find(id="missing") == []
+    # lookups within max_age do not hit the server again
+    assert client.post.call_count == 1
+
+
+def test_refresh_is_incremental_and_honours_etag(make_response):
+    client = MagicMock()
+    client.post.return_value = make_response(PROCESSES, headers={"ETag": '"v1"'})
+    catalog = make_catalog(client)
+
+    client.post.return_value = make_response(None, status_code=304)
+    with patch("pygeoweaver.commands.pgw_find.get_api_client", return_value=client):
+        assert catalog.refresh() is False
+    assert client.post.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    updated = [dict(PROCESSES[0], name="fetch_data"), PROCESSES[1]]
+    client.post.return_value = make_response(updated, headers={"ETag": '"v2"'})
+    with patch("pygeoweaver.commands.pgw_find.get_api_client", return_value=client):
+        assert catalog.refresh() is True
+        assert len(catalog) == 2
+        assert catalog.find(name="download_data") == []
+        assert [p["id"] for p in catalog.find(name_prefix="fetch")] == ["p1"]
+        assert catalog.find(id="p3") == []
+
+
+def test_name_index_stays_sorted_and_results_are_copies(make_response):
+    client = MagicMock()
+    many = [{"id": f"p{n}", "name": f"step_{n % 7}_{n}", "lang": "python"} for n in range(50)]
+    client.post.return_value = make_response(many)
+    catalog = make_catalog(client)
+    assert catalog._sorted_names == sorted((p["name"], p["id"]) for p in many)
+
+    client.post.return_value = make_response(many + [{"id": "new", "name": "Step_0_x", "lang": "python"}])
+    with patch("pygeoweaver.commands.pgw_find.get_api_client", return_value=client):
+        catalog.refresh()
+        assert {p["id"] for p in catalog.find(name_prefix="step_0_")} == {f"p{n}" for n in range(0, 50, 7)} | {"new"}
+
+        catalog.find(id="new")[0]["name"] = "changed"
+        catalog.get("new")["lang"] = "shell"
+        assert catalog.get("new") == {"id": "new", "name": "Step_0_x", "lang": "python"}
+
+
+def test_created_processes_are_found_right_away(make_response):
+    from pygeoweaver.commands import pgw_create, pgw_find
+
+    client = MagicMock()
+    client.post.return_value = make_response(PROCESSES)
+    catalog = make_catalog(client)
+    created = {"id": "p4", "name": "new_step", "lang": "python"}
+    client.post.return_value = make_response(PROCESSES + [created])
+    with patch.object(pgw_find, "process_catalog", catalog), \
+         patch("pygeoweaver.commands.pgw_list.process_catalog", catalog), \
+         patch("pygeoweaver.commands.pgw_find.get_api_client", return_value=client), \
+         patch("pygeoweaver.commands.pgw_create.get_api_client", return_value=client), \
+         patch("pygeoweaver.commands.pgw_create.download_geoweaver_jar"):
+        assert pgw_find.get_process_by_name("new_step").empty
+        pgw_create.create_process("python", "desc", "new_step", "print(1)")
+        assert list(pgw_find.get_process_by_name("new_step")["id"]) == ["p4"]
@@ -0,0 +1,207 @@
+import json
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+import pytest
+import requests
+
+from pygeoweaver.commands import pgw_history
+from pygeoweaver.database_management.pgw_history import History
+from pygeoweaver.pgw_history_store import HistoryStore
+
+START = 1700000000000
+
+HISTORY = [
+    {"history_id": f"h{i}", "history_begin_time": 1700000000000 + i * 1000,
+     "history_end_time": 1700000000500 + i * 1000, "indicator": "Done", "history_output": "ok \\u00e9"}
+    for i in range(5)
+]
+
+
+@pytest.fixture
+def client(make_client):
+    client = make_client(HISTORY, chunk_size=7)
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=client), \
+         patch("pygeoweaver.commands.pgw_history.ensure_geoweaver_started"):
+        yield client
+
+
+def test_history_is_streamed_in_typed_pages(client):
+    pages = list(pgw_history.iter_workflow_history("w1", page_size=2))
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert all(isinstance(item, History) for page in pages for item in page)
+    assert pages[0][0].history_output == "ok \\u00e9"
+    assert client.post.call_args.kwargs == {"data": {"type": "workflow", "id": "w1"}, "stream": True}
+
+
+def test_since_and_dataframe_chunks(client):
+    since = datetime.utcfromtimestamp(1700000002.5)
+    df = pgw_history.to_dataframe(pgw_history.iter_workflow_history("w1", page_size=2, since=since, as_dataframe=True))
+
+    assert list(df["history_id"]) == ["h2", "h3", "h4"]
+    assert str(df["history_begin_time"].dtype) == "datetime64[ns]"
+    assert df["history_begin_time"][0] == datetime.utcfromtimestamp(1700000002)
+    assert str(df["history_notes"].dtype) == "string"
+
+
+def test_record_pages_and_empty_history_convert_to_the_same_dtypes(client):
+    typed = pgw_history.to_dataframe(pgw_history.iter_workflow_history("w1"))
+    empty = pgw_history.to_dataframe([])
+    assert typed.dtypes[list(empty.columns)].equals(empty.dtypes)
+    assert typed["history_end_time"][0] == datetime.utcfromtimestamp(1700000000.5)
+
+
+def test_multibyte_characters_split_across_chunks(make_response):
+    items = [{"history_id": "h1", "history_output": "caf\u00e9 \u2713 \U0001F600"}, {"history_id": "h2"}]
+    body = json.dumps(items, ensure_ascii=False).encode("utf-8")
+    for chunk_size in (1, 2, 3):
+        assert list(pgw_history.iter_json_array(make_response(body=body, chunk_size=chunk_size))) == items
+
+
+def test_large_items_with_tricky_strings_span_many_chunks(make_response):
+    output = 'quote \\" brace } bracket ] comma , \\\\\n' * 20000
+    items = [{"history_id": "h1", "history_output": output, "nested": [1, {"a": None}]}, 12, "s]", True]
+    body = json.dumps(items).encode()
+    assert list(pgw_history.iter_json_array(make_response(body=body, chunk_size=4096))) == items
+
+
+def test_non_array_response_is_rejected(make_response):
+    with pytest.raises(ValueError):
+        list(pgw_history.iter_json_array(make_response({"error": "no"})))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    with patch("pygeoweaver.commands.pgw_history.get_history_store", return_value=store), \
+         patch("pygeoweaver.commands.pgw_history.ensure_geoweaver_started"):
+        yield store
+    store.close()
+
+
+def test_history_store_syncs_incrementally_from_watermark(store, make_client):
+    running = dict(HISTORY[4], history_id="h5", indicator="Running", history_end_time=None)
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client(HISTORY + [running])):
+        assert pgw_history.sync_history("workflow", "w1") == 6
+        assert pgw_history.sync_history("workflow", "w1") == 0  # synced less than a minute ago
+
+    watermark, _ = store.get_sync_state("workflow", "w1")
+    assert watermark == HISTORY[4]["history_end_time"]
+
+    finished = dict(running, indicator="Done", history_end_time=1700000009000)
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client(HISTORY + [finished])):
+        # Only the record at the watermark and the no longer running one are written again
+        assert pgw_history.sync_history("workflow", "w1", force=True) == 2
+
+    df = pgw_history.to_dataframe([pgw_history.history_page_to_dataframe(store.query("workflow", "w1"))])
+    assert list(df["history_id"]) == ["h0", "h1", "h2", "h3", "h4", "h5"]
+    assert df["indicator"].iloc[-1] == "Done"
+
+
+def test_query_history_answers_offline_from_the_store(store, make_client):
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client(HISTORY)):
+        pgw_history.sync_history("process", "p1")
+
+    with patch("pygeoweaver.commands.pgw_history.check_geoweaver_status", return_value=False), \
+         patch("pygeoweaver.commands.pgw_history.get_api_client") as mock_client:
+        df = pgw_history.query_history("process", "p1", since=1700000003000)
+
+    mock_client.assert_not_called()
+    assert list(df["history_id"]) == ["h3", "h4"]
+    assert str(df["history_end_time"].dtype) == "datetime64[ns]"
+
+
+def test_sync_deletes_records_removed_on_the_server(store, make_client):
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client(HISTORY)):
+        pgw_history.sync_history("workflow", "w1")
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client(HISTORY[2:])):
+        pgw_history.sync_history("workflow", "w1", force=True)
+
+    assert [record["history_id"] for record in store.query("workflow", "w1")] == ["h2", "h3", "h4"]
+
+
+def test_sync_keeps_local_records(store, make_client):
+    store.upsert("workflow", "w1", [{"history_id": "local1", "indicator": "Done"}], origin="local")
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client([])):
+        pgw_history.sync_history("workflow", "w1")
+
+    assert [record["history_id"] for record in store.query("workflow", "w1")] == ["local1"]
+
+
+def test_query_history_refresh_skips_the_sync_interval(store, make_client):
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client(HISTORY[:2])):
+        df = pgw_history.query_history("process", "p1")
+    synced_at = df.attrs["synced_at"]
+    assert list(df["history_id"]) == ["h0", "h1"]
+
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client(HISTORY)), \
+         patch("pygeoweaver.commands.pgw_history.check_geoweaver_status", return_value=True):
+        assert len(pgw_history.query_history("process", "p1")) == 2
+        df = pgw_history.query_history("process", "p1", refresh=True)
+
+    assert len(df) == 5
+    assert df.attrs["synced_at"] >= synced_at
+
+
+def test_show_histories_fetches_concurrently_and_keeps_failures():
+    def post(endpoint, data):
+        response = MagicMock()
+        if data["id"] == "bad":
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError("500 Server Error")
+        response.json.return_value = {"history_id": data["id"], "indicator": "Failed", "history_begin_time": START}
+        if data["id"] == "null":
+            response.json.return_value = None
+        elif data["id"] == "list":
+            response.json.return_value = []
+        return response
+
+    client = MagicMock()
+    client.post.side_effect = post
+    ids = [f"h{i}" for i in range(20)] + ["bad", "null", "list", "h0"]
+    with patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=client), \
+         patch("pygeoweaver.commands.pgw_history.ensure_geoweaver_started"):
+        df = pgw_history.show_histories(ids, max_workers=4)
+
+    assert client.post.call_count == 23
+    assert list(df["history_id"]) == ids[:-1]
+    assert df["error"].notna().tolist() == [False] * 20 + [True] * 3
+    assert str(df["history_begin_time"].dtype) == "datetime64[ns]"
+
+
+def test_follow_history_yields_only_new_output_until_finished():
+    details = [
+        {"indicator": "Running", "history_output": None},
+        {"indicator": "Running", "history_output": "step 1\n"},
+        {"indicator": "Running", "history_output": "step 1\n"},
+        {"indicator": "Running", "history_output": "step 1\n"},
+        {"indicator": "Running", "history_output": "step 1\nstep 2\n"},
+        {"indicator": "Done", "history_output": "step 1\nstep 2\ndone\n"},
+    ]
+    with patch("pygeoweaver.commands.pgw_history.fetch_history_detail", side_effect=details), \
+         patch("pygeoweaver.commands.pgw_history.ensure_geoweaver_started"), \
+         patch("pygeoweaver.commands.pgw_history.time.sleep") as mock_sleep:
+        chunks = list(pgw_history.follow_history("h1", min_interval=1, max_interval=2))
+
+    assert chunks == ["step 1\n", "step 2\n", "done\n"]
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [1.5, 1, 1.5, 2, 1]
+
+
+def test_follow_history_stops_at_a_cached_status():
+    with patch("pygeoweaver.commands.pgw_history.fetch_history_detail",
+               return_value={"indicator": "Cached", "history_output": ""}) as mock_detail, \
+         patch("pygeoweaver.commands.pgw_history.ensure_geoweaver_started"):
+        assert list(pgw_history.follow_history("h1")) == []
+
+    assert mock_detail.call_count == 1
+
+
+def test_follow_history_gives_up_on_a_status_that_never_changes():
+    details = [{"indicator": None, "history_output": "started\n"}] * 10
+    with patch("pygeoweaver.commands.pgw_history.fetch_history_detail", side_effect=details) as mock_detail, \
+         patch("pygeoweaver.commands.pgw_history.ensure_geoweaver_started"), \
+         patch("pygeoweaver.commands.pgw_history.time.sleep"):
+        chunks = list(pgw_history.follow_history("h1", max_unknown_polls=3))
+
+    assert chunks == ["started\n"]
+    assert mock_detail.call_count == 4
@@ -0,0 +1,127 @@
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from pygeoweaver.commands.pgw_history import query_history
+from pygeoweaver.pgw_history_store import HistoryStore
+from pygeoweaver.pgw_history_writer import HistoryWriter, write_history_batch
+from pygeoweaver.runtime_tags.pgw_process import pygeoweaver_process
+
+
+def test_writer_flushes_on_batch_size_and_on_close():
+    batches = []
+    writer = HistoryWriter(sink=batches.append, batch_size=3, flush_interval=60)
+    for i in range(7):
+        assert writer.submit({"history_id": f"h{i}"})
+    deadline = time.monotonic() + 5
+    while len(batches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [len(batch) for batch in batches] == [3, 3]
+
+    writer.close()
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+
+def test_writer_flushes_on_interval():
+    flushed = threading.Event()
+    writer = HistoryWriter(sink=lambda batch: flushed.set(), batch_size=100, flush_interval=0.05)
+    writer.submit({"history_id": "h1"})
+    assert flushed.wait(timeout=5)
+    writer.close()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+    writer = HistoryWriter(sink=lambda batch: release.wait(5), max_queue_size=1, batch_size=1)
+    writer.submit({"history_id": "h0"})  # held by the blocked sink
+    time.sleep(0.05)
+    assert writer.submit({"history_id": "h1"})
+    assert not writer.submit({"history_id": "h2"})
+    assert writer.dropped == 1
+    release.set()
+    writer.close()
+
+
+def test_batches_are_stored_locally_when_no_upload_endpoint(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    with patch("pygeoweaver.pgw_history_store.get_history_store", return_value=store):
+        write_history_batch([
+            {"history_id": "h1", "history_process": "p1", "indicator": "Done"},
+            {"history_id": "h2", "history_process": "p2", "indicator": "Failed"},
+        ])
+    assert [r["history_id"] for r in store.query("process", "p2")] == ["h2"]
+    store.close()
+
+
+def test_locally_stored_batches_survive_a_sync(tmp_path, make_client):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    with patch("pygeoweaver.pgw_history_store.get_history_store", return_value=store):
+        write_history_batch([{"history_id": "h1", "history_process": "mymod.step", "indicator": "Done"}])
+    with patch("pygeoweaver.commands.pgw_history.get_history_store", return_value=store), \
+         patch("pygeoweaver.commands.pgw_history.get_api_client", return_value=make_client([])), \
+         patch("pygeoweaver.commands.pgw_history.ensure_geoweaver_started"), \
+         patch("pygeoweaver.commands.pgw_history.check_geoweaver_status", return_value=True):
+        df = query_history("process", "mymod.step")
+
+    assert list(df["history_id"]) == ["h1"]
+    store.close()
+
+
+def test_decorated_process_runs_are_saved(tmp_path):
+    writer = MagicMock()
+
+    @pygeoweaver_process
+    def step(fail=False):
+        print("working")
+        if fail:
+            raise ValueError("boom")
+        return 42
+
+    with patch("pygeoweaver.commands.pgw_history.get_history_writer", return_value=writer), \
+         patch("pygeoweaver.runtime_tags.pgw_capture.get_home_dir", return_value=str(tmp_path)):
+        assert step() == 42
+        with pytest.raises(ValueError):
+            step(fail=True)
+
+    done, failed = [c.args[0] for c in writer.submit.call_args_list]
+    assert done["indicator"] == "Done" and "working" in done["history_output"]
+    assert "def step" in done["history_input"]
+    assert failed["indicator"] == "Failed"
+    assert done["history_begin_time"] <= done["history_end_time"]
+
+
+def test_failed_process_group_does_not_drop_the_others(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    records = [
+        {"history_id": "h1", "history_process": None, "indicator": "Done"},
+        {"history_id": "h2", "history_process": "p2", "indicator": "Done"},
+    ]
+    with patch("pygeoweaver.pgw_history_store.get_history_store", return_value=store):
+        failed = write_history_batch(records)
+    assert [r["history_id"] for r in failed] == ["h1"]
+    assert [r["history_id"] for r in store.query("process", "p2")] == ["h2"]
+    store.close()
+
+
+def test_writer_retries_failed_records_then_gives_up():
+    attempts = []
+
+    def sink(batch):
+        attempts.append([record["history_id"] for record in batch])
+        return [record for record in batch if record["history_id"] == "bad"]
+
+    writer = HistoryWriter(sink=sink, batch_size=2, flush_interval=0.01, max_attempts=3)
+    writer.submit({"history_id": "bad"})
+    writer.submit({"history_id": "good"})
+    writer.close()
+    assert attempts == [["bad", "good"], ["bad"], ["bad"]]
+    assert writer.failed == 1
+
+
+def test_save_history_requires_a_process_id():
+    from pygeoweaver.commands.pgw_history import save_history
+
+    with pytest.raises(ValueError):
+        save_history(code="print(1)", status="Done")
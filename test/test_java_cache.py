@@ -0,0 +1,48 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pygeoweaver import utils
+
+
+@pytest.fixture
+def fake_java(tmp_path):
+    java = tmp_path / "bin" / "java"
+    java.parent.mkdir()
+    java.write_text("#!/bin/sh\n")
+    java.chmod(0o755)
+    utils.java_bin_cache.clear()
+    with patch("pygeoweaver.utils.get_java_cache_file_path", return_value=str(tmp_path / "java_bin_cache.json")):
+        yield str(java)
+    utils.java_bin_cache.clear()
+
+
+def test_resolution_is_cached_in_memory_and_on_disk(fake_java):
+    with patch("pygeoweaver.utils.find_java_bin_path", return_value=fake_java) as mock_find:
+        assert utils.get_java_bin_path() == fake_java
+        assert utils.get_java_bin_path() == fake_java
+        utils.java_bin_cache.clear()  # simulate a new interpreter
+        assert utils.get_java_bin_path() == fake_java
+    mock_find.assert_called_once()
+
+
+def test_cache_is_invalidated_when_binary_or_env_changes(fake_java):
+    with patch("pygeoweaver.utils.find_java_bin_path", return_value=fake_java) as mock_find:
+        utils.get_java_bin_path()
+        stat = os.stat(fake_java)
+        os.utime(fake_java, (stat.st_atime, stat.st_mtime + 10))
+        utils.get_java_bin_path()
+        assert mock_find.call_count == 2
+
+        with patch.dict(os.environ, {"JAVA_HOME": "/opt/other-jdk"}):
+            utils.get_java_bin_path()
+        assert mock_find.call_count == 3
+
+
+def test_missing_binary_is_not_cached(fake_java, tmp_path):
+    missing = str(tmp_path / "java" / "bin" / "java")
+    with patch("pygeoweaver.utils.find_java_bin_path", return_value=missing) as mock_find:
+        utils.get_java_bin_path()
+        utils.get_java_bin_path()
+    assert mock_find.call_count == 2
@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pygeoweaver.commands.pgw_run import run_workflow
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+from pygeoweaver.pgw_job import Job, prune_jobs
+
+
+def fake_cli(script):
+    def start(args, **kwargs):
+        return subprocess.Popen([sys.executable, "-c", script], text=True, **kwargs)
+    return start
+
+
+@pytest.fixture
+def home(tmp_path):
+    with patch("pygeoweaver.pgw_job.get_home_dir", return_value=str(tmp_path)):
+        yield tmp_path
+
+
+def test_run_workflow_returns_a_job_without_waiting(home):
+    script = "import sys; print('line 1'); print('line 2'); print('oops', file=sys.stderr); sys.exit(3)"
+    with patch("pygeoweaver.pgw_job.start_geoweaver_cli", side_effect=fake_cli(script)) as mock_start, \
+         patch("pygeoweaver.commands.pgw_run.download_geoweaver_jar"):
+        job = run_workflow(workflow_id="w1", host_list="h1", password_list="pw", wait=False)
+
+    assert isinstance(job, Job)
+    assert mock_start.call_args.args[0] == ["run", "workflow", "w1", "-h", "h1", "-p", "pw"]
+    assert job.wait(timeout=30) == ExecutionStatus.FAILED
+    assert job.returncode == 3
+    assert list(job.stdout_lines()) == ["line 1", "line 2"]
+    assert job.read_new_lines("stderr") == ["oops"]
+    assert job.read_new_lines("stderr") == []
+    assert job.log_dir.startswith(str(home))
+
+
+def test_job_can_be_polled_and_cancelled(home):
+    script = "import time; print('started', flush=True); time.sleep(30)"
+    with patch("pygeoweaver.pgw_job.start_geoweaver_cli", side_effect=fake_cli(script)):
+        job = Job(["run", "process", "p1"], name="p1")
+
+    assert job.status() == ExecutionStatus.RUNNING
+    assert job.wait(timeout=0.1) == ExecutionStatus.RUNNING
+    assert next(job.stdout_lines()) == "started"
+    assert job.cancel(grace_period=5)
+    assert job.status() == ExecutionStatus.STOPPED
+    assert not job.cancel()
+
+
+def test_finished_jobs_beyond_the_limits_are_pruned(home):
+    with patch("pygeoweaver.pgw_job.start_geoweaver_cli", side_effect=fake_cli("print('done')")):
+        finished = [Job(["run", "process", f"p{n}"], name=f"p{n}") for n in range(3)]
+    for job in finished:
+        job.wait(timeout=30)
+    old = time.time() - 30 * 86400
+    for path in [finished[0].log_dir, *(os.path.join(finished[0].log_dir, f) for f in os.listdir(finished[0].log_dir))]:
+        os.utime(path, (old, old))
+    with patch("pygeoweaver.pgw_job.start_geoweaver_cli", side_effect=fake_cli("import time; time.sleep(30)")):
+        running = Job(["run", "process", "slow"], name="slow")
+
+    try:
+        # The expired job is removed when the next one starts
+        assert not os.path.exists(finished[0].log_dir)
+        assert prune_jobs(max_jobs=1, max_age_days=0) == 2
+        assert os.listdir(home / "geoweaver" / "jobs") == [running.job_id]
+    finally:
+        running.cancel()
+    assert running.remove()
+    assert not os.path.exists(running.log_dir)
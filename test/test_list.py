@@ -0,0 +1,62 @@
+from unittest.mock import patch, MagicMock
+
+import pytest
+import requests
+
+from pygeoweaver.commands import pgw_list
+from pygeoweaver.database_management.pgw_host import Host
+from pygeoweaver.database_management.pgw_process import GWProcess
+
+
+@pytest.fixture(autouse=True)
+def clear_list_cache():
+    pgw_list.list_cache.invalidate()
+    yield
+    pgw_list.list_cache.invalidate()
+
+
+def test_fetch_list_returns_typed_models_and_caches(make_client):
+    client = make_client([
+        {"id": "p1", "name": "a", "lang": "python"},
+        {"id": "p2", "name": "b", "lang": "shell"},
+    ])
+    with patch("pygeoweaver.commands.pgw_list.get_api_client", return_value=client):
+        first = pgw_list.fetch_list("process")
+        second = pgw_list.fetch_list("process")
+
+    assert all(isinstance(p, GWProcess) for p in first)
+    assert [p.id for p in second] == ["p1", "p2"]
+    client.post.assert_called_once_with("/web/list", data={"type": "process"})
+
+
+def test_fetch_list_refresh_skips_cache(make_client):
+    client = make_client([{"id": "h1", "name": "localhost", "port": 22}])
+    with patch("pygeoweaver.commands.pgw_list.get_api_client", return_value=client):
+        pgw_list.fetch_list("host")
+        hosts = pgw_list.fetch_list("host", refresh=True)
+
+    assert isinstance(hosts[0], Host)
+    assert client.post.call_count == 2
+
+
+@patch("pygeoweaver.commands.pgw_list.list_via_cli")
+def test_list_hosts_falls_back_to_cli_when_server_down(mock_cli):
+    client = MagicMock()
+    client.post.side_effect = requests.exceptions.ConnectionError()
+    with patch("pygeoweaver.commands.pgw_list.get_api_client", return_value=client):
+        assert pgw_list.list_hosts() is None
+    mock_cli.assert_called_once_with("host")
+
+
+def test_creating_objects_invalidates_their_cached_list():
+    from pygeoweaver.commands import pgw_create
+
+    pgw_list.list_cache.set("process", ["stale"])
+    pgw_list.list_cache.set("workflow", ["stale"])
+    with patch("pygeoweaver.commands.pgw_create.get_api_client", return_value=MagicMock()), \
+         patch("pygeoweaver.commands.pgw_create.download_geoweaver_jar"):
+        pgw_create.create_process("python", "desc", "name", "print(1)")
+        assert "process" not in pgw_list.list_cache
+        assert "workflow" in pgw_list.list_cache
+        pgw_create.create_workflow("desc", "[]", "wf", "[]")
+    assert "workflow" not in pgw_list.list_cache
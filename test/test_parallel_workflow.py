@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from pygeoweaver.runtime_tags.pgw_context import get_runs
+from pygeoweaver.runtime_tags.pgw_parallel import ProcessFuture
+from pygeoweaver.runtime_tags.pgw_process import pygeoweaver_process
+from pygeoweaver.runtime_tags.pgw_workflow import pygeoweaver_workflow
+
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+@pygeoweaver_process
+def process_tile(tile):
+    time.sleep(0.2)
+    print(f"tile {tile}")
+    return tile * 10
+
+
+@pygeoweaver_process
+def merge(results, offset=0):
+    return sum(results) + offset
+
+
+@pygeoweaver_process
+def broken(tile):
+    raise ValueError(f"bad tile {tile}")
+
+
+def test_fan_out_fan_in_runs_concurrently():
+    seen = {}
+
+    @pygeoweaver_workflow(parallel=True, max_workers=8)
+    def tiles(n):
+        results = [process_tile(i) for i in range(n)]
+        seen["future"] = results[0]
+        return {"total": merge(results, offset=merge([results[0]]))}
+
+    start = time.perf_counter()
+    assert tiles(8) == {"total": 280}
+    assert time.perf_counter() - start < 1.0  # eight 0.2s tiles, not 1.6s sequentially
+    assert isinstance(seen["future"], ProcessFuture)
+
+    run = get_runs("tiles")[0]
+    assert len(run.nodes) == 10 and all(node["status"] == "Done" for node in run.nodes.values())
+    assert ("process_tile-1", "merge-9") in run.edges
+    assert ("merge-9", "merge-10") in run.edges
+    assert len([edge for edge in run.edges if edge[1] == "merge-10"]) == 9
+    assert len(run.process_calls) == 10
+
+
+def test_failures_skip_dependents_and_are_raised():
+    @pygeoweaver_workflow(parallel=True)
+    def failing():
+        return merge([process_tile(1), broken(2)])
+
+    with pytest.raises(ValueError, match="bad tile 2"):
+        failing()
+
+    statuses = {node_id: node["status"] for node_id, node in get_runs("failing")[0].nodes.items()}
+    assert statuses == {"process_tile-1": "Done", "broken-2": "Failed", "merge-3": "Skipped"}
+
+
+def test_default_workflow_stays_sequential():
+    @pygeoweaver_workflow
+    def sequential():
+        first = process_tile(1)
+        assert first == 10
+        return merge([first, process_tile(2)])
+
+    assert sequential() == 30
+    assert get_runs("sequential")[0].nodes == {}
+
+
+def test_body_exception_is_not_hidden_by_process_failures():
+    @pygeoweaver_workflow(parallel=True)
+    def failing_body():
+        broken(1)
+        raise KeyError("body")
+
+    with pytest.raises(KeyError, match="body"):
+        failing_body()
+    assert get_runs("failing_body")[0].finished
+
+
+def test_async_parallel_workflow_does_not_block_the_event_loop():
+    ticks = []
+
+    @pygeoweaver_workflow(parallel=True)
+    async def tiles():
+        return [process_tile(i) for i in range(2)]
+
+    async def ticker():
+        for _ in range(3):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        result, _ = await asyncio.gather(tiles(), ticker())
+        return result
+
+    start = time.perf_counter()
+    assert asyncio.run(main()) == [0, 10]
+    # The ticker keeps running while the 0.2s tiles are awaited
+    assert len(ticks) == 3 and ticks[-1] - start < 0.15
@@ -0,0 +1,136 @@
+import concurrent.futures
+import logging
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+from pygeoweaver.runtime_tags import pgw_context
+from pygeoweaver.runtime_tags.pgw_context import RunRegistry, get_runs
+from pygeoweaver.runtime_tags.pgw_process import pygeoweaver_process
+from pygeoweaver.runtime_tags.pgw_process_pool import init_worker, is_process_worker
+from pygeoweaver.runtime_tags.pgw_workflow import pygeoweaver_workflow
+
+
+@pygeoweaver_process(executor="process")
+def square(x):
+    print(f"squaring {x}")
+    logging.getLogger("raster").warning("tile %s", x)
+    return {"pid": os.getpid(), "value": x * x, "worker": is_process_worker()}
+
+
+@pygeoweaver_process(executor="process")
+def broken(x):
+    print("about to fail")
+    raise ValueError(f"bad tile {x}")
+
+
+@pygeoweaver_process(executor="process")
+def returns_lock(path):
+    with open(path, "a") as f:
+        f.write(f"{os.getpid()}\n")
+    return threading.Lock()
+
+
+@pygeoweaver_process(executor="process")
+def call_callback(callback):
+    return callback()
+
+
+def pid_in_main():
+    return os.getpid()
+
+
+def pid_not_found():
+    return os.getpid()
+
+
+pid_in_main.__module__ = "__main__"
+pid_in_main = pygeoweaver_process(executor="process")(pid_in_main)
+# The worker looks the function up under a name the module does not have
+pid_not_found.__qualname__ = "renamed_pid_not_found"
+pid_not_found = pygeoweaver_process(executor="process")(pid_not_found)
+
+
+@pygeoweaver_workflow(parallel=True, report=None)
+def tiles_workflow(xs):
+    return [square(x) for x in xs]
+
+
+@pytest.fixture
+def pool(tmp_path):
+    with patch("pygeoweaver.runtime_tags.pgw_capture.get_home_dir", return_value=str(tmp_path)), \
+         patch("pygeoweaver.runtime_tags.pgw_process.save_history") as mock_save:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=2, initializer=init_worker)
+        with patch("pygeoweaver.runtime_tags.pgw_process_pool.get_process_pool", return_value=executor):
+            yield mock_save
+        executor.shutdown(wait=True)
+
+
+def test_process_executor_runs_in_a_worker_and_ships_output_back(pool, caplog):
+    with caplog.at_level(logging.WARNING, logger="raster"):
+        result = square(3)
+
+    assert result["value"] == 9
+    assert result["worker"] is True
+    assert result["pid"] != os.getpid()
+    assert ("raster", logging.WARNING, "tile 3") in caplog.record_tuples
+    history = pool.call_args.kwargs
+    assert history["status"] == ExecutionStatus.DONE
+    assert "squaring 3" in history["log_output"]
+    assert history["process_id"] == "test_process_pool.square"
+
+
+def test_process_executor_failure_is_raised_and_recorded(pool):
+    with pytest.raises(ValueError, match="bad tile 1"):
+        broken(1)
+
+    history = pool.call_args.kwargs
+    assert history["status"] == ExecutionStatus.FAILED
+    assert "about to fail" in history["log_output"]
+
+
+def test_local_functions_run_in_the_calling_process(pool):
+    @pygeoweaver_process(executor="process")
+    def local(x):
+        return os.getpid()
+
+    assert local(1) == os.getpid()
+    assert pool.call_args.kwargs["status"] == ExecutionStatus.DONE
+
+
+def test_parallel_workflow_records_worker_calls(pool):
+    with patch.object(pgw_context, "run_registry", RunRegistry()):
+        results = tiles_workflow([1, 2, 3])
+        run = get_runs("tiles_workflow")[0]
+
+    assert [r["value"] for r in results] == [1, 4, 9]
+    assert len(run.process_calls) == 3
+    assert all(call["status"] == ExecutionStatus.DONE for call in run.process_calls)
+    assert all(call["wall_s"] >= 0 for call in run.process_calls)
+
+
+def test_unknown_executor_is_rejected():
+    with pytest.raises(ValueError):
+        pygeoweaver_process(executor="gpu")
+
+
+def test_unpicklable_result_fails_without_running_again(pool, tmp_path):
+    path = tmp_path / "calls.txt"
+    with pytest.raises(TypeError, match="cannot be sent back"):
+        returns_lock(str(path))
+
+    assert len(path.read_text().splitlines()) == 1
+    assert pool.call_args.kwargs["status"] == ExecutionStatus.FAILED
+
+
+def test_unpicklable_arguments_run_in_the_calling_process(pool):
+    assert call_callback(lambda: os.getpid()) == os.getpid()
+
+
+def test_functions_the_worker_cannot_find_run_in_the_calling_process(pool):
+    assert pid_in_main() == os.getpid()
+    assert pid_not_found() == os.getpid()
+    assert [c.kwargs["status"] for c in pool.call_args_list] == [ExecutionStatus.DONE, ExecutionStatus.DONE]
@@ -0,0 +1,68 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pygeoweaver.runtime_tags import pgw_context
+from pygeoweaver.runtime_tags.pgw_process import pygeoweaver_process
+from pygeoweaver.runtime_tags.pgw_workflow import print_timing_table, pygeoweaver_workflow
+
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+@pygeoweaver_process
+def sleepy():
+    time.sleep(0.1)
+
+
+@pygeoweaver_process
+def busy():
+    data = bytearray(50 * 2 ** 20)
+    return sum(range(200000)) + len(data)
+
+
+@pygeoweaver_process
+def broken():
+    raise ValueError("bad input")
+
+
+def test_calls_are_profiled_and_aggregated():
+    @pygeoweaver_workflow(report="return")
+    def pipeline():
+        sleepy()
+        sleepy()
+        busy()
+        try:
+            broken()
+        except ValueError:
+            pass
+        return "ok"
+
+    result, table = pipeline()
+    assert result == "ok"
+    assert list(table.index) == ["sleepy", "busy", "broken"]
+    assert table.loc["sleepy", "calls"] == 2
+    assert table.loc["sleepy", "total_wall_s"] >= 0.2
+    assert table.loc["sleepy", "total_cpu_s"] < 0.1
+    assert table.loc["busy", "total_cpu_s"] > 0
+    assert table.loc["broken", "failed"] == 1
+    assert table["wall_share"].sum() == pytest.approx(1)
+
+    call = pgw_context.get_runs("pipeline")[0].process_calls[-1]
+    assert call["exception"] == "ValueError: bad input"
+    assert "raise ValueError" in call["traceback"]
+    assert call["peak_rss_delta"] >= 0
+
+
+def test_timing_table_is_printed_by_default(capsys):
+    @pygeoweaver_workflow
+    def printed():
+        sleepy()
+
+    # Imported before the quiet fixture replaced it
+    with patch("pygeoweaver.runtime_tags.pgw_workflow.print_timing_table", print_timing_table):
+        assert printed() is None
+    output = capsys.readouterr().out
+    assert "Workflow printed" in output and "sleepy" in output and "total_wall_s" in output
+    assert "Source Code" not in output
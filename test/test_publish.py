@@ -0,0 +1,144 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pygeoweaver.runtime_tags import pgw_context
+from pygeoweaver.runtime_tags.pgw_context import RunRegistry, get_runs
+from pygeoweaver.runtime_tags.pgw_process import ProcessInfo, pygeoweaver_process, process_info_cache
+from pygeoweaver.runtime_tags.pgw_publish import publish_run
+from pygeoweaver.runtime_tags.pgw_workflow import pygeoweaver_workflow
+
+
+@pygeoweaver_process
+def load(x):
+    return x
+
+
+@pygeoweaver_process
+def combine(a, b):
+    return a + b
+
+
+@pytest.fixture
+def client(tmp_path):
+    ids = iter(f"id{n}" for n in range(100))
+
+    def post(endpoint, data=None, headers=None):
+        response = MagicMock()
+        response.json.return_value = {"id": next(ids)}
+        return response
+
+    client = MagicMock()
+    client.post.side_effect = post
+    with patch("pygeoweaver.runtime_tags.pgw_capture.get_home_dir", return_value=str(tmp_path)), \
+         patch("pygeoweaver.runtime_tags.pgw_publish.get_home_dir", return_value=str(tmp_path)), \
+         patch("pygeoweaver.runtime_tags.pgw_process.save_history"), \
+         patch("pygeoweaver.runtime_tags.pgw_publish.get_api_client", return_value=client), \
+         patch("pygeoweaver.runtime_tags.pgw_publish.ensure_geoweaver_started"), \
+         patch.object(pgw_context, "run_registry", RunRegistry()):
+        yield client
+
+
+def endpoints(client):
+    return sorted(c.args[0] for c in client.post.call_args_list)
+
+
+def test_publish_creates_processes_once_and_skips_unchanged_code(client):
+    @pygeoweaver_workflow(report=None, publish=True)
+    def pipeline():
+        return combine(load(1), load(2))
+
+    assert pipeline() == 3
+    assert endpoints(client) == ["/web/add/process", "/web/add/process", "/web/add/workflow"]
+    workflow = json.loads(client.post.call_args_list[-1].kwargs["data"])
+    nodes, edges = json.loads(workflow["nodes"]), json.loads(workflow["edges"])
+    assert [node["title"] for node in nodes] == ["load", "combine"]
+    # One edge per pair of processes called one after the other
+    assert [(edge["source"]["id"], edge["target"]["id"]) for edge in edges] == [(nodes[0]["id"], nodes[1]["id"])]
+
+    client.post.reset_mock()
+    pipeline()
+    assert client.post.call_count == 0
+
+    info = process_info_cache[combine.__wrapped__]
+    process_info_cache[combine.__wrapped__] = info._replace(code_hash="changed")
+    try:
+        pipeline()
+    finally:
+        process_info_cache[combine.__wrapped__] = info
+    assert endpoints(client) == ["/web/edit/process"]
+    assert json.loads(client.post.call_args.kwargs["data"])["name"] == "combine"
+
+
+def test_sequential_loops_publish_one_node_per_process(client):
+    @pygeoweaver_workflow(report=None)
+    def loop(n):
+        total = 0
+        for i in range(n):
+            total = combine(total, load(i))
+        return total
+
+    loop(3)
+    first = publish_run(get_runs("loop")[0])
+    workflow = json.loads(client.post.call_args.kwargs["data"])
+    nodes, edges = json.loads(workflow["nodes"]), json.loads(workflow["edges"])
+    assert [node["title"] for node in nodes] == ["load", "combine"]
+    assert len(edges) == 2
+
+    loop(50)
+    assert publish_run(get_runs("loop")[-1])["workflow"] == {"id": first["workflow"]["id"], "action": "unchanged"}
+
+
+def test_parallel_run_publishes_its_dag(client):
+    @pygeoweaver_workflow(parallel=True, report=None)
+    def fan_in():
+        return combine(load(1), load(2))
+
+    assert fan_in() == 3
+    summary = publish_run(get_runs("fan_in")[0])
+
+    assert {p["action"] for p in summary["processes"].values()} == {"created"}
+    assert summary["workflow"]["action"] == "created"
+    workflow = json.loads(client.post.call_args.kwargs["data"])
+    edges = json.loads(workflow["edges"])
+    combine_node = next(node["id"] for node in json.loads(workflow["nodes"]) if node["title"] == "combine")
+    assert len(edges) == 2
+    assert all(edge["target"]["id"] == combine_node for edge in edges)
+
+
+def test_failed_process_blocks_the_workflow(client):
+    client.post.side_effect = RuntimeError("server down")
+
+    @pygeoweaver_workflow(report=None)
+    def pipeline():
+        return load(1)
+
+    pipeline()
+    summary = publish_run(get_runs("pipeline")[0])
+    assert summary["processes"]["test_publish.load"]["action"] == "failed"
+    assert summary["workflow"]["action"] == "failed"
+    assert client.post.call_count == 1
+
+
+def test_processes_with_the_same_name_in_different_modules_are_kept_apart(client):
+    def other_load(x):
+        return x
+
+    other_load.__name__ = "load"
+    process_info_cache[other_load] = ProcessInfo("load", "other_module.load", "def load(x): ...", "other")
+    other = pygeoweaver_process(other_load)
+
+    @pygeoweaver_workflow(parallel=True, report=None)
+    def two_loads():
+        return combine(load(1), other(2))
+
+    assert two_loads() == 3
+    summary = publish_run(get_runs("two_loads")[0])
+
+    assert set(summary["processes"]) == {"test_publish.load", "other_module.load", "test_publish.combine"}
+    server_ids = {summary["processes"][p]["id"] for p in ("test_publish.load", "other_module.load")}
+    workflow = json.loads(client.post.call_args.kwargs["data"])
+    load_nodes = [node["id"] for node in json.loads(workflow["nodes"]) if node["title"] == "load"]
+    assert {node_id.rsplit("-", 1)[0] for node_id in load_nodes} == server_ids
+    assert get_runs("two_loads")[0].workflow_id == "test_publish.two_loads"
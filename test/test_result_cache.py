@@ -0,0 +1,80 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+from pygeoweaver.runtime_tags.pgw_process import pygeoweaver_process, process_info_cache
+from pygeoweaver.runtime_tags.pgw_result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(root=str(tmp_path / "result_cache"))
+    with patch("pygeoweaver.runtime_tags.pgw_process.get_result_cache", return_value=cache), \
+         patch("pygeoweaver.runtime_tags.pgw_capture.get_home_dir", return_value=str(tmp_path)):
+        yield cache
+
+
+def test_cached_process_skips_execution_and_records_a_cached_history(cache):
+    calls = []
+
+    @pygeoweaver_process(cache=True)
+    def reproject(tile, scale=1):
+        calls.append(tile)
+        print(f"reprojecting {tile}")
+        return {"tile": tile, "scale": scale}
+
+    with patch("pygeoweaver.runtime_tags.pgw_process.save_history") as mock_save:
+        assert reproject("a", scale=2) == {"tile": "a", "scale": 2}
+        assert reproject("a", scale=2) == {"tile": "a", "scale": 2}
+        assert reproject("b") == {"tile": "b", "scale": 1}
+
+    assert calls == ["a", "b"]
+    statuses = [c.kwargs["status"] for c in mock_save.call_args_list]
+    assert statuses == [ExecutionStatus.DONE, ExecutionStatus.CACHED, ExecutionStatus.DONE]
+    # Only calls that ran have an output log
+    notes = [c.kwargs["notes"] for c in mock_save.call_args_list]
+    assert ["Full output" in note for note in notes] == [True, False, True]
+
+
+def test_code_change_invalidates_cached_results(cache):
+    @pygeoweaver_process(cache=True)
+    def step(x):
+        return x + 1
+
+    with patch("pygeoweaver.runtime_tags.pgw_process.save_history"):
+        assert step(1) == 2
+        info = process_info_cache[step.__wrapped__]
+        process_info_cache[step.__wrapped__] = info._replace(code_hash="changed")
+        assert step(1) == 2
+    assert len(cache.list_entries()) == 2
+
+
+def test_unpicklable_arguments_are_not_cached(cache):
+    @pygeoweaver_process(cache=True)
+    def step(callback):
+        return callback()
+
+    with patch("pygeoweaver.runtime_tags.pgw_process.save_history"):
+        assert step(lambda: 1) == 1
+    assert cache.list_entries() == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(root=str(tmp_path), max_bytes=3000)
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        cache.set(key, b"x" * 900)
+        os.utime(cache.get_path(key), (time.time() - 100 + i, time.time() - 100 + i))
+    assert cache.get("aa1")[0]  # refreshes aa1, bb2 becomes the least recently used
+
+    cache.set("dd4", b"x" * 900)
+    assert not cache.get("bb2")[0]
+    assert cache.get("aa1") == (True, b"x" * 900)
+    assert cache.scan_size() <= 3000
+
+
+def test_same_code_in_different_processes_does_not_share_results(cache):
+    assert cache.make_key("a.step", "hash", (1,), {}) != cache.make_key("b.step", "hash", (1,), {})
+    assert cache.make_key("a.step", "hash", (1,), {}) == cache.make_key("a.step", "hash", (1,), {})
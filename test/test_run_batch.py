@@ -0,0 +1,69 @@
+import json
+import subprocess
+import threading
+import time
+from unittest.mock import patch
+
+from pygeoweaver.commands.pgw_run import build_run_workflow_command, run_workflows_batch
+from pygeoweaver.database_management.pgw_execution_status import ExecutionStatus
+
+
+def test_build_run_workflow_command():
+    command = build_run_workflow_command(
+        workflow_id="w1", host_list="h1,h2", password_list="a,b", environment_list="e1"
+    )
+    assert command == ["run", "workflow", "w1", "-h", "h1,h2", "-p", "a,b", "-e", "e1"]
+
+    command = build_run_workflow_command(
+        workflow_id="w1", workflow_zip_file_path="w1.zip", host_list="h1", password_list="a"
+    )
+    assert command == ["run", "workflow", "w1", "-f", "w1.zip", "-h", "h1", "-p", "a"]
+
+
+@patch("pygeoweaver.commands.pgw_run.download_geoweaver_jar")
+def test_batch_respects_per_host_limit(mock_download, tmp_path):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"workflows": [
+        {"workflow_id": f"w{i}", "hosts": "h1" if i < 4 else "h2", "passwords": "pw"} for i in range(6)
+    ]}))
+
+    lock = threading.Lock()
+    running = {"h1": 0, "h2": 0}
+    peak = {"h1": 0, "h2": 0}
+
+    def fake_cli(command, **kwargs):
+        host = command[command.index("-h") + 1]
+        with lock:
+            running[host] += 1
+            peak[host] = max(peak[host], running[host])
+        time.sleep(0.05)
+        with lock:
+            running[host] -= 1
+        return subprocess.CompletedProcess(command, 1 if command[2] == "w5" else 0)
+
+    with patch("pygeoweaver.commands.pgw_run.run_geoweaver_cli", side_effect=fake_cli), \
+         patch("pygeoweaver.commands.pgw_run.get_home_dir", return_value=str(tmp_path)):
+        summary = run_workflows_batch(str(manifest), max_workers=4, per_host_limit=2)
+
+    assert peak["h1"] == 2
+    assert list(summary["workflow_id"]) == [f"w{i}" for i in range(6)]
+    assert list(summary["status"]) == [ExecutionStatus.DONE] * 5 + [ExecutionStatus.FAILED]
+    assert (summary["duration_s"] > 0).all()
+
+
+@patch("pygeoweaver.commands.pgw_run.download_geoweaver_jar")
+def test_repeated_workflows_get_their_own_logs(mock_download, tmp_path):
+    def fake_cli(command, stdout=None, **kwargs):
+        stdout.write(f"run of {command[2]}\n")
+        return subprocess.CompletedProcess(command, 0)
+
+    manifest = [{"workflow_id": "w1", "hosts": "h1", "passwords": "pw"}] * 2
+    with patch("pygeoweaver.commands.pgw_run.run_geoweaver_cli", side_effect=fake_cli), \
+         patch("pygeoweaver.commands.pgw_run.get_home_dir", return_value=str(tmp_path)):
+        summary = run_workflows_batch(manifest, max_workers=2)
+
+    log_files = list(summary["log_file"])
+    assert len(set(log_files)) == 2
+    for log_file in log_files:
+        with open(log_file) as f:
+            assert f.read() == "run of w1\n"
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from pygeoweaver.runtime_tags import pgw_context
+from pygeoweaver.runtime_tags.pgw_context import RunRegistry, get_runs
+from pygeoweaver.runtime_tags.pgw_process import geoweaver_context, pygeoweaver_process
+from pygeoweaver.runtime_tags.pgw_workflow import pygeoweaver_workflow
+
+
+pytestmark = pytest.mark.usefixtures("quiet")
+
+
+@pygeoweaver_process
+def tile(name, barrier=None):
+    print(f"processing {name}")
+    if barrier:
+        barrier.wait(timeout=5)
+    return name
+
+
+@pygeoweaver_workflow
+def tiles_workflow(prefix, barrier=None):
+    return [tile(f"{prefix}-{i}", barrier) for i in range(3)]
+
+
+def test_concurrent_workflows_in_threads_keep_their_own_calls():
+    barrier = threading.Barrier(4)
+    threads = [threading.Thread(target=tiles_workflow, args=(f"w{i}", barrier)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    runs = get_runs("tiles_workflow")
+    assert len(runs) == 4 and len({run.run_id for run in runs}) == 4
+    for run in runs:
+        names = [call["log"].split()[1] for call in run.process_calls]
+        prefix = names[0].split("-")[0]
+        assert names == [f"{prefix}-{i}" for i in range(3)]
+        assert all(call["run_id"] == run.run_id for call in run.process_calls)
+        assert run.finished
+
+
+def test_async_processes_and_workflows():
+    @pygeoweaver_process
+    async def fetch(i):
+        await asyncio.sleep(0.01 * (3 - i))
+        print(f"fetched {i}")
+        return i
+
+    @pygeoweaver_workflow
+    async def gather_workflow(n):
+        assert geoweaver_context["current_workflow"] == "gather_workflow"
+        return await asyncio.gather(*(fetch(i) for i in range(n)))
+
+    async def main():
+        return await asyncio.gather(gather_workflow(3), gather_workflow(3))
+
+    assert asyncio.run(main()) == [[0, 1, 2], [0, 1, 2]]
+    runs = get_runs("gather_workflow")
+    assert len(runs) == 2
+    for run in runs:
+        assert sorted(call["log"].strip() for call in run.process_calls) == [f"fetched {i}" for i in range(3)]
+    assert geoweaver_context["current_workflow"] is None
+
+
+def test_finished_runs_are_evicted():
+    with patch.object(pgw_context, "run_registry", RunRegistry(max_finished=2)):
+        first = pgw_context.start_run("wf")
+        pgw_context.finish_run(*first)
+        for _ in range(2):
+            pgw_context.finish_run(*pgw_context.start_run("wf"))
+        assert pgw_context.get_run(first[0].run_id) is None
+        assert len(get_runs()) == 2
@@ -3,8 +3,9 @@ The main function of pygeoweaver
 To run in CLI mode. 
 """
 import logging
+import os
 import time
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 import requests
 from pygeoweaver import start, stop
 
@@ -12,7 +13,13 @@ import unittest
 
 from pygeoweaver.constants import GEOWEAVER_DEFAULT_ENDPOINT_URL
 from pygeoweaver.pgw_log_config import get_logger
-from pygeoweaver.server import show
+from pygeoweaver.server import (
+    check_geoweaver_status,
+    check_pid_file,
+    invalidate_geoweaver_status,
+    show,
+    wait_for_geoweaver_ready,
+)
 import pytest
 
 
@@ -62,3 +69,57 @@ def test_show_gui():
             show()
             mock_browser_open.assert_called_once()
 
+
+
+def test_status_uses_pid_file_before_network():
+    with patch("pygeoweaver.server.check_pid_file", return_value=True), \
+         patch("pygeoweaver.server.check_geoweaver_port") as mock_port:
+        assert check_geoweaver_status(use_cache=False) is True
+        mock_port.assert_not_called()
+
+
+def test_status_skips_http_when_port_closed():
+    with patch("pygeoweaver.server.check_pid_file", return_value=False), \
+         patch("pygeoweaver.server.check_geoweaver_port", return_value=False), \
+         patch("pygeoweaver.server.check_geoweaver_http") as mock_http:
+        assert check_geoweaver_status(use_cache=False) is False
+        mock_http.assert_not_called()
+
+
+def test_status_is_memoized():
+    invalidate_geoweaver_status()
+    with patch("pygeoweaver.server.probe_geoweaver", return_value=True) as mock_probe:
+        assert check_geoweaver_status() is True
+        assert check_geoweaver_status() is True
+        mock_probe.assert_called_once()
+    invalidate_geoweaver_status()
+
+
+def test_stale_pid_file_is_removed(tmp_path):
+    pid_file = tmp_path / "geoweaver.pid"
+    pid_file.write_text(str(os.getpid()))
+    with patch("pygeoweaver.server.get_pid_file_path", return_value=str(pid_file)):
+        # the test runner is not a Geoweaver server
+        assert check_pid_file() is False
+    assert not pid_file.exists()
+
+
+def test_wait_for_ready_detects_started_log_line(tmp_path):
+    log_path = tmp_path / "geoweaver.log"
+    log_path.write_bytes(b"INFO Starting GeoweaverApplication\nINFO Started GeoweaverApplication in 3.2 seconds\n")
+    with patch("pygeoweaver.server.check_geoweaver_port", return_value=False):
+        assert wait_for_geoweaver_ready(log_path=str(log_path), timeout=5) is not None
+
+
+def test_wait_for_ready_fails_fast_when_process_exits():
+    server_process = MagicMock()
+    server_process.poll.return_value = 1
+    with patch("pygeoweaver.server.check_geoweaver_port", return_value=False):
+        started = time.monotonic()
+        assert wait_for_geoweaver_ready(server_process=server_process, timeout=30) is None
+        assert time.monotonic() - started < 1
+
+
+def test_wait_for_ready_times_out():
+    with patch("pygeoweaver.server.check_geoweaver_port", return_value=False):
+        assert wait_for_geoweaver_ready(timeout=0.2, max_delay=0.05) is None
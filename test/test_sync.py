@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pygeoweaver.commands import pgw_sync
+from pygeoweaver.commands.pgw_sync import MANIFEST_FILE_NAME, sync_workflow
+
+WORKFLOW_ID = "wf1"
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    # What the server unpacks into ~/gw-workspace/temp/<id> on every download
+    source = tmp_path / "server"
+    (source / "code").mkdir(parents=True)
+    nodes = json.dumps([{"id": "p1-abc12"}, {"id": "p2-def34"}, {"id": "p1-ghi56"}])
+    (source / "workflow.json").write_text(json.dumps({"id": WORKFLOW_ID, "nodes": nodes}))
+    (source / "code" / "step.py").write_text("print('step')")
+    target = tmp_path / "target"
+    target.mkdir()
+
+    def download(endpoint, data=None, headers=None):
+        shutil.copytree(source, tmp_path / "gw-workspace" / "temp" / WORKFLOW_ID)
+        response = MagicMock()
+        response.status_code = 200
+        return response
+
+    client = MagicMock()
+    client.post.side_effect = download
+    with patch.object(pgw_sync, "get_home_dir", return_value=str(tmp_path)), \
+         patch.object(pgw_sync, "get_api_client", return_value=client), \
+         patch.object(pgw_sync, "download_geoweaver_jar"), \
+         patch.object(pgw_sync, "iter_history_records", return_value=iter([])) as mock_history:
+        yield source, target, client, mock_history
+
+
+def test_sync_workflow_copies_only_changed_files(workspace):
+    source, target, client, _ = workspace
+
+    with patch.object(pgw_sync.shutil, "copy2", wraps=pgw_sync.shutil.copy2) as copy:
+        sync_workflow(WORKFLOW_ID, str(target))
+        assert copy.call_count == 2
+        assert "option=workflowwithprocesscode" in client.post.call_args.kwargs["data"]
+
+        copy.reset_mock()
+        sync_workflow(WORKFLOW_ID, str(target))
+        assert copy.call_count == 0
+
+        (source / "code" / "step.py").write_text("print('changed')")
+        sync_workflow(WORKFLOW_ID, str(target))
+        assert [os.path.basename(c.args[0]) for c in copy.call_args_list] == ["step.py"]
+
+    assert (target / "code" / "step.py").read_text() == "print('changed')"
+    assert set(json.loads((target / MANIFEST_FILE_NAME).read_text())["files"]) == {"workflow.json", "code/step.py"}
+
+
+def test_sync_workflow_recopies_files_changed_in_the_target(workspace):
+    source, target, _, _ = workspace
+    sync_workflow(WORKFLOW_ID, str(target))
+
+    (target / "code" / "step.py").write_text("local edit")
+    sync_workflow(WORKFLOW_ID, str(target))
+    assert (target / "code" / "step.py").read_text() == "print('step')"
+
+
+def test_sync_workflow_fetches_history_since_the_watermarks(workspace):
+    _, target, _, mock_history = workspace
+    records = {
+        ("workflow", WORKFLOW_ID): [
+            {"history_id": "h1", "history_end_time": 1700000001000, "indicator": "Done"},
+            {"history_id": "h2", "history_end_time": None, "indicator": "Running"},
+        ],
+        ("process", "p1"): [{"history_id": "p1h", "history_end_time": 1700000002000, "indicator": "Done"}],
+        ("process", "p2"): [],
+    }
+    mock_history.side_effect = lambda object_type, object_id, since=None: iter([records[(object_type, object_id)]])
+    sync_workflow(WORKFLOW_ID, str(target))
+    assert [c.args for c in mock_history.call_args_list] == [("workflow", WORKFLOW_ID), ("process", "p1"), ("process", "p2")]
+    assert all(c.kwargs["since"] is None for c in mock_history.call_args_list)
+    assert sorted(os.listdir(target / "history")) == ["h1.json", "h2.json", "p1h.json"]
+
+    mock_history.reset_mock()
+    sync_workflow(WORKFLOW_ID, str(target))
+    since = {c.args: c.kwargs["since"] for c in mock_history.call_args_list}
+    assert since == {("workflow", WORKFLOW_ID): 1700000001000, ("process", "p1"): 1700000002000, ("process", "p2"): None}
+
+
+def test_sync_workflow_removes_files_deleted_from_the_workflow(workspace):
+    source, target, _, _ = workspace
+    (source / "code" / "old.py").write_text("print('old')")
+    (source / "code" / "edited.py").write_text("print('edited')")
+    sync_workflow(WORKFLOW_ID, str(target))
+
+    (source / "code" / "old.py").unlink()
+    (source / "code" / "edited.py").unlink()
+    (target / "code" / "edited.py").write_text("local edit")
+    sync_workflow(WORKFLOW_ID, str(target))
+
+    assert not (target / "code" / "old.py").exists()
+    assert (target / "code" / "edited.py").read_text() == "local edit"
+    files = json.loads((target / MANIFEST_FILE_NAME).read_text())["files"]
+    assert set(files) == {"workflow.json", "code/step.py"}
+
+
+def test_full_history_files_are_kept_by_later_code_only_syncs(workspace):
+    source, target, _, _ = workspace
+    (source / "history").mkdir()
+    (source / "history" / "old_run.json").write_text("{}")
+    sync_workflow(WORKFLOW_ID, str(target), full_history=True)
+
+    shutil.rmtree(source / "history")
+    sync_workflow(WORKFLOW_ID, str(target))
+    assert (target / "history" / "old_run.json").exists()